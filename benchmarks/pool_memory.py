@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import gc
+import tracemalloc
+
+from omu.client import ClientPool, OmuClient
+from omu.connection import Address
+from omu.extension.server.model.app import App
+
+ADDRESS = Address("localhost", 26423)
+
+
+def app(index: int) -> App:
+    return App(name=f"bot{index}", group="bench", version="0.0.1")
+
+
+def touch(client: OmuClient) -> None:
+    client.tables
+    client.endpoints
+    client.registry
+    client.message
+
+
+async def standalone(count: int):
+    sessions = []
+    for index in range(count):
+        client = OmuClient(app(index), ADDRESS, loop=asyncio.get_running_loop())
+        touch(client)
+        sessions.append(client.connection._ensure_session())
+
+    async def close() -> None:
+        for session in sessions:
+            await session.close()
+
+    return close
+
+
+async def pooled(count: int):
+    pool = ClientPool(ADDRESS, loop=asyncio.get_running_loop())
+    for index in range(count):
+        client = pool.create(app(index))
+        touch(client)
+        client.connection._ensure_session()
+    return pool.close
+
+
+async def measure(name: str, factory, count: int) -> None:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    close = await factory(count)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{name:<12} {(after - before) / count / 1024:8.2f} KiB/client")
+    await close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure memory per client")
+    parser.add_argument("--clients", type=int, default=500)
+    args = parser.parse_args()
+    await measure("standalone", standalone, args.clients)
+    await measure("pooled", pooled, args.clients)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
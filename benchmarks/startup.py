@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORTS = {
+    "import omu": "import omu",
+    "import OmuClient": "from omu.client import OmuClient",
+}
+
+
+def measure_import(statement: str, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def measure_construct(count: int) -> tuple[float, float]:
+    from omu.client import OmuClient
+    from omu.connection import Address
+    from omu.extension.server.model.app import App
+
+    loop = asyncio.new_event_loop()
+    address = Address("localhost", 26423)
+    app = App(name="bench", group="bench", version="0.0.1")
+    start = time.perf_counter()
+    clients = [OmuClient(app, address, loop=loop) for _ in range(count)]
+    constructed = time.perf_counter() - start
+    start = time.perf_counter()
+    for client in clients:
+        client.tables
+        client.server
+        client.endpoints
+        client.registry
+        client.message
+    materialized = time.perf_counter() - start
+    loop.close()
+    return constructed / count, materialized / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure client startup cost")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--clients", type=int, default=1000)
+    args = parser.parse_args()
+
+    baseline = statistics.median(measure_import("pass", args.repeat))
+    for name, statement in IMPORTS.items():
+        timing = statistics.median(measure_import(statement, args.repeat))
+        print(f"{name:<20} {(timing - baseline) * 1000:8.2f} ms")
+    constructed, materialized = measure_construct(args.clients)
+    print(f"{'construct client':<20} {constructed * 1e6:8.2f} us")
+    print(f"{'materialize all':<20} {materialized * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
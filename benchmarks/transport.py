@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from omu.client import OmuClient
+from omu.connection import Address, ConnectionListener
+from omu.event import EventJson
+from omu.event.event import JsonEventType, SerializeEventType
+from omu.extension.server.model.app import App
+from omu.interface import Serializer
+
+APP = App(name="bench", group="bench", version="0.0.1")
+JSON_EVENT = JsonEventType[dict]("bench", "json", Serializer.noop())
+BINARY_EVENT = SerializeEventType[bytes, bytes]("bench", "binary", Serializer.noop())
+
+
+async def serve_websocket(port: int):
+    from aiohttp import web
+
+    async def handle(request: web.Request) -> web.WebSocketResponse:
+        socket = web.WebSocketResponse()
+        await socket.prepare(request)
+        async for msg in socket:
+            if msg.type == web.WSMsgType.TEXT:
+                await socket.send_str(msg.data)
+            elif msg.type == web.WSMsgType.BINARY:
+                await socket.send_bytes(msg.data)
+        return socket
+
+    app = web.Application()
+    app.router.add_get("/ws", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner.cleanup
+
+
+async def serve_unix(path: str):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        while data := await reader.read(1 << 16):
+            writer.write(data)
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_unix_server(handle, path)
+
+    async def close() -> None:
+        server.close()
+        await server.wait_closed()
+
+    return close
+
+
+class Counter(ConnectionListener):
+    def __init__(self, type: str, count: int):
+        self.type = type
+        self.remaining = count
+        self.done = asyncio.Event()
+
+    async def on_event(self, event: EventJson) -> None:
+        if event.type != self.type:
+            return
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.done.set()
+
+
+async def measure(name: str, address: Address, count: int, size: int) -> None:
+    client = OmuClient(APP, address, loop=asyncio.get_running_loop())
+    client.events.register(JSON_EVENT, BINARY_EVENT)
+    connection = client.connection
+    task = asyncio.create_task(connection.connect(reconnect=False))
+    while not connection.connected:
+        await asyncio.sleep(0.01)
+
+    for event, data in (
+        (JSON_EVENT, {"text": "x" * size}),
+        (BINARY_EVENT, b"x" * size),
+    ):
+        counter = connection.add_listener(Counter(event.type, count))
+        start = time.perf_counter()
+        for _ in range(count):
+            await connection.send(event, data)
+        await counter.done.wait()
+        elapsed = time.perf_counter() - start
+        connection.remove_listener(counter)
+        kind = "binary" if event is BINARY_EVENT else "json"
+        print(f"{name:<10} {kind:<7} {count / elapsed:12.0f} events/s")
+
+    await connection.disconnect()
+    await task
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare event transports")
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--port", type=int, default=26499)
+    args = parser.parse_args()
+
+    close = await serve_websocket(args.port)
+    await measure("websocket", Address("127.0.0.1", args.port), args.events, args.size)
+    await close()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "omu.sock")
+        close = await serve_unix(path)
+        await measure(
+            "unix", Address("127.0.0.1", 0, path=path), args.events, args.size
+        )
+        await close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
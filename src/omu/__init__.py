@@ -1,6 +1,11 @@
-from .client import Client, OmuClient
+from typing import TYPE_CHECKING
+
+from .client import Client
 from .connection import Address, Connection, ConnectionListener, ConnectionStatus
-from .extension.server import App
+
+if TYPE_CHECKING:
+    from .client import OmuClient
+    from .extension.server import App
 
 __all__ = [
     "Address",
@@ -11,3 +16,15 @@ __all__ = [
     "OmuClient",
     "App",
 ]
+
+
+def __getattr__(name: str):
+    if name == "OmuClient":
+        from .client.omuclient import OmuClient
+
+        return OmuClient
+    if name == "App":
+        from .extension.server.model.app import App
+
+        return App
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
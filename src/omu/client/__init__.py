@@ -1,4 +1,21 @@
+from typing import TYPE_CHECKING
+
 from .client import Client, ClientListener
-from .omuclient import OmuClient
 
-__all__ = ["Client", "ClientListener", "OmuClient"]
+if TYPE_CHECKING:
+    from .omuclient import OmuClient
+    from .pool import ClientPool
+
+__all__ = ["Client", "ClientListener", "ClientPool", "OmuClient"]
+
+
+def __getattr__(name: str):
+    if name == "OmuClient":
+        from .omuclient import OmuClient
+
+        return OmuClient
+    if name == "ClientPool":
+        from .pool import ClientPool
+
+        return ClientPool
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import abc
-import asyncio
 from typing import TYPE_CHECKING, Any, Awaitable, Callable
 
 if TYPE_CHECKING:
+    import asyncio
+
     from omu.connection import Connection
     from omu.event import EventRegistry, EventType
     from omu.extension import ExtensionRegistry
@@ -23,6 +24,9 @@ class ClientListener:
     async def on_started(self) -> None:
         ...
 
+    async def on_stopping(self) -> None:
+        ...
+
     async def on_stopped(self) -> None:
         ...
 
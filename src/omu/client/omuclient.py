@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING, Any, List
 from loguru import logger
 
 from omu.client import Client
-from omu.connection import Address, ConnectionListener, WebsocketsConnection
+from omu.connection.connection import ConnectionListener
 from omu.event import EVENTS, EventRegistryImpl
 from omu.extension.endpoint.endpoint_extension import (
     EndpointExtension,
@@ -26,7 +26,8 @@ from omu.extension.table import TableExtension, TableExtensionType
 
 if TYPE_CHECKING:
     from omu.client import ClientListener
-    from omu.connection import Connection
+    from omu.client.pool import ClientPool
+    from omu.connection import Address, Connection
     from omu.event import EventRegistry, EventType
     from omu.extension import ExtensionRegistry
     from omu.extension.server.model.app import App
@@ -41,22 +42,39 @@ class OmuClient(Client, ConnectionListener):
         event_registry: EventRegistry | None = None,
         extension_registry: ExtensionRegistry | None = None,
         loop: asyncio.AbstractEventLoop | None = None,
+        pool: ClientPool | None = None,
     ):
+        if loop is None and pool is not None:
+            loop = pool.loop
         self._loop = loop or asyncio.get_event_loop()
         self._running = False
         self._listeners: List[ClientListener] = []
         self._app = app
-        self._connection = connection or WebsocketsConnection(self, address)
-        self._events = event_registry or EventRegistryImpl(self)
+        if connection is None and pool is not None:
+            connection = pool.connection(self, address)
+        elif connection is None and address.path is not None:
+            from omu.connection.unix_connection import UnixSocketConnection
+
+            connection = UnixSocketConnection(self, address)
+        elif connection is None:
+            from omu.connection.websockets_connection import WebsocketsConnection
+
+            connection = WebsocketsConnection(self, address)
+        self._connection = connection
+        self._events = event_registry or EventRegistryImpl(
+            self, pool.types if pool else None
+        )
         self._connection.add_listener(self)
         self._extensions = extension_registry or ExtensionRegistryImpl(self)
 
-        self.events.register(EVENTS.Ready, EVENTS.Connect)
-        self._tables = self.extensions.register(TableExtensionType)
-        self._server = self.extensions.register(ServerExtensionType)
-        self._endpoints = self.extensions.register(EndpointExtensionType)
-        self._registry = self.extensions.register(RegistryExtensionType)
-        self._message = self.extensions.register(MessageExtensionType)
+        self.events.register(EVENTS.Ready, EVENTS.Connect, EVENTS.Token)
+        self.extensions.register_lazy(
+            TableExtensionType,
+            ServerExtensionType,
+            EndpointExtensionType,
+            RegistryExtensionType,
+            MessageExtensionType,
+        )
 
         for listener in self._listeners:
             asyncio.run(listener.on_initialized())
@@ -83,23 +101,23 @@ class OmuClient(Client, ConnectionListener):
 
     @property
     def endpoints(self) -> EndpointExtension:
-        return self._endpoints
+        return self.extensions.get(EndpointExtensionType)
 
     @property
     def tables(self) -> TableExtension:
-        return self._tables
+        return self.extensions.get(TableExtensionType)
 
     @property
     def registry(self) -> RegistryExtension:
-        return self._registry
+        return self.extensions.get(RegistryExtensionType)
 
     @property
     def message(self) -> MessageExtension:
-        return self._message
+        return self.extensions.get(MessageExtensionType)
 
     @property
     def server(self) -> ServerExtension:
-        return self._server
+        return self.extensions.get(ServerExtensionType)
 
     @property
     def running(self) -> bool:
@@ -144,6 +162,8 @@ class OmuClient(Client, ConnectionListener):
     async def stop(self) -> None:
         if not self._running:
             raise RuntimeError("Not running")
+        for listener in self._listeners:
+            await listener.on_stopping()
         self._running = False
         await self._connection.disconnect()
         for listener in self._listeners:
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from omu.event import EventTypeRegistry
+
+if TYPE_CHECKING:
+    import aiohttp
+
+    from omu.client import Client
+    from omu.client.omuclient import OmuClient
+    from omu.connection import Address, Connection
+    from omu.connection.multiplex_connection import MultiplexConnection
+    from omu.extension.server.model.app import App
+
+
+class ClientPool:
+    def __init__(
+        self,
+        address: Address,
+        loop: asyncio.AbstractEventLoop | None = None,
+        limit: int = 0,
+        multiplex: bool = False,
+    ):
+        self.address = address
+        self.loop = loop or asyncio.get_event_loop()
+        self.limit = limit
+        self.types = EventTypeRegistry()
+        self.clients: List[OmuClient] = []
+        self.multiplex = multiplex
+        self._session: aiohttp.ClientSession | None = None
+        self._multiplexes: Dict[Tuple[str, int, bool], MultiplexConnection] = {}
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.limit)
+            )
+        return self._session
+
+    def connection(self, client: Client, address: Address) -> Connection:
+        if address.path is not None:
+            from omu.connection.unix_connection import UnixSocketConnection
+
+            return UnixSocketConnection(client, address)
+        if self.multiplex:
+            from omu.connection.multiplex_connection import MultiplexConnection
+
+            key = (address.host, address.port, address.secure)
+            if key not in self._multiplexes:
+                self._multiplexes[key] = MultiplexConnection(
+                    address, session=lambda: self.session
+                )
+            return self._multiplexes[key].channel(client.app)
+        from omu.connection.websockets_connection import WebsocketsConnection
+
+        return WebsocketsConnection(client, address, session=lambda: self.session)
+
+    def create(self, app: App, address: Address | None = None) -> OmuClient:
+        from omu.client.omuclient import OmuClient
+
+        client = OmuClient(app, address or self.address, pool=self)
+        self.clients.append(client)
+        return client
+
+    async def start(self, *, token: str | None = None, reconnect: bool = True) -> None:
+        for client in self.clients:
+            if not client.running:
+                await client.start(token=token, reconnect=reconnect)
+
+    async def stop(self) -> None:
+        for client in self.clients:
+            if client.running:
+                await client.stop()
+
+    async def close(self) -> None:
+        await self.stop()
+        self.clients.clear()
+        for multiplex in self._multiplexes.values():
+            await multiplex.close()
+        self._multiplexes.clear()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
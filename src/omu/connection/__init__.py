@@ -1,11 +1,44 @@
+from typing import TYPE_CHECKING
+
 from .address import Address
 from .connection import Connection, ConnectionListener, ConnectionStatus
-from .websockets_connection import WebsocketsConnection
+from .manifest import SubscriptionManifest
+
+if TYPE_CHECKING:
+    from .multiplex_connection import ChannelConnection, MultiplexConnection
+    from .transport_connection import TransportConnection
+    from .unix_connection import UnixSocketConnection
+    from .websockets_connection import WebsocketsConnection
 
 __all__ = [
     "Address",
+    "ChannelConnection",
     "Connection",
     "ConnectionStatus",
     "ConnectionListener",
+    "MultiplexConnection",
+    "SubscriptionManifest",
+    "TransportConnection",
+    "UnixSocketConnection",
     "WebsocketsConnection",
 ]
+
+
+def __getattr__(name: str):
+    if name == "WebsocketsConnection":
+        from .websockets_connection import WebsocketsConnection
+
+        return WebsocketsConnection
+    if name in ("ChannelConnection", "MultiplexConnection"):
+        from . import multiplex_connection
+
+        return getattr(multiplex_connection, name)
+    if name == "TransportConnection":
+        from .transport_connection import TransportConnection
+
+        return TransportConnection
+    if name == "UnixSocketConnection":
+        from .unix_connection import UnixSocketConnection
+
+        return UnixSocketConnection
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,8 +1,13 @@
 class Address:
-    def __init__(self, host: str, port: int, secure: bool = False) -> None:
+    def __init__(
+        self, host: str, port: int, secure: bool = False, path: str | None = None
+    ) -> None:
         self.host = host
         self.port = port
         self.secure = secure
+        self.path = path
 
     def __str__(self) -> str:
+        if self.path is not None:
+            return f"unix:{self.path}"
         return f"{self.host}:{self.port}"
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING, Any, Literal
 
 if TYPE_CHECKING:
     from omu.connection import Address
+    from omu.connection.manifest import SubscriptionManifest
     from omu.event import EventJson, EventType
 
 
@@ -12,6 +13,9 @@ type ConnectionStatus = Literal["connecting", "connected", "disconnected"]
 
 
 class ConnectionListener:
+    async def on_manifest(self, manifest: SubscriptionManifest) -> None:
+        ...
+
     async def on_connected(self) -> None:
         ...
 
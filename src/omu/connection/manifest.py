@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, List, Tuple
+
+if TYPE_CHECKING:
+    from omu.event import EventType
+
+type Coro[**P, R] = Callable[P, Awaitable[R]]
+
+
+class SubscriptionManifest:
+    def __init__(self) -> None:
+        self.events: List[Tuple[EventType[Any, Any], Any]] = []
+        self.tasks: List[Coro[[], Any]] = []
+
+    def add[T](self, type: EventType[T, Any], data: T) -> None:
+        self.events.append((type, data))
+
+    def defer(self, task: Coro[[], Any]) -> None:
+        self.tasks.append(task)
+
+    async def send(self, send: Coro[[EventType[Any, Any], Any], None]) -> None:
+        from omu.event.events import EVENTS, BundleEntry
+
+        bundle: List[BundleEntry] = []
+        for event, data in self.events:
+            serialized = event.serializer.serialize(data)
+            if isinstance(serialized, (bytes, bytearray, memoryview)):
+                await send(event, data)
+                continue
+            bundle.append(BundleEntry(type=event.type, data=serialized))
+        if bundle:
+            await send(EVENTS.Bundle, bundle)
+
+    async def run(self, concurrency: int = 8) -> List[Any]:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(task: Coro[[], Any]) -> Any:
+            async with semaphore:
+                return await task()
+
+        tasks, self.tasks = self.tasks, []
+        return await asyncio.gather(
+            *(run(task) for task in tasks), return_exceptions=True
+        )
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any, Callable, Dict
+
+from loguru import logger
+
+from omu.connection import Address
+from omu.connection.transport_connection import TransportConnection
+from omu.event import EVENTS, EventJson
+from omu.event.events import DisconnectEvent
+
+if TYPE_CHECKING:
+    import aiohttp
+
+    from omu.extension.server.model.app import App
+
+
+class MultiplexConnection:
+    def __init__(
+        self,
+        address: Address,
+        session: Callable[[], aiohttp.ClientSession] | None = None,
+    ):
+        self.address = address
+        self._session_factory = session
+        self._session: aiohttp.ClientSession | None = None
+        self._socket: aiohttp.ClientWebSocketResponse | None = None
+        self._channels: Dict[int, ChannelConnection] = {}
+        self._next_channel = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def open(self) -> bool:
+        return self._socket is not None and not self._socket.closed
+
+    @property
+    def _ws_endpoint(self) -> str:
+        protocol = "wss" if self.address.secure else "ws"
+        return f"{protocol}://{self.address.host}:{self.address.port}/ws"
+
+    def channel(self, app: App) -> ChannelConnection:
+        self._next_channel += 1
+        channel = ChannelConnection(self, self._next_channel, app)
+        self._channels[channel.id] = channel
+        return channel
+
+    async def connect(self) -> None:
+        async with self._lock:
+            if self.open:
+                return
+            if self._session is None:
+                if self._session_factory is not None:
+                    self._session = self._session_factory()
+                else:
+                    import aiohttp
+
+                    self._session = aiohttp.ClientSession()
+            self._socket = await self._session.ws_connect(self._ws_endpoint)
+            asyncio.get_running_loop().create_task(self._listen(self._socket))
+
+    async def close(self) -> None:
+        for channel in list(self._channels.values()):
+            await channel.disconnect()
+        if self._socket and not self._socket.closed:
+            await self._socket.close()
+        self._socket = None
+        if self._session is not None and self._session_factory is None:
+            await self._session.close()
+        self._session = None
+
+    async def send(self, channel: int, type: str, serialized: Any) -> None:
+        if not self.open or self._socket is None:
+            raise RuntimeError("Not connected")
+        if isinstance(serialized, (bytes, bytearray, memoryview)):
+            await self._socket.send_bytes(
+                EventJson.to_binary(type, bytes(serialized), channel=channel)
+            )
+            return
+        await self._socket.send_json(
+            {
+                "type": type,
+                "data": serialized,
+                "channel": channel,
+            }
+        )
+
+    async def _listen(self, socket: aiohttp.ClientWebSocketResponse) -> None:
+        from aiohttp import web
+
+        try:
+            while True:
+                msg = await socket.receive()
+                if msg.type in (
+                    web.WSMsgType.CLOSE,
+                    web.WSMsgType.CLOSED,
+                    web.WSMsgType.ERROR,
+                ):
+                    break
+                if msg.data is None:
+                    continue
+                try:
+                    if msg.type == web.WSMsgType.BINARY:
+                        header, payload = EventJson.split_binary(msg.data)
+                        channel_id = header.get("channel")
+                        event = EventJson(header["type"], payload)
+                    else:
+                        json = msg.json()
+                        channel_id = json.pop("channel", None)
+                        event = EventJson.from_json(json)
+                except (TypeError, ValueError) as e:
+                    logger.error(f"Failed to parse event: {e} {msg}")
+                    continue
+                channel = self._channels.get(channel_id) if channel_id else None
+                if channel is None:
+                    logger.warning(f"Received event for unknown channel {channel_id}")
+                    continue
+                asyncio.get_running_loop().create_task(channel._dispatch(event))
+        finally:
+            if self._socket is socket:
+                self._socket = None
+            for channel in list(self._channels.values()):
+                await channel._closed()
+
+
+class ChannelConnection(TransportConnection):
+    def __init__(self, multiplex: MultiplexConnection, id: int, app: App):
+        super().__init__(app)
+        self.multiplex = multiplex
+        self.id = id
+
+    @property
+    def address(self) -> Address:
+        return self.multiplex.address
+
+    @property
+    def connected(self) -> bool:
+        return self._connected and self.multiplex.open
+
+    async def _open(self) -> None:
+        self.multiplex._channels[self.id] = self
+        await self.multiplex.connect()
+
+    async def disconnect(self) -> None:
+        await super().disconnect()
+        self.multiplex._channels.pop(self.id, None)
+
+    async def _close(self) -> None:
+        if self._connected and self.multiplex.open:
+            await self.send(EVENTS.Disconnect, DisconnectEvent(reason="closed"))
+
+    async def _write(self, type: str, serialized: Any) -> None:
+        await self.multiplex.send(self.id, type, serialized)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import abc
+import asyncio
+from typing import TYPE_CHECKING, Any, List
+
+from loguru import logger
+
+from omu.connection import Connection, ConnectionListener, SubscriptionManifest
+from omu.event import EVENTS, EventJson
+from omu.event.event import EventType
+from omu.event.events import ConnectEvent
+
+if TYPE_CHECKING:
+    from omu.extension.server.model.app import App
+
+
+class TransportConnection(Connection):
+    def __init__(self, app: App):
+        self._app = app
+        self._connected = False
+        self._stopping = False
+        self._listeners: List[ConnectionListener] = []
+        self._token: str | None = None
+        self._closed_event = asyncio.Event()
+        self.fetch_concurrency = 8
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    @abc.abstractmethod
+    async def _open(self) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def _write(self, type: str, serialized: Any) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def _close(self) -> None:
+        ...
+
+    def _reconnectable(self) -> bool:
+        return True
+
+    async def connect(
+        self, *, token: str | None = None, reconnect: bool = True
+    ) -> None:
+        if self._connected:
+            raise RuntimeError("Already connected")
+        self._token = token
+        self._stopping = False
+
+        while True:
+            self._closed_event.clear()
+            await self._open()
+            self._connected = True
+            await self.send(
+                EVENTS.Connect,
+                ConnectEvent(
+                    app=self._app,
+                    token=self._token,
+                ),
+            )
+            manifest = SubscriptionManifest()
+            for listener in self._listeners:
+                await listener.on_manifest(manifest)
+            await manifest.send(self.send)
+            for listener in self._listeners:
+                await listener.on_connected()
+            for error in await manifest.run(self.fetch_concurrency):
+                if isinstance(error, Exception):
+                    logger.error(f"Failed to run deferred subscription: {error}")
+            for listener in self._listeners:
+                await listener.on_status_changed("connected")
+            await self._closed_event.wait()
+            if not reconnect or self._stopping or not self._reconnectable():
+                break
+
+    async def disconnect(self) -> None:
+        self._stopping = True
+        await self._lost()
+
+    async def _lost(self) -> None:
+        await self._close()
+        await self._closed()
+
+    async def _closed(self) -> None:
+        if not self._connected:
+            return
+        self._connected = False
+        self._closed_event.set()
+        for listener in self._listeners:
+            await listener.on_disconnected()
+            await listener.on_status_changed("disconnected")
+
+    async def _dispatch(self, event: EventJson) -> None:
+        if event.type == EVENTS.Token.type:
+            self._token = event.data
+        for listener in self._listeners:
+            await listener.on_event(event)
+
+    async def send[T](self, event: EventType[T, Any], data: T) -> None:
+        if not self._connected:
+            raise RuntimeError("Not connected")
+        await self._write(event.type, event.serializer.serialize(data))
+
+    def add_listener[T: ConnectionListener](self, listener: T) -> T:
+        self._listeners.append(listener)
+        return listener
+
+    def remove_listener[T: ConnectionListener](self, listener: T) -> T:
+        self._listeners.remove(listener)
+        return listener
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import struct
+from typing import TYPE_CHECKING, Any, List
+
+from loguru import logger
+
+from omu.connection import Address
+from omu.connection.transport_connection import TransportConnection
+from omu.event import EventJson
+
+if TYPE_CHECKING:
+    from omu.client import Client
+
+FRAME_HEADER = struct.Struct(">IB")
+FRAME_JSON = 0
+FRAME_BINARY = 1
+READ_SIZE = 1 << 16
+WRITE_HIGH_WATER = 1 << 20
+
+
+def encode_frame(type: str, serialized: Any) -> bytes:
+    if isinstance(serialized, (bytes, bytearray, memoryview)):
+        body = EventJson.to_binary(type, bytes(serialized))
+        return FRAME_HEADER.pack(len(body), FRAME_BINARY) + body
+    body = json.dumps({"type": type, "data": serialized}).encode("utf-8")
+    return FRAME_HEADER.pack(len(body), FRAME_JSON) + body
+
+
+def decode_frames(buffer: bytearray) -> List[EventJson]:
+    events: List[EventJson] = []
+    offset = 0
+    while len(buffer) - offset >= FRAME_HEADER.size:
+        length, kind = FRAME_HEADER.unpack_from(buffer, offset)
+        start = offset + FRAME_HEADER.size
+        if len(buffer) - start < length:
+            break
+        body = bytes(buffer[start : start + length])
+        offset = start + length
+        if kind == FRAME_BINARY:
+            events.append(EventJson.from_binary(body))
+        elif kind == FRAME_JSON:
+            events.append(EventJson.from_json(json.loads(body)))
+        else:
+            raise ValueError(f"Unknown frame kind {kind}")
+    del buffer[:offset]
+    return events
+
+
+class UnixSocketConnection(TransportConnection):
+    def __init__(self, client: Client, address: Address):
+        if address.path is None:
+            raise ValueError("UnixSocketConnection requires an address with a path")
+        super().__init__(client.app)
+        self._client = client
+        self._address = address
+        self._path = address.path
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._pending = bytearray()
+        self._flush_scheduled = False
+        self._backlogged = False
+
+    @property
+    def address(self) -> Address:
+        return self._address
+
+    async def _open(self) -> None:
+        self._reader, self._writer = await asyncio.open_unix_connection(self._path)
+        self._writer.transport.set_write_buffer_limits(high=WRITE_HIGH_WATER)
+        self._pending.clear()
+        self._backlogged = False
+        self._client.loop.create_task(self._listen(self._reader))
+
+    async def _listen(self, reader: asyncio.StreamReader) -> None:
+        buffer = bytearray()
+        try:
+            while True:
+                try:
+                    data = await reader.read(READ_SIZE)
+                except ConnectionError:
+                    break
+                if not data:
+                    break
+                buffer += data
+                try:
+                    events = decode_frames(buffer)
+                except (TypeError, ValueError) as e:
+                    logger.error(f"Failed to parse event: {e}")
+                    raise e
+                if events:
+                    self._client.loop.create_task(self._dispatch_all(events))
+        finally:
+            if self._reader is reader:
+                await self._lost()
+
+    async def _dispatch_all(self, events: List[EventJson]) -> None:
+        for event in events:
+            await self._dispatch(event)
+
+    async def _close(self) -> None:
+        if not self._writer:
+            return
+        self._flush()
+        writer = self._writer
+        self._reader = None
+        self._writer = None
+        if not writer.is_closing():
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _write(self, type: str, serialized: Any) -> None:
+        if not self._writer or self._writer.is_closing():
+            raise RuntimeError("Not connected")
+        self._pending += encode_frame(type, serialized)
+        if len(self._pending) > WRITE_HIGH_WATER:
+            self._flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._client.loop.call_soon(self._flush)
+        if self._backlogged:
+            self._backlogged = False
+            await self._writer.drain()
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        if not self._pending or not self._writer or self._writer.is_closing():
+            return
+        self._writer.write(bytes(self._pending))
+        self._pending.clear()
+        if self._writer.transport.get_write_buffer_size() > WRITE_HIGH_WATER:
+            self._backlogged = True
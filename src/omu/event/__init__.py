@@ -1,5 +1,5 @@
 from .event import EventJson, EventType, JsonEventType, SerializeEventType
-from .event_registry import EventRegistry, EventRegistryImpl
+from .event_registry import EventRegistry, EventRegistryImpl, EventTypeRegistry
 from .events import EVENTS
 
 __all__ = [
@@ -7,6 +7,7 @@ __all__ = [
     "EventType",
     "EventRegistry",
     "EventRegistryImpl",
+    "EventTypeRegistry",
     "EVENTS",
     "JsonEventType",
     "SerializeEventType",
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import abc
-from typing import TYPE_CHECKING, Dict, List, TypedDict
+import json
+import struct
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, TypedDict
 
 from omu.interface.serializable import Serializer
 
@@ -40,6 +42,30 @@ class EventJson[T]:
     def __repr__(self) -> str:
         return f"{self.type}:{self.data}"
 
+    @classmethod
+    def from_binary(cls, frame: bytes) -> EventJson[bytes]:
+        header, data = cls.split_binary(frame)
+        return cls(header["type"], data)
+
+    @staticmethod
+    def split_binary(frame: bytes) -> Tuple[Dict[str, Any], bytes]:
+        if len(frame) < HEADER_SIZE.size:
+            raise ValueError("Binary frame is too short")
+        (length,) = HEADER_SIZE.unpack_from(frame)
+        start = HEADER_SIZE.size
+        header = json.loads(frame[start : start + length])
+        if "type" not in header:
+            raise ValueError("Missing type field in binary frame header")
+        return header, frame[start + length :]
+
+    @staticmethod
+    def to_binary(type: str, data: bytes, **fields: Any) -> bytes:
+        header = json.dumps({"type": type, **fields}).encode("utf-8")
+        return HEADER_SIZE.pack(len(header)) + header + data
+
+
+HEADER_SIZE = struct.Struct(">I")
+
 
 class EventType[T, D](abc.ABC):
     @property
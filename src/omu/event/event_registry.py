@@ -35,38 +35,48 @@ class EventRegistry(abc.ABC):
         ...
 
 
-class EventEntry[T, D]:
-    def __init__(
-        self,
-        event_type: EventType[T, D],
-        listeners: List[EventListener[T]],
-    ):
-        self.event_type = event_type
-        self.listeners = listeners
+class EventTypeRegistry:
+    def __init__(self) -> None:
+        self._types: Dict[str, EventType] = {}
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def get(self, key: str) -> EventType | None:
+        return self._types.get(key)
+
+    def register(self, type: EventType) -> bool:
+        registered = self._types.get(type.type)
+        if registered is None:
+            self._types[type.type] = type
+            return True
+        if registered is not type:
+            raise ValueError(f"Event type {type.type} already registered")
+        return False
 
 
 class EventRegistryImpl(EventRegistry, ConnectionListener):
-    def __init__(self, client: Client):
+    def __init__(self, client: Client, types: EventTypeRegistry | None = None):
         client.connection.add_listener(self)
-        self._events: Dict[str, EventEntry] = {}
-        self._own_events: Dict[str, EventEntry] = {}
+        self._shared = types is not None
+        self._types = types if types is not None else EventTypeRegistry()
+        self._listeners: Dict[str, List[EventListener[Any]]] = {}
 
     def register(self, *types: EventType) -> None:
         for type in types:
-            if self._events.get(type.type):
+            if not self._types.register(type) and not self._shared:
                 raise ValueError(f"Event type {type.type} already registered")
-            self._events[type.type] = EventEntry(type, [])
 
     def add_listener[T](
         self,
         event_type: EventType[T, Any],
         listener: EventListener[T] | None = None,
     ) -> Callable[[EventListener[T]], None]:
-        if not self._events.get(event_type.type):
+        if not self._types.get(event_type.type):
             raise ValueError(f"Event type {event_type.type} not registered")
 
         def decorator(listener: EventListener[T]) -> None:
-            self._events[event_type.type].listeners.append(listener)
+            self._listeners.setdefault(event_type.type, []).append(listener)
 
         if listener:
             decorator(listener)
@@ -75,15 +85,18 @@ class EventRegistryImpl(EventRegistry, ConnectionListener):
     def remove_listener(
         self, event_type: EventType, listener: EventListener[Any]
     ) -> None:
-        if not self._events.get(event_type.type):
+        if not self._types.get(event_type.type):
             raise ValueError(f"Event type {event_type.type} not registered")
-        self._events[event_type.type].listeners.remove(listener)
+        self._listeners[event_type.type].remove(listener)
 
     async def on_event(self, event_json: EventJson) -> None:
-        event = self._events.get(event_json.type)
-        if not event:
+        event_type = self._types.get(event_json.type)
+        if not event_type:
             logger.warning(f"Received unknown event type {event_json.type}")
             return
-        data = event.event_type.serializer.deserialize(event_json.data)
-        for listener in event.listeners:
+        listeners = self._listeners.get(event_json.type)
+        if not listeners:
+            return
+        data = event_type.serializer.deserialize(event_json.data)
+        for listener in listeners:
             await listener(data)
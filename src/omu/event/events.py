@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Any, Dict, List, TypedDict
 
 from omu.event.event import JsonEventType, SerializeEventType
 from omu.extension.server.model.app import App
@@ -39,6 +39,11 @@ class DisconnectEvent(Model):
         )
 
 
+class BundleEntry(TypedDict):
+    type: str
+    data: Any
+
+
 class EVENTS:
     Connect = SerializeEventType(
         "",
@@ -60,3 +65,8 @@ class EVENTS:
         "ready",
         Serializer.noop(),
     )
+    Bundle = JsonEventType[List[BundleEntry]](
+        "",
+        "bundle",
+        Serializer.noop(),
+    )
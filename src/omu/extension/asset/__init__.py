@@ -0,0 +1,11 @@
+from .asset_extension import AssetExtension, AssetExtensionType
+from .asset_index import AssetIndex
+from .asset_manager import AssetUploadManager, AssetUploadStats
+
+__all__ = [
+    "AssetExtension",
+    "AssetExtensionType",
+    "AssetIndex",
+    "AssetUploadManager",
+    "AssetUploadStats",
+]
@@ -1,8 +1,23 @@
+import asyncio
 import base64
-from typing import Dict, List
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Dict, List, NotRequired, Set, TypedDict
 
 from omu.client.client import Client
 from omu.connection.connection import ConnectionListener
+from omu.event.event import JsonEventType, SerializeEventType
+from omu.extension.asset.asset_index import AssetIndex, hash_source
+from omu.extension.asset.asset_upload import (
+    AssetChunk,
+    AssetChunkSerializer,
+    AssetProgress,
+    AssetSource,
+    AssetUpload,
+    read_chunks,
+    resumable,
+    source_size,
+)
 from omu.extension.endpoint.endpoint import JsonEndpointType
 from omu.extension.extension import Extension, define_extension_type
 
@@ -15,15 +30,64 @@ AssetExtensionType = define_extension_type(
 
 type b64str = str
 
+
+class AssetBeginReq(TypedDict):
+    name: str
+    size: int | None
+    hash: NotRequired[str]
+
+
+class AssetAck(TypedDict):
+    id: str
+    offset: int
+
+
 AssetUploadEndpoint = JsonEndpointType[Dict[str, b64str], List[str]].of_extension(
     AssetExtensionType,
     "upload",
 )
+AssetBeginEndpoint = JsonEndpointType[AssetBeginReq, str].of_extension(
+    AssetExtensionType,
+    "begin",
+)
+AssetCommitEndpoint = JsonEndpointType[str, str].of_extension(
+    AssetExtensionType,
+    "commit",
+)
+AssetStatusEndpoint = JsonEndpointType[str, int | None].of_extension(
+    AssetExtensionType,
+    "status",
+)
+AssetHaveEndpoint = JsonEndpointType[List[str], Dict[str, str]].of_extension(
+    AssetExtensionType,
+    "have",
+)
+AssetCheckEndpoint = JsonEndpointType[Dict[str, str], List[str]].of_extension(
+    AssetExtensionType,
+    "check",
+)
+AssetChunkEvent = SerializeEventType[AssetChunk, bytes].of_extension(
+    AssetExtensionType,
+    "chunk",
+    AssetChunkSerializer(),
+)
+AssetAckEvent = JsonEventType[AssetAck].of_extension(
+    AssetExtensionType,
+    "ack",
+)
 
 
 class AssetExtension(Extension, ConnectionListener):
     def __init__(self, client: Client) -> None:
         self.client = client
+        self.chunk_size = 256 * 1024
+        self.window = 4 * self.chunk_size
+        self.concurrency = 4
+        self.index: AssetIndex | None = None
+        self.executor: Executor | None = None
+        self._uploads: Dict[str, AssetUpload] = {}
+        client.events.register(AssetChunkEvent, AssetAckEvent)
+        client.events.add_listener(AssetAckEvent, self._on_ack)
         client.connection.add_listener(self)
 
     async def upload(self, assets: Dict[str, bytes]) -> List[str]:
@@ -31,5 +95,173 @@ class AssetExtension(Extension, ConnectionListener):
             AssetUploadEndpoint, {k: self._encode(v) for k, v in assets.items()}
         )
 
+    async def upload_stream(
+        self,
+        name: str,
+        source: AssetSource,
+        size: int | None = None,
+        progress: AssetProgress | None = None,
+        hash: str | None = None,
+    ) -> str:
+        if size is None:
+            size = source_size(source)
+        upload = await self.begin(name, size, progress=progress, hash=hash)
+        return await self.transfer(upload, source)
+
+    async def begin(
+        self,
+        name: str,
+        size: int | None,
+        progress: AssetProgress | None = None,
+        hash: str | None = None,
+    ) -> AssetUpload:
+        req = AssetBeginReq(name=name, size=size)
+        if hash is not None:
+            req["hash"] = hash
+        id = await self.client.endpoints.call(AssetBeginEndpoint, req)
+        return AssetUpload(id, name, size, self.window, progress)
+
+    async def status(self, upload: AssetUpload) -> int | None:
+        offset = await self.client.endpoints.call(AssetStatusEndpoint, upload.id)
+        if offset is not None:
+            upload.resume(offset)
+        return offset
+
+    async def transfer(self, upload: AssetUpload, source: AssetSource) -> str:
+        if upload.sent and not resumable(source):
+            raise ValueError(f"Upload {upload.name} cannot resume from its source")
+        self._uploads[upload.id] = upload
+        try:
+            async for chunk in read_chunks(source, self.chunk_size, upload.sent):
+                await upload.wait_window(len(chunk))
+                await self.client.send(
+                    AssetChunkEvent, AssetChunk(upload.id, upload.sent, chunk)
+                )
+                upload.sent += len(chunk)
+            await upload.wait_acked()
+            return await self.client.endpoints.call(AssetCommitEndpoint, upload.id)
+        finally:
+            del self._uploads[upload.id]
+
+    async def upload_files(
+        self,
+        files: Dict[str, AssetSource],
+        progress: AssetProgress | None = None,
+    ) -> Dict[str, str]:
+        return await self._upload_all(files, {}, progress)
+
+    def set_index(self, path: str | Path | None) -> None:
+        self.index = AssetIndex(path) if path is not None else None
+
+    async def sync(
+        self,
+        files: Dict[str, AssetSource],
+        progress: AssetProgress | None = None,
+    ) -> Dict[str, str]:
+        hashes = dict(
+            zip(
+                files.keys(),
+                await asyncio.gather(
+                    *(hash_source(source, self.executor) for source in files.values())
+                ),
+            )
+        )
+        ids = await self._resolve({hash for hash in hashes.values() if hash})
+        uploads: Dict[str, AssetSource] = {}
+        pending: Set[str] = set()
+        for name, hash in hashes.items():
+            if hash in ids or hash in pending:
+                continue
+            if hash:
+                pending.add(hash)
+            uploads[name] = files[name]
+        uploaded = await self._upload_all(uploads, hashes, progress)
+        for name, id in uploaded.items():
+            hash = hashes[name]
+            if hash:
+                ids[hash] = id
+                self._remember(hash, id)
+        if self.index is not None:
+            await self.client.loop.run_in_executor(self.executor, self.index.save)
+        return {
+            name: uploaded[name] if name in uploaded else ids[hashes[name]]
+            for name in files.keys()
+        }
+
+    async def _resolve(self, hashes: Set[str]) -> Dict[str, str]:
+        hits: Dict[str, str] = {}
+        misses: List[str] = []
+        for hash in hashes:
+            id = self.index.get(hash) if self.index is not None else None
+            if id is None:
+                misses.append(hash)
+            else:
+                hits[id] = hash
+        checked, ids = await asyncio.gather(self._check(hits), self._have(misses))
+        stale = [hash for id, hash in hits.items() if id not in checked]
+        for hash in stale:
+            self._forget(hash)
+        ids.update(await self._have(stale))
+        ids.update({hits[id]: id for id in checked})
+        return ids
+
+    async def _check(self, hits: Dict[str, str]) -> List[str]:
+        if not hits:
+            return []
+        return await self.client.endpoints.call(AssetCheckEndpoint, hits)
+
+    async def _have(self, hashes: List[str]) -> Dict[str, str]:
+        if not hashes:
+            return {}
+        have = await self.client.endpoints.call(AssetHaveEndpoint, hashes)
+        for hash in hashes:
+            if hash in have:
+                self._remember(hash, have[hash])
+            else:
+                self._forget(hash)
+        return have
+
+    async def _upload_all(
+        self,
+        files: Dict[str, AssetSource],
+        hashes: Dict[str, str | None],
+        progress: AssetProgress | None,
+    ) -> Dict[str, str]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def upload(name: str, source: AssetSource) -> str:
+            async with semaphore:
+                return await self.upload_stream(
+                    name, source, progress=progress, hash=hashes.get(name)
+                )
+
+        tasks = [
+            asyncio.create_task(upload(name, source)) for name, source in files.items()
+        ]
+        try:
+            ids = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return dict(zip(files.keys(), ids))
+
+    def _remember(self, hash: str, id: str) -> None:
+        if self.index is not None:
+            self.index.put(hash, id)
+
+    def _forget(self, hash: str) -> None:
+        if self.index is not None:
+            self.index.remove(hash)
+
+    async def _on_ack(self, data: AssetAck) -> None:
+        upload = self._uploads.get(data["id"])
+        if upload:
+            upload.ack(data["offset"])
+
+    async def on_disconnected(self) -> None:
+        for upload in self._uploads.values():
+            upload.fail(ConnectionError("Disconnected"))
+
     def _encode(self, data: bytes) -> b64str:
         return base64.b64encode(data).decode("utf-8")
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Dict
+
+from .asset_upload import AssetSource
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class AssetIndex:
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._ids: Dict[str, str] = {}
+        self._hashes: Dict[str, str] = {}
+        self._dirty = False
+        if self.path.exists():
+            for hash, id in json.loads(self.path.read_text(encoding="utf-8")).items():
+                self.put(hash, id)
+            self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, hash: str) -> bool:
+        return hash in self._ids
+
+    def get(self, hash: str) -> str | None:
+        return self._ids.get(hash)
+
+    def put(self, hash: str, id: str) -> None:
+        if self._ids.get(hash) == id:
+            return
+        self.remove(hash)
+        stale = self._hashes.get(id)
+        if stale is not None:
+            self.remove(stale)
+        self._ids[hash] = id
+        self._hashes[id] = hash
+        self._dirty = True
+
+    def remove(self, hash: str) -> None:
+        id = self._ids.pop(hash, None)
+        if id is None:
+            return
+        if self._hashes.get(id) == hash:
+            del self._hashes[id]
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.path.with_suffix(self.path.suffix + ".tmp")
+        temp.write_text(json.dumps(self._ids), encoding="utf-8")
+        os.replace(temp, self.path)
+        self._dirty = False
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def hash_source(
+    source: AssetSource, executor: Executor | None = None
+) -> str | None:
+    loop = asyncio.get_running_loop()
+    if isinstance(source, bytes):
+        return await loop.run_in_executor(executor, hash_bytes, source)
+    if isinstance(source, (str, Path)):
+        return await loop.run_in_executor(executor, hash_file, source)
+    return None
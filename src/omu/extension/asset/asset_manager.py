@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Dict
+
+from omu.connection import ConnectionListener
+
+from .asset_upload import (
+    AssetProgress,
+    AssetSource,
+    AssetUpload,
+    resumable,
+    source_size,
+)
+
+if TYPE_CHECKING:
+    from .asset_extension import AssetExtension
+
+
+class AssetUploadStats:
+    def __init__(self) -> None:
+        self.files = 0
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.restarts = 0
+        self.bytes = 0
+        self.error: BaseException | None = None
+        self.started: float | None = None
+        self.finished: float | None = None
+
+    def elapsed(self, now: float) -> float:
+        if self.started is None:
+            return 0
+        return (self.finished or now) - self.started
+
+    def throughput(self, now: float) -> float:
+        elapsed = self.elapsed(now)
+        return self.bytes / elapsed if elapsed > 0 else 0
+
+    def __repr__(self) -> str:
+        return (
+            f"AssetUploadStats(files={self.files}, completed={self.completed}, "
+            f"failed={self.failed}, retries={self.retries}, "
+            f"restarts={self.restarts}, bytes={self.bytes})"
+        )
+
+
+class AssetUploadManager(ConnectionListener):
+    def __init__(
+        self,
+        assets: AssetExtension,
+        concurrency: int = 4,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30,
+    ):
+        self.assets = assets
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stats = AssetUploadStats()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._connected = asyncio.Event()
+        if assets.client.connection.connected:
+            self._connected.set()
+        assets.client.connection.add_listener(self)
+
+    def close(self) -> None:
+        self.assets.client.connection.remove_listener(self)
+
+    @property
+    def throughput(self) -> float:
+        return self.stats.throughput(self.assets.client.loop.time())
+
+    async def upload(
+        self,
+        files: Dict[str, AssetSource],
+        progress: AssetProgress | None = None,
+    ) -> Dict[str, str]:
+        loop = self.assets.client.loop
+        if self.stats.started is None or self.stats.finished is not None:
+            self.stats.started = loop.time()
+            self.stats.finished = None
+        self.stats.files += len(files)
+        try:
+            ids = await asyncio.gather(
+                *(
+                    self._upload(name, source, progress)
+                    for name, source in files.items()
+                )
+            )
+        finally:
+            self.stats.finished = loop.time()
+        return dict(zip(files.keys(), ids))
+
+    async def _upload(
+        self, name: str, source: AssetSource, progress: AssetProgress | None
+    ) -> str:
+        counted = 0
+
+        def track(name: str, offset: int, size: int | None) -> None:
+            nonlocal counted
+            if offset > counted:
+                self.stats.bytes += offset - counted
+                counted = offset
+            if progress:
+                progress(name, offset, size)
+
+        async with self._semaphore:
+            upload: AssetUpload | None = None
+            attempt = 0
+            while True:
+                try:
+                    await self._connected.wait()
+                    if upload is not None and self._rejected(upload):
+                        upload = None
+                        self.stats.restarts += 1
+                    if upload is not None:
+                        offset = await self.assets.status(upload)
+                        if offset is None:
+                            upload = None
+                            self.stats.restarts += 1
+                    if upload is None:
+                        upload = await self.assets.begin(
+                            name, source_size(source), progress=track
+                        )
+                    id = await self.assets.transfer(upload, source)
+                    self.stats.completed += 1
+                    return id
+                except Exception as e:
+                    self.stats.error = e
+                    if attempt >= self.retries or not self._retryable(upload, source):
+                        self.stats.failed += 1
+                        raise
+                    attempt += 1
+                    self.stats.retries += 1
+                    delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+                    await asyncio.sleep(delay)
+
+    def _rejected(self, upload: AssetUpload) -> bool:
+        return upload.size is not None and upload.acked >= upload.size
+
+    def _retryable(self, upload: AssetUpload | None, source: AssetSource) -> bool:
+        return upload is None or resumable(source)
+
+    async def on_connected(self) -> None:
+        self._connected.set()
+
+    async def on_disconnected(self) -> None:
+        self._connected.clear()
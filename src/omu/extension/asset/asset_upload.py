@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import struct
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Callable
+
+from omu.interface import Serializable
+
+type AssetSource = bytes | str | Path | AsyncIterable[bytes]
+type AssetProgress = Callable[[str, int, int | None], None]
+
+CHUNK_HEADER = struct.Struct(">HQ")
+
+
+class AssetChunk:
+    def __init__(self, upload: str, offset: int, data: bytes):
+        self.upload = upload
+        self.offset = offset
+        self.data = data
+
+
+class AssetChunkSerializer(Serializable[AssetChunk, bytes]):
+    def serialize(self, item: AssetChunk) -> bytes:
+        upload = item.upload.encode("utf-8")
+        return CHUNK_HEADER.pack(len(upload), item.offset) + upload + item.data
+
+    def deserialize(self, item: bytes) -> AssetChunk:
+        length, offset = CHUNK_HEADER.unpack_from(item)
+        start = CHUNK_HEADER.size
+        upload = item[start : start + length].decode("utf-8")
+        return AssetChunk(upload, offset, item[start + length :])
+
+
+class AssetUpload:
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        size: int | None,
+        window: int,
+        progress: AssetProgress | None = None,
+    ):
+        self.id = id
+        self.name = name
+        self.size = size
+        self.window = window
+        self.progress = progress
+        self.sent = 0
+        self.acked = 0
+        self._error: BaseException | None = None
+        self._changed = asyncio.Event()
+
+    def ack(self, offset: int) -> None:
+        if offset <= self.acked:
+            return
+        self.acked = offset
+        self._changed.set()
+        if self.progress:
+            self.progress(self.name, self.acked, self.size)
+
+    def resume(self, offset: int) -> None:
+        self.sent = offset
+        self.acked = offset
+        self._error = None
+
+    def fail(self, error: BaseException) -> None:
+        self._error = error
+        self._changed.set()
+
+    async def wait_window(self, size: int) -> None:
+        while self.sent + size - self.acked > self.window and self.acked < self.sent:
+            await self._wait()
+
+    async def wait_acked(self) -> None:
+        while self.acked < self.sent:
+            await self._wait()
+
+    async def _wait(self) -> None:
+        if self._error:
+            raise self._error
+        self._changed.clear()
+        await self._changed.wait()
+        if self._error:
+            raise self._error
+
+
+def resumable(source: AssetSource) -> bool:
+    return isinstance(source, (bytes, str, Path))
+
+
+def source_size(source: AssetSource) -> int | None:
+    if isinstance(source, bytes):
+        return len(source)
+    if isinstance(source, (str, Path)):
+        return Path(source).stat().st_size
+    return None
+
+
+async def read_chunks(
+    source: AssetSource,
+    chunk_size: int,
+    offset: int = 0,
+) -> AsyncIterator[bytes]:
+    if isinstance(source, bytes):
+        view = memoryview(source)
+        for start in range(offset, len(source), chunk_size):
+            yield bytes(view[start : start + chunk_size])
+        return
+    if isinstance(source, (str, Path)):
+        async for chunk in _read_file(Path(source), chunk_size, offset):
+            yield chunk
+        return
+    buffer = bytearray()
+    skip = offset
+    async for data in source:
+        if skip:
+            taken = min(skip, len(data))
+            data = data[taken:]
+            skip -= taken
+        buffer.extend(data)
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+async def _read_file(path: Path, chunk_size: int, offset: int) -> AsyncIterator[bytes]:
+    loop = asyncio.get_running_loop()
+    file = await loop.run_in_executor(None, path.open, "rb")
+    try:
+        await loop.run_in_executor(None, file.seek, offset)
+        while True:
+            chunk = await loop.run_in_executor(None, file.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        await loop.run_in_executor(None, file.close)
@@ -1,11 +1,25 @@
-from .endpoint import Endpoint, EndpointType, JsonEndpointType, SerializeEndpointType
-from .endpoint_extension import EndpointExtension, EndpointExtensionType
+from .endpoint import (
+    Endpoint,
+    EndpointPolicy,
+    EndpointType,
+    JsonEndpointType,
+    SerializeEndpointType,
+)
+from .endpoint_extension import (
+    EndpointBusyError,
+    EndpointExtension,
+    EndpointExtensionType,
+)
+from .endpoint_scheduler import EndpointStats
 
 __all__ = [
     "JsonEndpointType",
     "SerializeEndpointType",
     "Endpoint",
+    "EndpointPolicy",
     "EndpointType",
+    "EndpointBusyError",
     "EndpointExtension",
+    "EndpointStats",
     "EndpointExtensionType",
 ]
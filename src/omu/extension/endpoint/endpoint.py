@@ -10,12 +10,31 @@ from omu.extension.server.model.app import App
 from omu.interface import Serializable, Serializer
 
 
+class EndpointPolicy:
+    def __init__(
+        self,
+        idempotent: bool = False,
+        ttl: float | None = None,
+        max_size: int = 256,
+    ):
+        self.idempotent = idempotent
+        self.ttl = ttl
+        self.max_size = max_size
+
+
+DEFAULT_POLICY = EndpointPolicy()
+
+
 class EndpointType[Req, Res, ReqData, ResData](abc.ABC):
     @property
     @abc.abstractmethod
     def info(self) -> EndpointInfo:
         ...
 
+    @property
+    def policy(self) -> EndpointPolicy:
+        return DEFAULT_POLICY
+
     @property
     @abc.abstractmethod
     def request_serializer(self) -> Serializable[Req, ReqData]:
@@ -33,10 +52,12 @@ class SerializeEndpointType[Req, Res](EndpointType[Req, Res, Any, Any]):
         info: EndpointInfo,
         request_serializer: Serializable[Req, Any] | None = None,
         response_serializer: Serializable[Res, Any] | None = None,
+        policy: EndpointPolicy | None = None,
     ):
         self._info = info
         self._request_serializer = request_serializer or Serializer.noop()
         self._response_serializer = response_serializer or Serializer.noop()
+        self._policy = policy or DEFAULT_POLICY
 
     @classmethod
     def of(
@@ -45,11 +66,13 @@ class SerializeEndpointType[Req, Res](EndpointType[Req, Res, Any, Any]):
         name: str,
         request_serializer: Serializable[Req, Any] | None = None,
         response_serializer: Serializable[Res, Any] | None = None,
+        policy: EndpointPolicy | None = None,
     ):
         return cls(
             info=EndpointInfo(app.key(), name),
             request_serializer=request_serializer,
             response_serializer=response_serializer,
+            policy=policy,
         )
 
     @classmethod
@@ -59,11 +82,13 @@ class SerializeEndpointType[Req, Res](EndpointType[Req, Res, Any, Any]):
         name: str,
         request_serializer: Serializable[Req, Any] | None = None,
         response_serializer: Serializable[Res, Any] | None = None,
+        policy: EndpointPolicy | None = None,
     ):
         return cls(
             info=EndpointInfo(extension.key, name),
             request_serializer=request_serializer,
             response_serializer=response_serializer,
+            policy=policy,
         )
 
     @property
@@ -78,16 +103,22 @@ class SerializeEndpointType[Req, Res](EndpointType[Req, Res, Any, Any]):
     def response_serializer(self) -> Serializable[Res, Any]:
         return self._response_serializer
 
+    @property
+    def policy(self) -> EndpointPolicy:
+        return self._policy
+
 
 class JsonEndpointType[Req, Res](SerializeEndpointType[Req, Res]):
     def __init__(
         self,
         info: EndpointInfo,
+        policy: EndpointPolicy | None = None,
     ):
         super().__init__(
             info,
             request_serializer=Serializer.noop(),
             response_serializer=Serializer.noop(),
+            policy=policy,
         )
 
     @classmethod
@@ -95,9 +126,11 @@ class JsonEndpointType[Req, Res](SerializeEndpointType[Req, Res]):
         cls,
         app: App,
         name: str,
+        policy: EndpointPolicy | None = None,
     ):
         return cls(
             info=EndpointInfo(app.key(), name),
+            policy=policy,
         )
 
     @classmethod
@@ -105,9 +138,11 @@ class JsonEndpointType[Req, Res](SerializeEndpointType[Req, Res]):
         cls,
         extension: ExtensionType,
         name: str,
+        policy: EndpointPolicy | None = None,
     ):
         return cls(
             info=EndpointInfo(extension.key, name),
+            policy=policy,
         )
 
 
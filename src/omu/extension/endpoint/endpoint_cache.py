@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Tuple
+
+
+def request_key(data: Any) -> str:
+    return json.dumps(data, sort_keys=True, separators=(",", ":"))
+
+
+class EndpointCache:
+    def __init__(self) -> None:
+        self._entries: Dict[str, Dict[str, Tuple[float, Any]]] = {}
+
+    def get(self, type: str, key: str, now: float) -> Tuple[bool, Any]:
+        entries = self._entries.get(type)
+        if not entries or key not in entries:
+            return False, None
+        expires, value = entries.pop(key)
+        if expires <= now:
+            return False, None
+        entries[key] = (expires, value)
+        return True, value
+
+    def put(self, type: str, key: str, value: Any, expires: float, max_size: int):
+        entries = self._entries.setdefault(type, {})
+        entries.pop(key, None)
+        entries[key] = (expires, value)
+        while len(entries) > max_size:
+            del entries[next(iter(entries))]
+
+    def invalidate(self, type: str, key: str | None = None) -> None:
+        if key is None:
+            self._entries.pop(type, None)
+            return
+        entries = self._entries.get(type)
+        if entries:
+            entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -1,12 +1,33 @@
 from __future__ import annotations
 
+import asyncio
 from asyncio import Future
-from typing import Any, Awaitable, Callable, Dict, Tuple, TypedDict
+from concurrent.futures import Executor
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NotRequired,
+    Tuple,
+    TypedDict,
+)
 
 from omu.client import Client
-from omu.connection import ConnectionListener
+from omu.connection import ConnectionListener, SubscriptionManifest
 from omu.event.event import JsonEventType, SerializeEventType
 from omu.extension.endpoint.endpoint import EndpointType, JsonEndpointType
+from omu.extension.endpoint.endpoint_cache import EndpointCache, request_key
+from omu.extension.endpoint.endpoint_scheduler import (
+    EndpointScheduler,
+    EndpointStats,
+    ServedEndpoint,
+)
+from omu.extension.endpoint.endpoint_stream import EndpointStream, StreamCredit
 from omu.extension.endpoint.model.endpoint_info import EndpointInfo
 from omu.extension.extension import Extension, define_extension_type
 from omu.extension.table.table import ModelTableType
@@ -21,41 +42,114 @@ EndpointExtensionType = define_extension_type(
 type Coro[**P, R] = Callable[P, Awaitable[R]]
 
 
+class EndpointBusyError(Exception):
+    pass
+
+
+class EndpointPromise:
+    def __init__(self, type: str, future: Future) -> None:
+        self.type = type
+        self.future = future
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class EndpointFlight:
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.callers = 0
+
+
 class EndpointExtension(Extension, ConnectionListener):
     def __init__(self, client: Client) -> None:
         self.client = client
-        self.promises: Dict[int, Future] = {}
-        self.endpoints: Dict[str, Tuple[EndpointType, Coro[[Any], Any]]] = {}
+        self.promises: Dict[int, EndpointPromise] = {}
+        self.endpoints: Dict[str, ServedEndpoint] = {}
+        self.scheduler = EndpointScheduler()
         self.call_id = 0
+        self.timeout: float | None = None
+        self._serving: Dict[Tuple[str, int], asyncio.Task] = {}
+        self._streams: Dict[int, EndpointStream] = {}
+        self._credits: Dict[Tuple[str, int], StreamCredit] = {}
+        self._cache = EndpointCache()
+        self._inflight: Dict[Tuple[str, str], EndpointFlight] = {}
+        self._generation = 0
         client.events.register(
-            EndpointCallEvent, EndpointReceiveEvent, EndpointErrorEvent
+            EndpointCallEvent,
+            EndpointReceiveEvent,
+            EndpointErrorEvent,
+            EndpointCancelEvent,
+            EndpointCallBatchEvent,
+            EndpointReceiveBatchEvent,
+            EndpointStreamCallEvent,
+            EndpointStreamChunkEvent,
+            EndpointStreamEndEvent,
+            EndpointStreamCreditEvent,
         )
         client.events.add_listener(EndpointReceiveEvent, self._on_receive)
+        client.events.add_listener(EndpointReceiveBatchEvent, self._on_receive_batch)
         client.events.add_listener(EndpointErrorEvent, self._on_error)
         client.events.add_listener(EndpointCallEvent, self._on_call)
+        client.events.add_listener(EndpointCancelEvent, self._on_cancel)
+        client.events.add_listener(EndpointStreamCallEvent, self._on_stream_call)
+        client.events.add_listener(EndpointStreamChunkEvent, self._on_stream_chunk)
+        client.events.add_listener(EndpointStreamEndEvent, self._on_stream_end)
+        client.events.add_listener(EndpointStreamCreditEvent, self._on_stream_credit)
         client.connection.add_listener(self)
 
     async def _on_receive(self, data: EndpointDataReq) -> None:
-        if data["id"] not in self.promises:
+        promise = self._settle(data["id"])
+        if promise is None or promise.future.done():
             return
-        future = self.promises[data["id"]]
-        future.set_result(data["data"])
-        self.promises.pop(data["id"])
+        promise.future.set_result(data["data"])
 
     async def _on_error(self, data: EndpointError) -> None:
-        if data["id"] not in self.promises:
+        stream = self._streams.get(data["id"])
+        if stream:
+            stream.finish(self._error(data))
+            return
+        promise = self._settle(data["id"])
+        if promise is None or promise.future.done():
             return
-        future = self.promises[data["id"]]
-        future.set_exception(Exception(data["error"]))
+        promise.future.set_exception(self._error(data))
+
+    def _error(self, data: EndpointError) -> Exception:
+        if data.get("code") == "busy":
+            return EndpointBusyError(data["error"])
+        return Exception(data["error"])
+
+    async def _on_receive_batch(self, data: EndpointBatchReceive) -> None:
+        for item in data["items"]:
+            await self._on_receive(item)
+        for error in data["errors"]:
+            await self._on_error(error)
 
     async def _on_call(self, data: EndpointDataReq) -> None:
-        if data["type"] not in self.endpoints:
+        served = self.endpoints.get(data["type"])
+        if served is None:
             return
-        endpoint, func = self.endpoints[data["type"]]
+        key = (data["type"], data["id"])
+        task = self.client.loop.create_task(self._serve(served, data))
+        self._serving[key] = task
         try:
-            req = endpoint.request_serializer.deserialize(data["data"])
-            res = await func(req)
-            json = endpoint.response_serializer.serialize(res)
+            await task
+        except asyncio.CancelledError:
+            return
+        finally:
+            self._serving.pop(key, None)
+
+    async def _serve(self, served: ServedEndpoint, data: EndpointDataReq) -> None:
+        started = await self._admit(served, data)
+        if started is None:
+            return
+        try:
+            if served.executor is None:
+                req = served.type.request_serializer.deserialize(data["data"])
+                res = await served.func(req)
+                json = served.type.response_serializer.serialize(res)
+            else:
+                json = await self.client.loop.run_in_executor(
+                    served.executor, execute_endpoint, served.type, served.func, data
+                )
             await self.client.send(
                 EndpointReceiveEvent,
                 EndpointDataReq(type=data["type"], id=data["id"], data=json),
@@ -66,20 +160,154 @@ class EndpointExtension(Extension, ConnectionListener):
                 EndpointError(type=data["type"], id=data["id"], error=str(e)),
             )
             raise e
+        finally:
+            served.stats.record_execution(self.client.loop.time() - started)
+            self.scheduler.release(served)
+
+    async def _admit(
+        self, served: ServedEndpoint, data: EndpointDataReq
+    ) -> float | None:
+        arrived = self.client.loop.time()
+        if not await self.scheduler.acquire(served):
+            served.stats.rejected += 1
+            await self.client.send(
+                EndpointErrorEvent,
+                EndpointError(
+                    type=data["type"],
+                    id=data["id"],
+                    error=f"Endpoint {data['type']} is busy",
+                    code="busy",
+                ),
+            )
+            return None
+        started = self.client.loop.time()
+        served.stats.record_wait(started - arrived)
+        return started
+
+    async def _on_stream_call(self, data: EndpointStreamReq) -> None:
+        served = self.endpoints.get(data["type"])
+        if served is None:
+            return
+        key = (data["type"], data["id"])
+        self._credits[key] = StreamCredit(data["window"])
+        task = self.client.loop.create_task(self._serve_stream(served, data))
+        self._serving[key] = task
+        try:
+            await task
+        except asyncio.CancelledError:
+            return
+        finally:
+            self._serving.pop(key, None)
+            self._credits.pop(key, None)
+
+    async def _serve_stream(
+        self, served: ServedEndpoint, data: EndpointStreamReq
+    ) -> None:
+        key = (data["type"], data["id"])
+        started = await self._admit(
+            served, EndpointDataReq(type=data["type"], id=data["id"], data=data["data"])
+        )
+        if started is None:
+            return
+        try:
+            req = served.type.request_serializer.deserialize(data["data"])
+            chunks: AsyncIterator[Any] = served.func(req)
+            seq = 0
+            async for chunk in chunks:
+                await self._credits[key].acquire()
+                await self.client.send(
+                    EndpointStreamChunkEvent,
+                    EndpointStreamChunk(
+                        type=data["type"],
+                        id=data["id"],
+                        seq=seq,
+                        data=served.type.response_serializer.serialize(chunk),
+                    ),
+                )
+                seq += 1
+            await self.client.send(
+                EndpointStreamEndEvent, EndpointReq(type=data["type"], id=data["id"])
+            )
+        except Exception as e:
+            await self.client.send(
+                EndpointErrorEvent,
+                EndpointError(type=data["type"], id=data["id"], error=str(e)),
+            )
+            raise e
+        finally:
+            served.stats.record_execution(self.client.loop.time() - started)
+            self.scheduler.release(served)
 
-    async def on_connected(self) -> None:
-        for endpoint, func in self.endpoints.values():
-            await self.client.send(EndpointRegisterEvent, endpoint.info)
+    async def _on_stream_credit(self, data: EndpointStreamCreditReq) -> None:
+        credit = self._credits.get((data["type"], data["id"]))
+        if credit:
+            credit.grant(data["credit"])
+
+    async def _on_stream_chunk(self, data: EndpointStreamChunk) -> None:
+        stream = self._streams.get(data["id"])
+        if stream:
+            stream.feed(data["data"])
+
+    async def _on_stream_end(self, data: EndpointReq) -> None:
+        stream = self._streams.get(data["id"])
+        if stream:
+            stream.finish()
+
+    async def _on_cancel(self, data: EndpointReq) -> None:
+        task = self._serving.pop((data["type"], data["id"]), None)
+        if task:
+            task.cancel()
+
+    async def on_manifest(self, manifest: SubscriptionManifest) -> None:
+        for served in self.endpoints.values():
+            manifest.add(EndpointRegisterEvent, served.type.info)
+
+    async def on_disconnected(self) -> None:
+        for id in list(self.promises.keys()):
+            promise = self._settle(id)
+            if promise and not promise.future.done():
+                promise.future.set_exception(ConnectionError("Disconnected"))
+        for stream in self._streams.values():
+            stream.finish(ConnectionError("Disconnected"))
+        for task in self._serving.values():
+            task.cancel()
+        self._serving.clear()
+        self._credits.clear()
 
     def register[Req, Res](
-        self, type: EndpointType[Req, Res, Any, Any], func: Coro[[Req], Res]
+        self,
+        type: EndpointType[Req, Res, Any, Any],
+        func: Coro[[Req], Res] | Callable[[Req], Res],
+        concurrency: int | None = None,
+        queue_size: int = 64,
+        priority: int = 0,
+        executor: Executor | None = None,
     ) -> None:
         if type.info.key() in self.endpoints:
             raise Exception(f"Endpoint for key {type.info.key()} already registered")
-        self.endpoints[type.info.key()] = (type, func)
+        self.endpoints[type.info.key()] = ServedEndpoint(
+            type,
+            func,
+            concurrency=concurrency,
+            queue_size=queue_size,
+            priority=priority,
+            executor=executor,
+        )
+
+    def stats(self, type: EndpointType[Any, Any, Any, Any]) -> EndpointStats:
+        if type.info.key() not in self.endpoints:
+            raise Exception(f"Endpoint for key {type.info.key()} not registered")
+        return self.endpoints[type.info.key()].stats
 
     def listen(
-        self, func: Coro | None = None, name: str | None = None, app: str | None = None
+        self,
+        func: Coro | None = None,
+        name: str | None = None,
+        app: str | None = None,
+        concurrency: int | None = None,
+        queue_size: int = 64,
+        priority: int = 0,
+        executor: Executor | None = None,
     ) -> Callable[[Coro], Coro]:
         def decorator(func: Coro) -> Coro:
             info = EndpointInfo(
@@ -88,7 +316,14 @@ class EndpointExtension(Extension, ConnectionListener):
                 description=getattr(func, "__doc__", ""),
             )
             type = JsonEndpointType(info)
-            self.register(type, func)
+            self.register(
+                type,
+                func,
+                concurrency=concurrency,
+                queue_size=queue_size,
+                priority=priority,
+                executor=executor,
+            )
             return func
 
         if func:
@@ -96,26 +331,252 @@ class EndpointExtension(Extension, ConnectionListener):
         return decorator
 
     async def call[Req, Res](
-        self, endpoint: EndpointType[Req, Res, Any, Any], data: Req
+        self,
+        endpoint: EndpointType[Req, Res, Any, Any],
+        data: Req,
+        timeout: float | None = None,
     ) -> Res:
         try:
-            future = await self._call(endpoint, data)
-            return endpoint.response_serializer.deserialize(await future)
+            json = endpoint.request_serializer.serialize(data)
+            if endpoint.policy.idempotent:
+                res = await self._call_shared(endpoint, json, timeout)
+                return endpoint.response_serializer.deserialize(res)
+            id, future = await self._call(
+                endpoint.info.key(), json, self._timeout(timeout)
+            )
+            try:
+                res = await future
+            except asyncio.CancelledError:
+                self._cancel(id)
+                raise
+            return endpoint.response_serializer.deserialize(res)
         except Exception as e:
             raise Exception(f"Error calling endpoint {endpoint.info.key()}") from e
 
-    async def _call[Req, ResData](
-        self, endpoint: EndpointType[Req, Any, Any, ResData], data: Req
-    ) -> Future[ResData]:
+    async def stream[Req, Res](
+        self,
+        endpoint: EndpointType[Req, Res, Any, Any],
+        data: Req,
+        window: int = 16,
+    ) -> AsyncGenerator[Res, None]:
+        if window < 1:
+            raise ValueError("Stream window must be at least 1")
+        type = endpoint.info.key()
         self.call_id += 1
-        future = Future()
-        self.promises[self.call_id] = future
-        json = endpoint.request_serializer.serialize(data)
-        await self.client.send(
-            EndpointCallEvent,
-            EndpointDataReq(type=endpoint.info.key(), id=self.call_id, data=json),
+        id = self.call_id
+        stream = EndpointStream(window)
+        self._streams[id] = stream
+        try:
+            await self.client.send(
+                EndpointStreamCallEvent,
+                EndpointStreamReq(
+                    type=type,
+                    id=id,
+                    data=endpoint.request_serializer.serialize(data),
+                    window=window,
+                ),
+            )
+            consumed = 0
+            while True:
+                try:
+                    chunk = await stream.next()
+                except StopAsyncIteration:
+                    return
+                except Exception as e:
+                    raise Exception(f"Error streaming endpoint {type}") from e
+                yield endpoint.response_serializer.deserialize(chunk)
+                consumed += 1
+                if consumed >= (window + 1) // 2 and not stream.done:
+                    await self.client.send(
+                        EndpointStreamCreditEvent,
+                        EndpointStreamCreditReq(type=type, id=id, credit=consumed),
+                    )
+                    consumed = 0
+        finally:
+            del self._streams[id]
+            if not stream.done:
+                stream.finish()
+                self.client.loop.create_task(self._send_cancel(type, id))
+
+    def invalidate(
+        self, endpoint: EndpointType[Any, Any, Any, Any], *data: Any
+    ) -> None:
+        type = endpoint.info.key()
+        self._generation += 1
+        if not data:
+            self._cache.invalidate(type)
+            for key in [key for key in self._inflight.keys() if key[0] == type]:
+                del self._inflight[key]
+            return
+        for item in data:
+            key = request_key(endpoint.request_serializer.serialize(item))
+            self._cache.invalidate(type, key)
+            self._inflight.pop((type, key), None)
+
+    def invalidate_all(self) -> None:
+        self._generation += 1
+        self._inflight.clear()
+        self._cache.clear()
+
+    async def _call_shared(
+        self,
+        endpoint: EndpointType[Any, Any, Any, Any],
+        json: Any,
+        timeout: float | None = None,
+    ) -> Any:
+        type = endpoint.info.key()
+        key = request_key(json)
+        policy = endpoint.policy
+        if policy.ttl is not None:
+            hit, value = self._cache.get(type, key, self.client.loop.time())
+            if hit:
+                return value
+        flight = self._inflight.get((type, key))
+        if flight is None:
+            flight = EndpointFlight(
+                self.client.loop.create_task(self._call_raw(type, json))
+            )
+            self._inflight[(type, key)] = flight
+            generation = self._generation
+
+            def land(task: asyncio.Task) -> None:
+                if (entry := self._inflight.get((type, key))) and entry.task is task:
+                    del self._inflight[(type, key)]
+                if policy.ttl is None or task.cancelled() or task.exception():
+                    return
+                if self._generation != generation:
+                    return
+                expires = self.client.loop.time() + policy.ttl
+                self._cache.put(type, key, task.result(), expires, policy.max_size)
+
+            flight.task.add_done_callback(land)
+        flight.callers += 1
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(flight.task), self._timeout(timeout)
+            )
+        finally:
+            flight.callers -= 1
+            if flight.callers == 0 and not flight.task.done():
+                if self._inflight.get((type, key)) is flight:
+                    del self._inflight[(type, key)]
+                flight.task.cancel()
+
+    async def _call_raw(self, type: str, json: Any) -> Any:
+        id, future = await self._call(type, json)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            self._cancel(id)
+            raise
+
+    async def call_batch(
+        self,
+        calls: Iterable[Tuple[EndpointType[Any, Any, Any, Any], Any]],
+        timeout: float | None = None,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        calls = list(calls)
+        if not calls:
+            return []
+        requests: List[EndpointDataReq] = []
+        futures: List[Future] = []
+        for endpoint, data in calls:
+            json = endpoint.request_serializer.serialize(data)
+            req, future = self._request(
+                endpoint.info.key(), json, self._timeout(timeout)
+            )
+            requests.append(req)
+            futures.append(future)
+        try:
+            await self.client.send(EndpointCallBatchEvent, requests)
+        except Exception as e:
+            for req in requests:
+                self._settle(req["id"])
+            raise e
+        try:
+            results = await asyncio.gather(*futures, return_exceptions=True)
+        except asyncio.CancelledError:
+            for req in requests:
+                self._cancel(req["id"])
+            raise
+        responses: List[Any] = []
+        for (endpoint, _), result in zip(calls, results):
+            if isinstance(result, BaseException):
+                if not return_exceptions:
+                    raise Exception(
+                        f"Error calling endpoint {endpoint.info.key()}"
+                    ) from result
+                responses.append(result)
+                continue
+            responses.append(endpoint.response_serializer.deserialize(result))
+        return responses
+
+    async def _call(
+        self, type: str, json: Any, timeout: float | None = None
+    ) -> Tuple[int, Future]:
+        req, future = self._request(type, json, timeout)
+        try:
+            await self.client.send(EndpointCallEvent, req)
+        except Exception as e:
+            self._settle(req["id"])
+            raise e
+        return req["id"], future
+
+    def _request(
+        self, type: str, json: Any, timeout: float | None = None
+    ) -> Tuple[EndpointDataReq, Future]:
+        self.call_id += 1
+        promise = self._promise(self.call_id, type, timeout)
+        req = EndpointDataReq(type=type, id=self.call_id, data=json)
+        return req, promise.future
+
+    def _timeout(self, timeout: float | None) -> float | None:
+        return self.timeout if timeout is None else timeout
+
+    def _promise(self, id: int, type: str, timeout: float | None) -> EndpointPromise:
+        promise = EndpointPromise(type, self.client.loop.create_future())
+        if timeout is not None:
+            promise.timer = self.client.loop.call_later(timeout, self._expire, id)
+        self.promises[id] = promise
+        return promise
+
+    def _settle(self, id: int) -> EndpointPromise | None:
+        promise = self.promises.pop(id, None)
+        if promise and promise.timer:
+            promise.timer.cancel()
+        return promise
+
+    def _expire(self, id: int) -> None:
+        promise = self._settle(id)
+        if promise is None or promise.future.done():
+            return
+        promise.future.set_exception(
+            TimeoutError(f"Endpoint {promise.type} call {id} timed out")
         )
-        return future
+        self.client.loop.create_task(self._send_cancel(promise.type, id))
+
+    def _cancel(self, id: int) -> None:
+        promise = self._settle(id)
+        if promise is None:
+            return
+        promise.future.cancel()
+        self.client.loop.create_task(self._send_cancel(promise.type, id))
+
+    async def _send_cancel(self, type: str, id: int) -> None:
+        if not self.client.connection.connected:
+            return
+        await self.client.send(EndpointCancelEvent, EndpointReq(type=type, id=id))
+
+
+def execute_endpoint(
+    type: EndpointType[Any, Any, Any, Any],
+    func: Callable[[Any], Any],
+    data: EndpointDataReq,
+) -> Any:
+    req = type.request_serializer.deserialize(data["data"])
+    res = func(req)
+    return type.response_serializer.serialize(res)
 
 
 class EndpointReq(TypedDict):
@@ -133,6 +594,32 @@ class EndpointError(TypedDict):
     type: str
     id: int
     error: str
+    code: NotRequired[str]
+
+
+class EndpointStreamReq(TypedDict):
+    type: str
+    id: int
+    data: Any
+    window: int
+
+
+class EndpointStreamChunk(TypedDict):
+    type: str
+    id: int
+    seq: int
+    data: Any
+
+
+class EndpointStreamCreditReq(TypedDict):
+    type: str
+    id: int
+    credit: int
+
+
+class EndpointBatchReceive(TypedDict):
+    items: List[EndpointDataReq]
+    errors: List[EndpointError]
 
 
 EndpointRegisterEvent = SerializeEventType.of_extension(
@@ -152,6 +639,34 @@ EndpointErrorEvent = JsonEventType[EndpointError].of_extension(
     EndpointExtensionType,
     "error",
 )
+EndpointCancelEvent = JsonEventType[EndpointReq].of_extension(
+    EndpointExtensionType,
+    "cancel",
+)
+EndpointCallBatchEvent = JsonEventType[List[EndpointDataReq]].of_extension(
+    EndpointExtensionType,
+    "call_batch",
+)
+EndpointReceiveBatchEvent = JsonEventType[EndpointBatchReceive].of_extension(
+    EndpointExtensionType,
+    "receive_batch",
+)
+EndpointStreamCallEvent = JsonEventType[EndpointStreamReq].of_extension(
+    EndpointExtensionType,
+    "stream_call",
+)
+EndpointStreamChunkEvent = JsonEventType[EndpointStreamChunk].of_extension(
+    EndpointExtensionType,
+    "stream_chunk",
+)
+EndpointStreamEndEvent = JsonEventType[EndpointReq].of_extension(
+    EndpointExtensionType,
+    "stream_end",
+)
+EndpointStreamCreditEvent = JsonEventType[EndpointStreamCreditReq].of_extension(
+    EndpointExtensionType,
+    "stream_credit",
+)
 EndpointsTableType = ModelTableType.of_extension(
     EndpointExtensionType,
     "endpoints",
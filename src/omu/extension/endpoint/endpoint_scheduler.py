@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, List, Tuple
+
+from omu.extension.endpoint.endpoint import EndpointType
+
+type Coro[**P, R] = Callable[P, Awaitable[R]]
+
+
+class EndpointStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.rejected = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.execution_time = 0.0
+        self.max_execution_time = 0.0
+
+    def record_wait(self, duration: float) -> None:
+        self.calls += 1
+        self.wait_time += duration
+        self.max_wait_time = max(self.max_wait_time, duration)
+
+    def record_execution(self, duration: float) -> None:
+        self.execution_time += duration
+        self.max_execution_time = max(self.max_execution_time, duration)
+
+    def __repr__(self) -> str:
+        return (
+            f"EndpointStats(calls={self.calls}, rejected={self.rejected}, "
+            f"wait_time={self.wait_time:.3f}, execution_time={self.execution_time:.3f})"
+        )
+
+
+class ServedEndpoint:
+    def __init__(
+        self,
+        type: EndpointType[Any, Any, Any, Any],
+        func: Coro[[Any], Any] | Callable[[Any], Any],
+        concurrency: int | None = None,
+        queue_size: int = 64,
+        priority: int = 0,
+        executor: Executor | None = None,
+    ) -> None:
+        self.type = type
+        self.func = func
+        self.executor = executor
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.priority = priority
+        self.running = 0
+        self.queued = 0
+        self.stats = EndpointStats()
+
+
+class EndpointScheduler:
+    def __init__(self, concurrency: int | None = None) -> None:
+        self.concurrency = concurrency
+        self.running = 0
+        self._waiters: List[Tuple[int, int, ServedEndpoint, asyncio.Future]] = []
+        self._sequence = 0
+
+    async def acquire(self, endpoint: ServedEndpoint) -> bool:
+        if self._can_run(endpoint):
+            self._start(endpoint)
+            return True
+        if endpoint.queued >= endpoint.queue_size:
+            return False
+        future = asyncio.get_running_loop().create_future()
+        self._sequence += 1
+        heapq.heappush(
+            self._waiters, (-endpoint.priority, self._sequence, endpoint, future)
+        )
+        endpoint.queued += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(endpoint)
+            else:
+                endpoint.queued -= 1
+            raise
+        return True
+
+    def release(self, endpoint: ServedEndpoint) -> None:
+        endpoint.running -= 1
+        self.running -= 1
+        blocked: List[Tuple[int, int, ServedEndpoint, asyncio.Future]] = []
+        while self._waiters:
+            if self.concurrency is not None and self.running >= self.concurrency:
+                break
+            waiter = heapq.heappop(self._waiters)
+            _, _, waiting, future = waiter
+            if future.done():
+                continue
+            if not self._can_run(waiting):
+                blocked.append(waiter)
+                continue
+            waiting.queued -= 1
+            self._start(waiting)
+            future.set_result(None)
+        for waiter in blocked:
+            heapq.heappush(self._waiters, waiter)
+
+    def _can_run(self, endpoint: ServedEndpoint) -> bool:
+        if (
+            endpoint.concurrency is not None
+            and endpoint.running >= endpoint.concurrency
+        ):
+            return False
+        return self.concurrency is None or self.running < self.concurrency
+
+    def _start(self, endpoint: ServedEndpoint) -> None:
+        endpoint.running += 1
+        self.running += 1
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Any, Deque
+
+
+class EndpointStream:
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.done = False
+        self._items: Deque[Any] = deque()
+        self._error: BaseException | None = None
+        self._ready = asyncio.Event()
+
+    def feed(self, data: Any) -> None:
+        self._items.append(data)
+        self._ready.set()
+
+    def finish(self, error: BaseException | None = None) -> None:
+        self.done = True
+        self._error = error
+        self._ready.set()
+
+    async def next(self) -> Any:
+        while not self._items:
+            if self.done:
+                if self._error:
+                    raise self._error
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        return self._items.popleft()
+
+
+class StreamCredit:
+    def __init__(self, credit: int) -> None:
+        self.credit = credit
+        self._granted = asyncio.Event()
+
+    def grant(self, credit: int) -> None:
+        self.credit += credit
+        self._granted.set()
+
+    async def acquire(self) -> None:
+        while self.credit <= 0:
+            self._granted.clear()
+            await self._granted.wait()
+        self.credit -= 1
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
 import abc
-from typing import TYPE_CHECKING, Dict
+from typing import TYPE_CHECKING, Dict, List
+
+from loguru import logger
+
+from omu.connection.connection import ConnectionListener
+from omu.connection.manifest import SubscriptionManifest
 
 if TYPE_CHECKING:
     from omu.client import Client
@@ -17,6 +22,10 @@ class ExtensionRegistry(abc.ABC):
     def register_all(self, *types: ExtensionType) -> None:
         ...
 
+    @abc.abstractmethod
+    def register_lazy(self, *types: ExtensionType) -> None:
+        ...
+
     @abc.abstractmethod
     def get[Ext: Extension](self, extension_type: ExtensionType[Ext]) -> Ext:
         ...
@@ -30,28 +39,69 @@ class ExtensionRegistryImpl(ExtensionRegistry):
     def __init__(self, client: Client) -> None:
         self._client = client
         self._extensions: Dict[str, Extension] = {}
+        self._lazy: Dict[str, ExtensionType] = {}
+        self._resolving: List[str] = []
 
     def register[T: Extension](self, type: ExtensionType[T]) -> T:
         if self.has(type):
             raise ValueError(f"Extension type {type} already registered")
-        for dependency in type.dependencies():
-            if not self.has(dependency):
-                raise ValueError(
-                    f"Extension type {type} depends on {dependency} which is not registered"
-                )
-        extension = type.create(self._client)
-        self._extensions[type.key] = extension
-        return extension
+        return self._create(type)
 
     def register_all(self, *types: ExtensionType) -> None:
         for type in types:
             self.register(type)
 
+    def register_lazy(self, *types: ExtensionType) -> None:
+        for type in types:
+            if self.has(type):
+                raise ValueError(f"Extension type {type} already registered")
+            self._lazy[type.key] = type
+
     def get[Ext: Extension](self, extension_type: ExtensionType[Ext]) -> Ext:
+        if extension_type.key in self._lazy:
+            return self._create(self._lazy[extension_type.key])
         if not self.has(extension_type):
             raise ValueError(f"Extension type {extension_type} not registered")
         extension: Ext = self._extensions[extension_type.key]  # type: ignore
         return extension
 
     def has[Ext: Extension](self, extension_type: ExtensionType[Ext]) -> bool:
-        return extension_type.key in self._extensions
+        key = extension_type.key
+        return key in self._extensions or key in self._lazy
+
+    async def _connect_late(self, key: str, extension: ConnectionListener) -> None:
+        manifest = SubscriptionManifest()
+        try:
+            await extension.on_manifest(manifest)
+            await manifest.send(self._client.send)
+            await extension.on_connected()
+        except Exception as e:
+            logger.error(f"Failed to connect extension {key}: {e}")
+            return
+        for error in await manifest.run():
+            if isinstance(error, Exception):
+                logger.error(f"Failed to run deferred subscription for {key}: {error}")
+
+    def _create[T: Extension](self, type: ExtensionType[T]) -> T:
+        if type.key in self._resolving:
+            cycle = " -> ".join([*self._resolving, type.key])
+            raise ValueError(f"Extension dependency cycle: {cycle}")
+        self._resolving.append(type.key)
+        try:
+            for dependency in type.dependencies():
+                if not self.has(dependency):
+                    raise ValueError(
+                        f"Extension type {type} depends on {dependency} which is not registered"
+                    )
+                self.get(dependency)
+            extension = type.create(self._client)
+        finally:
+            self._resolving.pop()
+        self._extensions[type.key] = extension
+        self._lazy.pop(type.key, None)
+        if (
+            isinstance(extension, ConnectionListener)
+            and self._client.connection.connected
+        ):
+            self._client.loop.create_task(self._connect_late(type.key, extension))
+        return extension
@@ -1,3 +1,15 @@
-from .message_extension import MessageExtension, MessageExtensionType
+from .message_channel import MessageChannel
+from .message_extension import (
+    MessageExtension,
+    MessageExtensionType,
+    MessageKey,
+    MessagePolicy,
+)
 
-__all__ = ["MessageExtension", "MessageExtensionType"]
+__all__ = [
+    "MessageChannel",
+    "MessageExtension",
+    "MessageExtensionType",
+    "MessageKey",
+    "MessagePolicy",
+]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Deque, Literal
+
+if TYPE_CHECKING:
+    from .message_extension import MessageKey
+
+type Overflow = Literal["drop_oldest", "drop_newest"]
+
+
+class MessageChannel[T]:
+    def __init__(
+        self,
+        key: MessageKey[T],
+        maxsize: int,
+        overflow: Overflow,
+        on_close: Callable[[MessageChannel[T]], None],
+    ):
+        if maxsize < 1:
+            raise ValueError("Channel maxsize must be at least 1")
+        self.key = key
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.closed = False
+        self.dropped = 0
+        self._items: Deque[T] = deque()
+        self._ready = asyncio.Event()
+        self._on_close = on_close
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item: T) -> None:
+        if self.closed:
+            return
+        if len(self._items) >= self.maxsize:
+            self.dropped += 1
+            if self.overflow == "drop_newest":
+                return
+            self._items.popleft()
+        self._items.append(item)
+        self._ready.set()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._ready.set()
+        self._on_close(self)
+
+    def __aiter__(self) -> MessageChannel[T]:
+        return self
+
+    async def __anext__(self) -> T:
+        while not self._items:
+            if self.closed:
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        return self._items.popleft()
@@ -1,9 +1,17 @@
-from typing import Any, Awaitable, Callable, TypedDict
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Literal, TypedDict
 
-from omu.client.client import Client
+from loguru import logger
+
+from omu.client.client import Client, ClientListener
 from omu.connection.connection import ConnectionListener
+from omu.connection.manifest import SubscriptionManifest
 from omu.event.event import JsonEventType
 from omu.extension.extension import Extension, define_extension_type
+from omu.extension.message.message_channel import MessageChannel, Overflow
+from omu.interface import Serializable, Serializer
+from omu.interface.serializable import NoopSerializer
 
 MessageExtensionType = define_extension_type(
     "message",
@@ -17,61 +25,268 @@ class MessageEventData(TypedDict):
     body: Any
 
 
+class MessageBatchEventData(TypedDict):
+    key: str
+    bodies: List[Any]
+
+
 MessageRegisterEvent = JsonEventType[str].of_extension(MessageExtensionType, "register")
 MessageListenEvent = JsonEventType[str].of_extension(MessageExtensionType, "listen")
 MessageBroadcastEvent = JsonEventType[MessageEventData].of_extension(
     MessageExtensionType, "broadcast"
 )
+MessageBroadcastBatchEvent = JsonEventType[MessageBatchEventData].of_extension(
+    MessageExtensionType, "broadcast_batch"
+)
 
 type Coro[**P, R] = Callable[P, Awaitable[R]]
+type OutboxOverflow = Literal["wait", "drop_oldest"]
+
+
+class MessagePolicy:
+    def __init__(
+        self,
+        max_rate: float | None = None,
+        conflate: bool = False,
+        batch: int | None = 1,
+        max_queue: int | None = 1024,
+        overflow: OutboxOverflow = "wait",
+    ):
+        if max_queue is not None and max_queue < 1:
+            raise ValueError("Message max_queue must be at least 1")
+        self.max_rate = max_rate
+        self.conflate = conflate
+        self.batch = batch
+        self.max_queue = max_queue
+        self.overflow = overflow
+
+    @property
+    def immediate(self) -> bool:
+        return self.max_rate is None and not self.conflate and self.batch == 1
+
+
+DEFAULT_POLICY = MessagePolicy()
 
 
 class MessageKey[T]:
-    def __init__(self, name: str, app: str, _t: type[T]):
+    def __init__(
+        self,
+        name: str,
+        app: str,
+        _t: type[T],
+        policy: MessagePolicy = DEFAULT_POLICY,
+        serializer: Serializable[T, Any] | None = None,
+    ):
         self.name = name
         self.app = app
         self.key = f"{self.app}:{self.name}"
+        self.policy = policy
+        self.serializer: Serializable[T, Any] = serializer or Serializer.noop()
+
+
+class MessageOutbox:
+    def __init__(self, key: MessageKey[Any]) -> None:
+        self.key = key
+        self.pending: Deque[Any] = deque()
+        self.timer: asyncio.TimerHandle | None = None
+        self.sent: float | None = None
+        self.dropped = 0
+        self._space = asyncio.Event()
+
+    @property
+    def full(self) -> bool:
+        limit = self.key.policy.max_queue
+        return limit is not None and len(self.pending) >= limit
+
+    async def put(self, body: Any) -> None:
+        if self.key.policy.conflate:
+            self.pending.clear()
+        while self.full:
+            if self.key.policy.overflow == "drop_oldest":
+                self.pending.popleft()
+                self.dropped += 1
+                logger.warning(f"Dropped oldest queued message for {self.key.key}")
+                break
+            self._space.clear()
+            await self._space.wait()
+        self.pending.append(body)
 
+    def take(self) -> List[Any]:
+        size = self.key.policy.batch or len(self.pending)
+        bodies = [self.pending.popleft() for _ in range(min(size, len(self.pending)))]
+        self._space.set()
+        return bodies
 
-class MessageExtension(Extension, ConnectionListener):
+
+class MessageExtension(Extension, ConnectionListener, ClientListener):
     def __init__(self, client: Client):
         self.client = client
         self._listen_keys: set[str] = set()
         self._keys: set[str] = set()
+        self._listeners: Dict[str, List[Coro[[Any], None]]] = {}
+        self._channels: Dict[str, List[MessageChannel[Any]]] = {}
+        self._decoders: Dict[str, Serializable[Any, Any]] = {}
+        self._outboxes: Dict[str, MessageOutbox] = {}
         client.events.register(
-            MessageRegisterEvent, MessageListenEvent, MessageBroadcastEvent
+            MessageRegisterEvent,
+            MessageListenEvent,
+            MessageBroadcastEvent,
+            MessageBroadcastBatchEvent,
         )
+        client.events.add_listener(MessageBroadcastEvent, self._on_broadcast)
+        client.events.add_listener(MessageBroadcastBatchEvent, self._on_broadcast_batch)
         client.connection.add_listener(self)
+        client.add_listener(self)
 
-    def register[T](self, name: str, _t: type[T]) -> MessageKey[T]:
+    def register[T](
+        self,
+        name: str,
+        _t: type[T],
+        policy: MessagePolicy = DEFAULT_POLICY,
+        serializer: Serializable[T, Any] | None = None,
+    ) -> MessageKey[T]:
         key = f"{self.client.app.key()}:{name}"
         if key in self._keys:
             raise Exception(f"Key {key} is already registered")
         self._keys.add(key)
-        return MessageKey(name, self.client.app.key(), _t)
+        return MessageKey(name, self.client.app.key(), _t, policy, serializer)
+
+    def key[T](
+        self,
+        name: str,
+        _t: type[T],
+        app: str | None = None,
+        serializer: Serializable[T, Any] | None = None,
+    ) -> MessageKey[T]:
+        return MessageKey(name, app or self.client.app.key(), _t, serializer=serializer)
 
     async def broadcast[T](self, key: MessageKey[T], body: T) -> None:
+        if key.policy.immediate:
+            await self.client.send(
+                MessageBroadcastEvent,
+                MessageEventData(key=key.key, body=key.serializer.serialize(body)),
+            )
+            return
+        outbox = self._outboxes.get(key.key)
+        if outbox is None:
+            outbox = MessageOutbox(key)
+            self._outboxes[key.key] = outbox
+        await outbox.put(body)
+        self._schedule(outbox)
+
+    async def flush(self) -> None:
+        for outbox in self._outboxes.values():
+            if outbox.timer:
+                outbox.timer.cancel()
+                outbox.timer = None
+            while outbox.pending:
+                await self._send(outbox.key, self._take(outbox))
+
+    def _schedule(self, outbox: MessageOutbox) -> None:
+        if outbox.timer is None and outbox.pending:
+            outbox.timer = self.client.loop.call_later(
+                self._send_delay(outbox), self._send_later, outbox
+            )
+
+    def _send_delay(self, outbox: MessageOutbox) -> float:
+        rate = outbox.key.policy.max_rate
+        if rate is None or outbox.sent is None:
+            return 0
+        return max(outbox.sent + 1 / rate - self.client.loop.time(), 0)
+
+    def _send_later(self, outbox: MessageOutbox) -> None:
+        outbox.timer = None
+        if not self.client.connection.connected:
+            return
+        self.client.loop.create_task(self._send(outbox.key, self._take(outbox)))
+        self._schedule(outbox)
+
+    def _take(self, outbox: MessageOutbox) -> List[Any]:
+        outbox.sent = self.client.loop.time()
+        return outbox.take()
+
+    async def _send(self, key: MessageKey[Any], bodies: List[Any]) -> None:
+        bodies = [key.serializer.serialize(body) for body in bodies]
+        if len(bodies) == 1:
+            await self.client.send(
+                MessageBroadcastEvent,
+                MessageEventData(key=key.key, body=bodies[0]),
+            )
+            return
         await self.client.send(
-            MessageBroadcastEvent,
-            MessageEventData(key=key.key, body=body),
+            MessageBroadcastBatchEvent,
+            MessageBatchEventData(key=key.key, bodies=bodies),
         )
 
+    async def _on_broadcast(self, event: MessageEventData) -> None:
+        await self._dispatch(event["key"], event["body"])
+
+    async def _on_broadcast_batch(self, event: MessageBatchEventData) -> None:
+        for body in event["bodies"]:
+            await self._dispatch(event["key"], body)
+
+    async def _dispatch(self, key: str, body: Any) -> None:
+        decoder = self._decoders.get(key)
+        if decoder:
+            body = decoder.deserialize(body)
+        for channel in self._channels.get(key, []):
+            channel.put(body)
+        for callback in self._listeners.get(key, []):
+            await callback(body)
+
+    def channel[T](
+        self,
+        key: MessageKey[T],
+        maxsize: int = 64,
+        overflow: Overflow = "drop_oldest",
+    ) -> MessageChannel[T]:
+        self._subscribe(key)
+        channel = MessageChannel(key, maxsize, overflow, self._close_channel)
+        self._channels.setdefault(key.key, []).append(channel)
+        return channel
+
+    def _close_channel(self, channel: MessageChannel[Any]) -> None:
+        channels = self._channels.get(channel.key.key, [])
+        if channel in channels:
+            channels.remove(channel)
+
+    def _subscribe(self, key: str | MessageKey[Any]) -> None:
+        if isinstance(key, MessageKey):
+            if not isinstance(key.serializer, NoopSerializer):
+                decoder = self._decoders.setdefault(key.key, key.serializer)
+                if decoder is not key.serializer:
+                    raise Exception(f"Key {key.key} is already decoded by {decoder}")
+            key = key.key
+        if key in self._listen_keys:
+            return
+        self._listen_keys.add(key)
+        if self.client.connection.connected:
+            self.client.loop.create_task(self.client.send(MessageListenEvent, key))
+
     def listen[T](
-        self, name: str, app: str | None = None
+        self, name: str | MessageKey[T], app: str | None = None
     ) -> Callable[[Coro[[T | None], None]], None]:
-        key = f"{app or self.client.app.key()}:{name}"
+        if isinstance(name, MessageKey):
+            key = name.key
+        else:
+            key = f"{app or self.client.app.key()}:{name}"
 
         def decorator(callback: Coro[[T | None], None]) -> None:
-            self._listen_keys.add(key)
-
-            async def wrapper(event: MessageEventData) -> None:
-                if event["key"] == key:
-                    await callback(event["body"])
-
-            self.client.events.add_listener(MessageBroadcastEvent, wrapper)
+            self._subscribe(name if isinstance(name, MessageKey) else key)
+            self._listeners.setdefault(key, []).append(callback)
 
         return decorator
 
-    async def on_connected(self) -> None:
+    async def on_manifest(self, manifest: SubscriptionManifest) -> None:
         for key in self._keys:
-            await self.client.send(MessageRegisterEvent, key)
+            manifest.add(MessageRegisterEvent, key)
+        for key in self._listen_keys:
+            manifest.add(MessageListenEvent, key)
+
+    async def on_connected(self) -> None:
+        for outbox in self._outboxes.values():
+            self._schedule(outbox)
+
+    async def on_stopping(self) -> None:
+        if self.client.connection.connected:
+            await self.flush()
@@ -1,9 +1,23 @@
-from typing import Any, Awaitable, Callable, TypedDict
+import asyncio
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Set,
+    Tuple,
+    TypedDict,
+)
+
+from loguru import logger
 
-from omu.client.client import Client
+from omu.client.client import Client, ClientListener
 from omu.connection.connection import ConnectionListener
+from omu.connection.manifest import SubscriptionManifest
 from omu.event.event import JsonEventType
-from omu.extension.endpoint.endpoint import JsonEndpointType
+from omu.extension.endpoint.endpoint import EndpointPolicy, JsonEndpointType
 from omu.extension.extension import Extension, define_extension_type
 
 RegistryExtensionType = define_extension_type(
@@ -21,52 +35,257 @@ class RegistryEventData(TypedDict):
 RegistryUpdateEvent = JsonEventType[RegistryEventData].of_extension(
     RegistryExtensionType, "update"
 )
+RegistryUpdateManyEvent = JsonEventType[List[RegistryEventData]].of_extension(
+    RegistryExtensionType, "update_many"
+)
 RegistryListenEvent = JsonEventType[str].of_extension(RegistryExtensionType, "listen")
 RegistryGetEndpoint = JsonEndpointType[str, Any].of_extension(
-    RegistryExtensionType, "get"
+    RegistryExtensionType, "get", policy=EndpointPolicy(idempotent=True)
+)
+RegistryGetManyEndpoint = JsonEndpointType[List[str], Dict[str, Any]].of_extension(
+    RegistryExtensionType, "get_many", policy=EndpointPolicy(idempotent=True)
+)
+RegistrySnapshotEndpoint = JsonEndpointType[str, Dict[str, Any]].of_extension(
+    RegistryExtensionType, "snapshot", policy=EndpointPolicy(idempotent=True)
 )
 
 type Coro[**P, R] = Callable[P, Awaitable[R]]
 
 
-class RegistryExtension(Extension, ConnectionListener):
+class RegistryExtension(Extension, ConnectionListener, ClientListener):
     def __init__(self, client: Client) -> None:
         self.client = client
+        self.ttl: float | None = None
         self._listen_keys: set[str] = set()
-        client.events.register(RegistryUpdateEvent, RegistryListenEvent)
+        self._subscribed: set[str] = set()
+        self._listeners: Dict[str, List[Coro[[Any], None]]] = {}
+        self._cache: Dict[str, Tuple[Any, float | None]] = {}
+        self.write_window: float | None = None
+        self.write_rate: float | None = None
+        self._pending: Dict[str, Any] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._writes: Set[asyncio.Task] = set()
+        self._written: Dict[str, float] = {}
+        client.events.register(
+            RegistryUpdateEvent, RegistryUpdateManyEvent, RegistryListenEvent
+        )
+        client.events.add_listener(RegistryUpdateEvent, self._on_update)
+        client.events.add_listener(RegistryUpdateManyEvent, self._on_update_many)
         client.connection.add_listener(self)
+        client.add_listener(self)
+
+    def _key(self, name: str, app: str | None = None) -> str:
+        return f"{app or self.client.app.key()}:{name}"
 
     async def get[T](self, name: str, app: str | None = None) -> T:
-        data: T = await self.client.endpoints.call(
-            RegistryGetEndpoint, f"{app or self.client.app.key()}:{name}"
-        )
+        key = self._key(name, app)
+        hit, value = self._lookup(key)
+        if hit:
+            return value
+        data: T = await self.client.endpoints.call(RegistryGetEndpoint, key)
+        if not self._lookup(key)[0]:
+            self._store(key, data)
         return data
 
+    async def get_many(
+        self, names: Iterable[str], app: str | None = None
+    ) -> Dict[str, Any]:
+        keys = {name: self._key(name, app) for name in names}
+        values: Dict[str, Any] = {}
+        missing: List[str] = []
+        fetched: Dict[str, Any] = {}
+        for name, key in keys.items():
+            hit, value = self._lookup(key)
+            if hit:
+                values[name] = value
+            else:
+                missing.append(key)
+        if missing:
+            fetched = await self.client.endpoints.call(RegistryGetManyEndpoint, missing)
+            for key in missing:
+                if not self._lookup(key)[0]:
+                    self._store(key, fetched.get(key))
+        for name, key in keys.items():
+            if name not in values:
+                values[name] = fetched.get(key)
+        return values
+
+    async def snapshot(
+        self, app: str | None = None, prefix: str = ""
+    ) -> Dict[str, Any]:
+        namespace = f"{app or self.client.app.key()}:"
+        fetched = await self.client.endpoints.call(
+            RegistrySnapshotEndpoint, namespace + prefix
+        )
+        values: Dict[str, Any] = {}
+        for key, value in fetched.items():
+            if not self._lookup(key)[0]:
+                self._store(key, value)
+            values[key.removeprefix(namespace)] = value
+        return values
+
+    def peek[T](
+        self, name: str, app: str | None = None, default: T | None = None
+    ) -> T | None:
+        hit, value = self._lookup(self._key(name, app))
+        return value if hit else default
+
     async def set[T](self, name: str, value: T, app: str | None = None) -> None:
+        key = self._key(name, app)
+        self._store(key, value)
+        if self.write_window is None and self.write_rate is None:
+            await self._write(key, value)
+            return
+        self._pending[key] = value
+        if key not in self._timers:
+            self._timers[key] = self.client.loop.call_later(
+                self._write_delay(key), self._write_later, key
+            )
+
+    async def set_many(self, values: Dict[str, Any], app: str | None = None) -> None:
+        if self.write_window is not None or self.write_rate is not None:
+            for name, value in values.items():
+                await self.set(name, value, app)
+            return
+        events: List[RegistryEventData] = []
+        for name, value in values.items():
+            key = self._key(name, app)
+            self._store(key, value)
+            self._written[key] = self.client.loop.time()
+            events.append(RegistryEventData(key=key, value=value))
+        if events:
+            await self.client.send(RegistryUpdateManyEvent, events)
+
+    def set_write_behind(
+        self, window: float | None = 0.1, max_rate: float | None = None
+    ) -> None:
+        self.write_window = window
+        self.write_rate = max_rate
+
+    async def flush(self) -> None:
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+        pending, self._pending = self._pending, {}
+        for key in list(pending.keys()):
+            try:
+                await self._write(key, pending[key])
+            except Exception as e:
+                self._restore(pending)
+                raise e
+            del pending[key]
+
+    def _write_delay(self, key: str) -> float:
+        delay = self.write_window or 0
+        if self.write_rate is not None and key in self._written:
+            earliest = self._written[key] + 1 / self.write_rate
+            delay = max(delay, earliest - self.client.loop.time())
+        return delay
+
+    def _write_later(self, key: str) -> None:
+        del self._timers[key]
+        if not self.client.connection.connected or key not in self._pending:
+            return
+        value = self._pending.pop(key)
+        task = self.client.loop.create_task(self._write(key, value))
+        self._writes.add(task)
+        task.add_done_callback(lambda task: self._written_later(task, key, value))
+
+    def _written_later(self, task: asyncio.Task, key: str, value: Any) -> None:
+        self._writes.discard(task)
+        if task.cancelled():
+            self._restore({key: value})
+            return
+        error = task.exception()
+        if error is None:
+            return
+        logger.error(f"Failed to write registry key {key}: {error}")
+        self._restore({key: value})
+
+    def _restore(self, values: Dict[str, Any]) -> None:
+        for key, value in values.items():
+            self._pending.setdefault(key, value)
+
+    async def _write(self, key: str, value: Any) -> None:
+        self._written[key] = self.client.loop.time()
         await self.client.send(
             RegistryUpdateEvent,
-            RegistryEventData(
-                key=f"{app or self.client.app.key()}:{name}", value=value
-            ),
+            RegistryEventData(key=key, value=value),
         )
 
     def listen[T](
         self, name: str, app: str | None = None
     ) -> Callable[[Coro[[T], None]], None]:
-        key = f"{app or self.client.app.key()}:{name}"
+        key = self._key(name, app)
 
         def decorator(callback: Coro[[T], None]) -> None:
+            self._listeners.setdefault(key, []).append(callback)
+            if key in self._listen_keys:
+                return
             self._listen_keys.add(key)
+            if self.client.connection.connected:
+                self.client.loop.create_task(self._subscribe(key))
 
-            async def wrapper(event: RegistryEventData) -> None:
-                if event["key"] != key:
-                    return
-                await callback(event["value"])
+        return decorator
 
-            self.client.events.add_listener(RegistryUpdateEvent, wrapper)
+    async def _subscribe(self, key: str) -> None:
+        if key in self._subscribed:
+            return
+        self._subscribed.add(key)
+        await self.client.send(RegistryListenEvent, key)
 
-        return decorator
+    async def _on_update(self, event: RegistryEventData) -> None:
+        key = event["key"]
+        if key in self._subscribed or key in self._cache:
+            self._store(key, event["value"])
+        for callback in self._listeners.get(key, []):
+            await callback(event["value"])
 
-    async def on_connected(self) -> None:
+    async def _on_update_many(self, events: List[RegistryEventData]) -> None:
+        for event in events:
+            await self._on_update(event)
+
+    def _lookup(self, key: str) -> Tuple[bool, Any]:
+        if key in self._pending:
+            return True, self._pending[key]
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+        value, expires = entry
+        if expires is not None and expires <= self.client.loop.time():
+            del self._cache[key]
+            return False, None
+        return True, value
+
+    def _store(self, key: str, value: Any) -> None:
+        if key in self._subscribed:
+            self._cache[key] = (value, None)
+        elif self.ttl is not None:
+            self._cache[key] = (value, self.client.loop.time() + self.ttl)
+
+    async def on_manifest(self, manifest: SubscriptionManifest) -> None:
         for key in self._listen_keys:
-            await self.client.send(RegistryListenEvent, key)
+            manifest.add(RegistryListenEvent, key)
+            self._subscribed.add(key)
+
+    async def _flush_pending(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush registry writes: {e}")
+
+    async def on_connected(self) -> None:
+        await self._flush_pending()
+
+    async def on_stopping(self) -> None:
+        if self.client.connection.connected:
+            await self._flush_pending()
+        if self._pending:
+            logger.warning(f"Discarding {len(self._pending)} unsent registry writes")
+
+    async def on_disconnected(self) -> None:
+        for key in self._subscribed:
+            self._cache.pop(key, None)
+        self._subscribed.clear()
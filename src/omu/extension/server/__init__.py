@@ -1,6 +1,18 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from .model import App, AppJson
-from .server_extension import ServerExtension, ServerExtensionType
+
+if TYPE_CHECKING:
+    from .server_extension import ServerExtension, ServerExtensionType
 
 __all__ = ["App", "AppJson", "ServerExtension", "ServerExtensionType"]
+
+
+def __getattr__(name: str):
+    if name in ("ServerExtension", "ServerExtensionType"):
+        from . import server_extension
+
+        return getattr(server_extension, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,11 +2,11 @@ from omu.client import Client
 from omu.extension.endpoint import JsonEndpointType
 from omu.extension.extension import Extension, define_extension_type
 from omu.extension.server.model.app import App, AppJson
-from omu.extension.table import TableExtensionType
+from omu.extension.table import Table, TableExtensionType
 from omu.extension.table.table import ModelTableType
 
 ServerExtensionType = define_extension_type(
-    "server", lambda client: ServerExtension(client), lambda: []
+    "server", lambda client: ServerExtension(client), lambda: [TableExtensionType]
 )
 
 AppsTableType = ModelTableType[App, AppJson].of_extension(
@@ -23,8 +23,14 @@ ShutdownEndpointType = JsonEndpointType[bool, bool].of_extension(
 class ServerExtension(Extension):
     def __init__(self, client: Client) -> None:
         self.client = client
-        tables = client.extensions.get(TableExtensionType)
-        self.apps = tables.get(AppsTableType)
+        self._apps: Table[App] | None = None
+
+    @property
+    def apps(self) -> Table[App]:
+        if self._apps is None:
+            tables = self.client.extensions.get(TableExtensionType)
+            self._apps = tables.get(AppsTableType)
+        return self._apps
 
     async def shutdown(self, restart: bool = False) -> bool:
         return await self.client.endpoints.call(ShutdownEndpointType, restart)
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Set, Tuple
+
+import numpy as np
+
+from omu.interface import Keyable
+
+from .table import Table, TableListener
+
+type Predicate = Callable[[np.ndarray], np.ndarray]
+
+
+class Column[T: Keyable]:
+    def __init__(
+        self,
+        name: str,
+        getter: Callable[[T], Any],
+        dtype: Any = np.float64,
+    ):
+        self.name = name
+        self.getter = getter
+        self.dtype = np.dtype(dtype)
+        self.fill = _fill_value(self.dtype)
+
+    def extract(self, item: T) -> Any:
+        value = self.getter(item)
+        if value is None:
+            return self.fill
+        return value
+
+
+def _fill_value(dtype: np.dtype) -> Any:
+    if dtype.kind == "f":
+        return np.nan
+    if dtype.kind in ("M", "m"):
+        return np.datetime64("NaT") if dtype.kind == "M" else np.timedelta64("NaT")
+    if dtype.kind == "O":
+        return None
+    if dtype.kind == "b":
+        return False
+    return 0
+
+
+class ColumnarCache[T: Keyable](TableListener[T]):
+    def __init__(
+        self,
+        table: Table[T],
+        columns: Iterable[Column[T]],
+        capacity: int = 1024,
+    ):
+        self._table = table
+        self._columns: Dict[str, Column[T]] = {
+            column.name: column for column in columns
+        }
+        self._capacity = max(capacity, 1)
+        self._size = 0
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._items: Dict[str, T] = {}
+        self._stale: Set[str] = set()
+        self._arrays: Dict[str, np.ndarray] = {
+            name: np.empty(self._capacity, dtype=column.dtype)
+            for name, column in self._columns.items()
+        }
+        self._put_all(table.cache)
+        table.add_listener(self)
+
+    def close(self) -> None:
+        self._table.remove_listener(self)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    @property
+    def keys(self) -> List[str]:
+        return list(self._keys)
+
+    def row(self, key: str) -> int | None:
+        return self._rows.get(key)
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self._arrays:
+            raise KeyError(f"Column {name} not found")
+        return self._arrays[name][: self._size]
+
+    def mask(self, name: str, predicate: Predicate) -> np.ndarray:
+        return np.asarray(predicate(self.column(name)), dtype=bool)
+
+    def select(self, mask: np.ndarray) -> List[str]:
+        return [self._keys[row] for row in np.flatnonzero(mask)]
+
+    def items(self, mask: np.ndarray) -> Dict[str, T]:
+        cache = self._table.cache
+        return {key: cache[key] for key in self.select(mask) if key in cache}
+
+    def group_count(self, name: str, mask: np.ndarray | None = None) -> Dict[Any, int]:
+        values = self.column(name)
+        if mask is not None:
+            values = values[mask]
+        if values.dtype.kind == "O":
+            return dict(Counter(values.tolist()))
+        uniques, counts = np.unique(values, return_counts=True)
+        return dict(zip(uniques.tolist(), counts.tolist()))
+
+    def histogram(
+        self,
+        name: str,
+        interval: float,
+        start: float | None = None,
+        end: float | None = None,
+        mask: np.ndarray | None = None,
+        weights: str | None = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if interval <= 0:
+            raise ValueError("Histogram interval must be positive")
+        values = _as_seconds(self.column(name))
+        selected = ~np.isnan(values)
+        if mask is not None:
+            selected &= mask
+        values = values[selected]
+        weight_values = None
+        if weights is not None:
+            weight_values = self.column(weights)[selected].astype(np.float64)
+        if values.size == 0 and (start is None or end is None):
+            return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64)
+        if start is None:
+            start = float(np.floor(values.min() / interval) * interval)
+        if end is None:
+            count = int((values.max() - start) // interval) + 1
+        else:
+            count = max(int(np.ceil((end - start) / interval)), 0)
+        buckets = np.floor((values - start) / interval).astype(np.int64)
+        in_range = (buckets >= 0) & (buckets < count)
+        if weight_values is not None:
+            weight_values = weight_values[in_range]
+        counts = np.bincount(buckets[in_range], weights=weight_values, minlength=count)
+        edges = start + np.arange(count, dtype=np.float64) * interval
+        return edges, counts
+
+    async def on_update(self, items: Dict[str, T]) -> None:
+        self._stale.update(items.keys())
+
+    async def on_cache_update(self, cache: Dict[str, T]) -> None:
+        for key in [key for key in self._rows if key not in cache]:
+            self._remove(key)
+        stale, self._stale = self._stale, set()
+        for key, item in cache.items():
+            if key in stale or self._items.get(key) is not item:
+                self._put(key, item)
+
+    def _put_all(self, items: Mapping[str, T]) -> None:
+        for key, item in items.items():
+            self._put(key, item)
+
+    def _put(self, key: str, item: T) -> None:
+        row = self._rows.get(key)
+        if row is None:
+            if self._size == self._capacity:
+                self._grow()
+            row = self._size
+            self._size += 1
+            self._keys.append(key)
+            self._rows[key] = row
+        self._items[key] = item
+        for name, column in self._columns.items():
+            self._arrays[name][row] = column.extract(item)
+
+    def _remove(self, key: str) -> None:
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        del self._items[key]
+        last = self._size - 1
+        if row != last:
+            for array in self._arrays.values():
+                array[row] = array[last]
+            moved = self._keys[last]
+            self._keys[row] = moved
+            self._rows[moved] = row
+        self._keys.pop()
+        self._size -= 1
+
+    def _grow(self) -> None:
+        self._capacity *= 2
+        for name, array in self._arrays.items():
+            grown = np.empty(self._capacity, dtype=array.dtype)
+            grown[: self._size] = array[: self._size]
+            self._arrays[name] = grown
+
+
+def _as_seconds(values: np.ndarray) -> np.ndarray:
+    if values.dtype.kind == "M":
+        seconds = values.astype("datetime64[ns]").astype(np.int64) / 1e9
+        seconds[np.isnat(values)] = np.nan
+        return seconds
+    return values.astype(np.float64)
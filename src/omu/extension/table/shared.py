@@ -0,0 +1,521 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import struct
+from multiprocessing import resource_tracker, shared_memory
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Set,
+    Tuple,
+)
+
+from omu.interface import Keyable
+
+from .table import (
+    AsyncCallback,
+    CallbackTableListener,
+    Coro,
+    Table,
+    TableListener,
+    TableType,
+)
+
+HEADER = struct.Struct("<QQ")
+RECORD = struct.Struct("<BII")
+OP_PUT = 0
+OP_REMOVE = 1
+
+type Span = Tuple[int, int]
+
+
+class Changes:
+    def __init__(
+        self,
+        cleared: bool = False,
+        added: List[str] | None = None,
+        updated: List[str] | None = None,
+        removed: Dict[str, bytes] | None = None,
+    ):
+        self.cleared = cleared
+        self.added = added or []
+        self.updated = updated or []
+        self.removed = removed or {}
+
+
+def shared_name(type: TableType[Any, Any]) -> str:
+    digest = hashlib.sha1(type.info.key().encode("utf-8")).hexdigest()
+    return f"omu-{digest[:20]}"
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name, track=False)  # type: ignore
+    except TypeError:
+        memory = shared_memory.SharedMemory(name)
+        resource_tracker.unregister(memory._name, "shared_memory")  # type: ignore
+        return memory
+
+
+def _record(op: int, key: bytes, value: bytes = b"") -> bytes:
+    return RECORD.pack(op, len(key), len(value)) + key + value
+
+
+def _parse(buffer: memoryview, start: int, end: int) -> List[Tuple[int, str, Span]]:
+    records: List[Tuple[int, str, Span]] = []
+    offset = start
+    while offset < end:
+        op, key_length, value_length = RECORD.unpack_from(buffer, offset)
+        offset += RECORD.size
+        key = bytes(buffer[offset : offset + key_length]).decode("utf-8")
+        offset += key_length
+        records.append((op, key, (offset, value_length)))
+        offset += value_length
+    if offset != end:
+        raise ValueError("Shared table log is corrupted")
+    return records
+
+
+class SharedTablePublisher[T: Keyable](TableListener[T]):
+    def __init__(
+        self,
+        table: Table[T],
+        type: TableType[T, Any],
+        name: str | None = None,
+        capacity: int = 16 * 1024 * 1024,
+    ):
+        self._table = table
+        self._type = type
+        self.name = name or shared_name(type)
+        created = True
+        try:
+            self._memory = shared_memory.SharedMemory(
+                self.name, create=True, size=capacity
+            )
+        except FileExistsError:
+            self._memory = shared_memory.SharedMemory(self.name)
+            created = False
+        self._buffer = self._memory.buf
+        self._live: Dict[str, Span] = {}
+        self._items: Dict[str, T] = dict(table.cache)
+        self._stale: Set[str] = set()
+        self._generation, _ = HEADER.unpack_from(self._buffer)
+        self._generation += self._generation & 1
+        self._end = HEADER.size
+        try:
+            self._compact(self._encode_all(table.cache))
+        except ValueError:
+            self._buffer.release()
+            self._memory.close()
+            if created:
+                self._memory.unlink()
+            raise
+        table.add_listener(self)
+
+    @property
+    def capacity(self) -> int:
+        return self._memory.size
+
+    @property
+    def used(self) -> int:
+        return self._end
+
+    def close(self) -> None:
+        self._table.remove_listener(self)
+        self._buffer.release()
+        self._memory.close()
+
+    def unlink(self) -> None:
+        self.close()
+        self._memory.unlink()
+
+    async def on_update(self, items: Dict[str, T]) -> None:
+        self._stale.update(items.keys())
+
+    async def on_cache_update(self, cache: Dict[str, T]) -> None:
+        if not cache:
+            self._items.clear()
+            self._stale.clear()
+            if self._live:
+                self._compact({})
+            return
+        self._remove([key for key in self._live if key not in cache])
+        stale, self._stale = self._stale, set()
+        changed = {
+            key: item
+            for key, item in cache.items()
+            if key in stale or self._items.get(key) is not item
+        }
+        self._items = dict(cache)
+        self._put(
+            {
+                key: data
+                for key, data in self._encode_all(changed).items()
+                if self._value(key) != data
+            }
+        )
+
+    def _encode_all(self, items: Mapping[str, T]) -> Dict[str, bytes]:
+        serializer = self._type.serializer
+        return {
+            key: json.dumps(serializer.serialize(item)).encode("utf-8")
+            for key, item in items.items()
+        }
+
+    def _put(self, items: Dict[str, bytes]) -> None:
+        if not items:
+            return
+        records = [
+            _record(OP_PUT, key.encode("utf-8"), data) for key, data in items.items()
+        ]
+        if not self._append(records):
+            live = self._snapshot()
+            live.update(items)
+            self._compact(live)
+            return
+        offset = self._end - sum(len(record) for record in records)
+        for key, record in zip(items.keys(), records):
+            start = offset + RECORD.size + len(key.encode("utf-8"))
+            self._live[key] = (start, len(items[key]))
+            offset += len(record)
+
+    def _remove(self, keys: List[str]) -> None:
+        if not keys:
+            return
+        records = [_record(OP_REMOVE, key.encode("utf-8")) for key in keys]
+        if not self._append(records):
+            live = self._snapshot()
+            for key in keys:
+                live.pop(key, None)
+            self._compact(live)
+            return
+        for key in keys:
+            self._live.pop(key, None)
+
+    def _append(self, records: List[bytes]) -> bool:
+        data = b"".join(records)
+        if self._end + len(data) > self._memory.size:
+            return False
+        self._buffer[self._end : self._end + len(data)] = data
+        self._end += len(data)
+        HEADER.pack_into(self._buffer, 0, self._generation, self._end)
+        return True
+
+    def _value(self, key: str) -> bytes | None:
+        span = self._live.get(key)
+        if span is None:
+            return None
+        start, length = span
+        return bytes(self._buffer[start : start + length])
+
+    def _snapshot(self) -> Dict[str, bytes]:
+        return {
+            key: bytes(self._buffer[start : start + length])
+            for key, (start, length) in self._live.items()
+        }
+
+    def _compact(self, items: Dict[str, bytes]) -> None:
+        log = bytearray()
+        live: Dict[str, Span] = {}
+        for key, data in items.items():
+            encoded = key.encode("utf-8")
+            log += RECORD.pack(OP_PUT, len(encoded), len(data)) + encoded
+            live[key] = (HEADER.size + len(log), len(data))
+            log += data
+        if HEADER.size + len(log) > self._memory.size:
+            raise ValueError(
+                f"Shared table {self.name} needs {HEADER.size + len(log)} bytes "
+                f"but has a capacity of {self._memory.size}"
+            )
+        HEADER.pack_into(self._buffer, 0, self._generation + 1, self._end)
+        self._buffer[HEADER.size : HEADER.size + len(log)] = log
+        self._generation += 2
+        self._end = HEADER.size + len(log)
+        self._live = live
+        HEADER.pack_into(self._buffer, 0, self._generation, self._end)
+
+
+class SharedCache[T: Keyable](Mapping[str, T]):
+    def __init__(self, table: SharedTable[T]):
+        self._table = table
+
+    def __getitem__(self, key: str) -> T:
+        if key not in self._table._index:
+            raise KeyError(key)
+        return self._table._decode(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._table._index))
+
+    def __len__(self) -> int:
+        return len(self._table._index)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._table._index
+
+
+class SharedTable[T: Keyable](Table[T]):
+    def __init__(
+        self,
+        type: TableType[T, Any],
+        name: str | None = None,
+        retries: int = 16,
+        decoded_size: int = 256,
+    ):
+        self._type = type
+        self.name = name or shared_name(type)
+        self.retries = retries
+        self.decoded_size = decoded_size
+        self._memory = _attach(self.name)
+        self._buffer = self._memory.buf
+        self._generation = -1
+        self._offset = HEADER.size
+        self._index: Dict[str, Span] = {}
+        self._decoded: Dict[str, T] = {}
+        self._listeners: List[TableListener[T]] = []
+        self._cache = SharedCache(self)
+        self._closed = False
+        self._resync = False
+        self._read()
+
+    def close(self) -> None:
+        self._closed = True
+        self._decoded.clear()
+        self._buffer.release()
+        try:
+            self._memory.close()
+        except BufferError as e:
+            raise BufferError(
+                f"Shared table {self.name} still has views; release them first"
+            ) from e
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def keys(self) -> List[str]:
+        return list(self._index.keys())
+
+    def view(self, key: str) -> memoryview | None:
+        """Zero-copy view of the raw JSON value of key.
+
+        The view points into the shared log, so it no longer refers to key
+        once the publisher compacts the log. Release it before close(),
+        which cannot unmap the segment while views are alive.
+        """
+        span = self._index.get(key)
+        if span is None:
+            return None
+        start, length = span
+        return self._buffer[start : start + length]
+
+    @property
+    def cache(self) -> Mapping[str, T]:  # type: ignore[override]
+        return self._cache
+
+    async def get(self, key: str) -> T | None:
+        if key not in self._index:
+            return None
+        return self._decode(key)
+
+    async def add(self, *items: T) -> None:
+        raise RuntimeError("SharedTable is read-only")
+
+    async def update(self, *items: T) -> None:
+        raise RuntimeError("SharedTable is read-only")
+
+    async def remove(self, *items: T) -> None:
+        raise RuntimeError("SharedTable is read-only")
+
+    async def clear(self) -> None:
+        raise RuntimeError("SharedTable is read-only")
+
+    async def fetch(
+        self,
+        before: int | None = None,
+        after: int | None = None,
+        cursor: str | None = None,
+    ) -> Dict[str, T]:
+        keys = list(self._index.keys())
+        if cursor is None:
+            start, end = 0, len(keys)
+        elif cursor in self._index:
+            position = keys.index(cursor)
+            start, end = position + 1, position
+        else:
+            return {}
+        if before is not None and after is None:
+            selected = keys[max(end - before, 0) : end]
+        elif after is not None and before is None:
+            selected = keys[start : start + after]
+        else:
+            selected = keys
+        return {key: self._decode(key) for key in selected}
+
+    async def iter(
+        self,
+        backward: bool = False,
+        cursor: str | None = None,
+    ) -> AsyncGenerator[T, None]:
+        keys = list(self._index.keys())
+        if cursor is not None:
+            if cursor not in self._index:
+                return
+            position = keys.index(cursor)
+            keys = keys[:position] if backward else keys[position + 1 :]
+        for key in reversed(keys) if backward else keys:
+            if key in self._index:
+                yield self._decode(key)
+
+    async def size(self) -> int:
+        return len(self._index)
+
+    def add_listener(self, listener: TableListener[T]) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: TableListener[T]) -> None:
+        self._listeners.remove(listener)
+
+    def listen(
+        self, callback: AsyncCallback[Dict[str, T]] | None = None
+    ) -> Callable[[], None]:
+        listener = CallbackTableListener(on_cache_update=callback)
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def proxy(self, callback: Coro[[T], T | None]) -> Callable[[], None]:
+        raise RuntimeError("SharedTable is read-only")
+
+    async def poll(self) -> bool:
+        changes = self._read()
+        if self._resync:
+            self._resync = False
+            changes = Changes(cleared=True, added=list(self._index))
+        if changes is None:
+            return False
+        if not self._listeners:
+            return True
+        removed = {
+            key: self._type.serializer.deserialize(json.loads(data))
+            for key, data in changes.removed.items()
+        }
+        added = {key: self._decode(key) for key in changes.added}
+        updated = {key: self._decode(key) for key in changes.updated}
+        if not (changes.cleared or removed or added or updated):
+            return True
+        for listener in self._listeners:
+            if changes.cleared:
+                await listener.on_clear()
+            if removed:
+                await listener.on_remove(removed)
+            if added:
+                await listener.on_add(added)
+            if updated:
+                await listener.on_update(updated)
+            await listener.on_cache_update(self._cache)  # type: ignore[arg-type]
+        return True
+
+    async def watch(self, interval: float = 0.05) -> None:
+        while not self._closed:
+            await self.poll()
+            await asyncio.sleep(interval)
+
+    def _decode(self, key: str) -> T:
+        item = self._decoded.pop(key, None)
+        if item is not None:
+            self._decoded[key] = item
+            return item
+        for _ in range(self.retries):
+            generation = self._generation
+            start, length = self._index[key]
+            data = bytes(self._buffer[start : start + length])
+            current, _ = HEADER.unpack_from(self._buffer)
+            if current == generation:
+                item = self._type.serializer.deserialize(json.loads(data))
+                self._decoded[key] = item
+                if len(self._decoded) > self.decoded_size:
+                    del self._decoded[next(iter(self._decoded))]
+                return item
+            self._read()
+            self._resync = True
+            if key not in self._index:
+                raise KeyError(key)
+        raise RuntimeError(f"Shared table {self.name} is changing too fast to read")
+
+    def _read(self) -> Changes | None:
+        for _ in range(self.retries):
+            generation, end = HEADER.unpack_from(self._buffer)
+            if generation & 1:
+                continue
+            rebuild = generation != self._generation
+            start = HEADER.size if rebuild else self._offset
+            if not rebuild and end == self._offset:
+                return None
+            try:
+                records = _parse(self._buffer, start, end)
+                removed = {} if rebuild else self._removed(records)
+            except (ValueError, UnicodeDecodeError, struct.error):
+                continue
+            current, _ = HEADER.unpack_from(self._buffer)
+            if current != generation:
+                continue
+            self._generation = generation
+            self._offset = end
+            if rebuild:
+                return self._rebuild(records)
+            return self._apply(records, removed)
+        return None
+
+    def _removed(self, records: List[Tuple[int, str, Span]]) -> Dict[str, bytes]:
+        spans = dict(self._index)
+        removed: Dict[str, bytes] = {}
+        for op, key, span in records:
+            if op == OP_PUT:
+                spans[key] = span
+                continue
+            span = spans.pop(key, None)
+            if span is not None and key in self._index:
+                start, length = span
+                removed[key] = bytes(self._buffer[start : start + length])
+        return removed
+
+    def _rebuild(self, records: List[Tuple[int, str, Span]]) -> Changes:
+        cleared = bool(self._index)
+        self._index = {}
+        self._decoded = {}
+        for op, key, span in records:
+            if op == OP_PUT:
+                self._index[key] = span
+            else:
+                self._index.pop(key, None)
+        return Changes(cleared=cleared, added=list(self._index))
+
+    def _apply(
+        self, records: List[Tuple[int, str, Span]], removed: Dict[str, bytes]
+    ) -> Changes:
+        present = {key: key in self._index for _, key, _ in records}
+        for op, key, span in records:
+            self._decoded.pop(key, None)
+            if op == OP_PUT:
+                self._index[key] = span
+            else:
+                self._index.pop(key, None)
+        changes = Changes()
+        for key, before in present.items():
+            after = key in self._index
+            if before and after:
+                changes.updated.append(key)
+            elif before:
+                changes.removed[key] = removed[key]
+            elif after:
+                changes.added.append(key)
+        return changes
@@ -1,13 +1,28 @@
-from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, TypedDict
+import asyncio
+import json
+import uuid
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NotRequired,
+    Tuple,
+    TypedDict,
+)
 
 from omu.client.client import Client
-from omu.connection import ConnectionListener
+from omu.connection import ConnectionListener, SubscriptionManifest
 from omu.event.event import JsonEventType, SerializeEventType
-from omu.extension.endpoint.endpoint import JsonEndpointType
+from omu.extension.endpoint.endpoint import EndpointPolicy, JsonEndpointType
 from omu.extension.extension import Extension, define_extension_type
 from omu.interface import Keyable, Serializer
 
 from .model.table_info import TableInfo
+from .table_index import TableIndex
 from .table import (
     AsyncCallback,
     CallbackTableListener,
@@ -18,12 +33,27 @@ from .table import (
 )
 
 type Coro[**P, T] = Callable[P, Awaitable[T]]
+type Sizer = Callable[[Any], int]
+
+
+def serialized_size(data: Any) -> int:
+    return len(json.dumps(data, separators=(",", ":")))
+
+
+class TableExtensionListener:
+    async def on_evict(self, table: Table, items: Dict[str, Any]) -> None:
+        ...
 
 
 class TableExtension(Extension):
     def __init__(self, client: Client):
         self._client = client
         self._tables: Dict[str, Table] = {}
+        self._listeners: List[TableExtensionListener] = []
+        self._recent: Dict[str, None] = {}
+        self._memory = 0
+        self.budget: int | None = None
+        self.sizer: Sizer | None = None
         client.events.register(
             TableRegisterEvent,
             TableListenEvent,
@@ -34,25 +64,87 @@ class TableExtension(Extension):
             TableItemRemoveEvent,
             TableItemClearEvent,
         )
-        self.tables = self.get(TablesTableType)
+        self._tables_table: Table[TableInfo] | None = None
 
-    def register[K: Keyable](self, type: TableType[K, Any]) -> Table[K]:
+    @property
+    def tables(self) -> Table[TableInfo]:
+        if self._tables_table is None:
+            self._tables_table = self.get(TablesTableType)
+        return self._tables_table
+
+    def register[K: Keyable](
+        self, type: TableType[K, Any], optimistic: bool = False
+    ) -> Table[K]:
         if self.has(type):
             raise Exception(f"Table for key {type.info.key()} already registered")
-        table = TableImpl(self._client, type, owner=True)
+        table = TableImpl(
+            self._client, type, owner=True, optimistic=optimistic, extension=self
+        )
         self._tables[type.info.key()] = table
         return table
 
-    def get[K: Keyable](self, type: TableType[K, Any]) -> Table[K]:
+    def get[K: Keyable](
+        self, type: TableType[K, Any], optimistic: bool | None = None
+    ) -> Table[K]:
         if self.has(type):
-            return self._tables[type.info.key()]
-        table = TableImpl(self._client, type)
+            table = self._tables[type.info.key()]
+            if (
+                optimistic is not None
+                and isinstance(table, TableImpl)
+                and table.optimistic != optimistic
+            ):
+                raise Exception(
+                    f"Table for key {type.info.key()} already registered with "
+                    f"optimistic={table.optimistic}"
+                )
+            return table
+        table = TableImpl(
+            self._client, type, optimistic=bool(optimistic), extension=self
+        )
         self._tables[type.info.key()] = table
         return table
 
     def has(self, type: TableType[Any, Any]) -> bool:
         return type.info.key() in self._tables
 
+    @property
+    def memory(self) -> int:
+        return self._memory
+
+    def set_budget(self, budget: int | None, sizer: Sizer | None = None) -> None:
+        self.budget = budget
+        self.sizer = sizer or self.sizer or serialized_size
+
+    def add_listener[T: TableExtensionListener](self, listener: T) -> T:
+        self._listeners.append(listener)
+        return listener
+
+    def remove_listener[T: TableExtensionListener](self, listener: T) -> T:
+        self._listeners.remove(listener)
+        return listener
+
+    def _touch(self, key: str) -> None:
+        self._recent.pop(key, None)
+        self._recent[key] = None
+
+    async def _account(self, delta: int) -> None:
+        self._memory += delta
+        if self.budget is None or self._memory <= self.budget:
+            return
+        order = [key for key in self._tables if key not in self._recent]
+        order.extend(self._recent.keys())
+        for key in order:
+            table = self._tables[key]
+            if not isinstance(table, TableImpl):
+                continue
+            freed, items = await table._evict(self._memory - self.budget)
+            self._memory -= freed
+            if items:
+                for listener in self._listeners:
+                    await listener.on_evict(table, items)
+            if self._memory <= self.budget:
+                break
+
 
 TableExtensionType = define_extension_type(
     "table", lambda client: TableExtension(client), lambda: []
@@ -66,6 +158,7 @@ class TableEventData(TypedDict):
 class TableItemsEventData(TypedDict):
     items: Dict[str, Any]
     type: str
+    id: NotRequired[str]
 
 
 class TableProxyEventData(TypedDict):
@@ -113,6 +206,7 @@ TableItemGetEndpoint = JsonEndpointType[
 ].of_extension(
     TableExtensionType,
     "item_get",
+    policy=EndpointPolicy(idempotent=True),
 )
 
 
@@ -124,10 +218,10 @@ class TableFetchReq(TypedDict):
 
 
 TableItemFetchEndpoint = JsonEndpointType[TableFetchReq, Dict[str, Any]].of_extension(
-    TableExtensionType, "item_fetch"
+    TableExtensionType, "item_fetch", policy=EndpointPolicy(idempotent=True)
 )
 TableItemSizeEndpoint = JsonEndpointType[TableEventData, int].of_extension(
-    TableExtensionType, "item_size"
+    TableExtensionType, "item_size", policy=EndpointPolicy(idempotent=True)
 )
 TablesTableType = ModelTableType.of_extension(
     TableExtensionType,
@@ -136,16 +230,47 @@ TablesTableType = ModelTableType.of_extension(
 )
 
 
+class PendingWrite[T: Keyable]:
+    def __init__(
+        self,
+        id: str,
+        items: Dict[str, Any],
+        previous: Dict[str, T | None],
+    ):
+        self.id = id
+        self.items = items
+        self.previous = previous
+        self.timer: asyncio.TimerHandle | None = None
+
+
 class TableImpl[T: Keyable](Table[T], ConnectionListener):
-    def __init__(self, client: Client, type: TableType[T, Any], owner: bool = False):
+    def __init__(
+        self,
+        client: Client,
+        type: TableType[T, Any],
+        owner: bool = False,
+        optimistic: bool = False,
+        optimistic_timeout: float = 10,
+        extension: TableExtension | None = None,
+    ):
         self._client = client
         self._type = type
         self._owner = owner
+        self._extension = extension
+        self._sizes: Dict[str, int] = {}
+        self._sizer: Sizer | None = None
+        self._memory = 0
+        self._optimistic = optimistic
+        self.optimistic_timeout = optimistic_timeout
+        self._pending: Dict[str, PendingWrite[T]] = {}
+        self._pending_keys: Dict[str, str] = {}
         self._cache: Dict[str, T] = {}
         self._listeners: List[TableListener[T]] = []
         self._proxies: List[Coro[[T], T | None]] = []
         self.key = type.info.key()
         self._listening = False
+        self._subscribed = False
+        self._index = TableIndex()
 
         client.events.add_listener(TableProxyEvent, self._on_proxy)
         client.events.add_listener(TableItemAddEvent, self._on_item_add)
@@ -156,37 +281,91 @@ class TableImpl[T: Keyable](Table[T], ConnectionListener):
 
     @property
     def cache(self) -> Dict[str, T]:
+        if self._extension:
+            self._extension._touch(self.key)
         return self._cache
 
+    @property
+    def memory(self) -> int:
+        return self._memory
+
+    @property
+    def optimistic(self) -> bool:
+        return self._optimistic
+
     async def get(self, key: str) -> T | None:
+        if self._extension:
+            self._extension._touch(self.key)
         if key in self._cache:
+            self._touch([key])
             return self._cache[key]
         res = await self._client.endpoints.call(
             TableItemGetEndpoint, TableKeysEventData(type=self.key, items=[key])
         )
         items = self._parse_items(res["items"])
         self._cache.update(items)
+        await self._account(res["items"])
         if key in items:
             return items[key]
         return None
 
     async def add(self, *items: T) -> None:
-        data = {item.key(): self._type.serializer.serialize(item) for item in items}
-        await self._client.send(
-            TableItemAddEvent, TableItemsEventData(type=self.key, items=data)
-        )
+        await self._write(TableItemAddEvent, items)
 
     async def update(self, *items: T) -> None:
-        data = {item.key(): self._type.serializer.serialize(item) for item in items}
-        await self._client.send(
-            TableItemUpdateEvent, TableItemsEventData(type=self.key, items=data)
-        )
+        await self._write(TableItemUpdateEvent, items)
 
     async def remove(self, *items: T) -> None:
+        await self._write(TableItemRemoveEvent, items, remove=True)
+
+    async def _write(
+        self,
+        event: JsonEventType[TableItemsEventData],
+        items: tuple[T, ...],
+        remove: bool = False,
+    ) -> None:
         data = {item.key(): self._type.serializer.serialize(item) for item in items}
-        await self._client.send(
-            TableItemRemoveEvent, TableItemsEventData(type=self.key, items=data)
+        if self._extension:
+            self._extension._touch(self.key)
+        if not self._optimistic or not self._subscribed:
+            await self._client.send(
+                event, TableItemsEventData(type=self.key, items=data)
+            )
+            return
+        write = PendingWrite(
+            id=uuid.uuid4().hex,
+            items=data,
+            previous={key: self._cache.get(key) for key in data.keys()},
+        )
+        self._pending[write.id] = write
+        for key in data.keys():
+            self._pending_keys[key] = write.id
+        write.timer = self._client.loop.call_later(
+            self.optimistic_timeout,
+            lambda: self._client.loop.create_task(self._rollback(write.id)),
         )
+        applied = {item.key(): item for item in items}
+        if remove:
+            for key in applied.keys():
+                self._cache.pop(key, None)
+        else:
+            self._cache.update(applied)
+        for listener in self._listeners:
+            if remove:
+                await listener.on_remove(applied)
+            elif event is TableItemAddEvent:
+                await listener.on_add(self._cached(applied))
+            else:
+                await listener.on_update(self._cached(applied))
+            await listener.on_cache_update(self._cache)
+        await self._account(data)
+        try:
+            await self._client.send(
+                event, TableItemsEventData(type=self.key, items=data, id=write.id)
+            )
+        except Exception as e:
+            await self._rollback(write.id)
+            raise e
 
     async def clear(self) -> None:
         await self._client.send(TableItemClearEvent, TableEventData(type=self.key))
@@ -196,15 +375,46 @@ class TableImpl[T: Keyable](Table[T], ConnectionListener):
         before: int | None = None,
         after: int | None = None,
         cursor: str | None = None,
+    ) -> Dict[str, T]:
+        if self._extension:
+            self._extension._touch(self.key)
+        local = self._index.slice(before, after, cursor) if self._subscribed else None
+        if local is None or any(key not in self._cache for key in local.keys):
+            return await self._fetch(before, after, cursor)
+        items = {key: self._cache[key] for key in local.keys}
+        self._touch(items.keys())
+        if local.complete:
+            return items
+        if before is not None:
+            missing = await self._fetch(local.remaining, None, local.cursor)
+            return {**missing, **items}
+        missing = await self._fetch(None, local.remaining, local.cursor)
+        return {**items, **missing}
+
+    async def _fetch(
+        self,
+        before: int | None = None,
+        after: int | None = None,
+        cursor: str | None = None,
     ) -> Dict[str, T]:
         res = await self._client.endpoints.call(
             TableItemFetchEndpoint,
             TableFetchReq(type=self.key, before=before, after=after, cursor=cursor),
         )
         items = self._parse_items(res)
+        if cursor:
+            items.pop(cursor, None)
         self._cache.update(items)
+        if self._subscribed:
+            self._index.record(
+                list(items.keys()),
+                before=before,
+                after=after,
+                cursor=cursor if cursor in self._cache else None,
+            )
         for listener in self._listeners:
             await listener.on_cache_update(self._cache)
+        await self._account(res)
         return items
 
     async def iter(
@@ -212,23 +422,22 @@ class TableImpl[T: Keyable](Table[T], ConnectionListener):
         backward: bool = False,
         cursor: str | None = None,
     ) -> AsyncGenerator[T, None]:
+        limit = self._type.info.cache_size
         items = await self.fetch(
-            before=self._type.info.cache_size if backward else None,
-            after=self._type.info.cache_size if not backward else None,
+            before=limit if backward else None,
+            after=limit if not backward else None,
             cursor=cursor,
         )
-        for item in items.values():
-            yield item
         while len(items) > 0:
-            cursor = next(iter(items.keys()))
+            for item in items.values():
+                yield item
+            keys = list(items.keys())
+            cursor = keys[0] if backward else keys[-1]
             items = await self.fetch(
-                before=self._type.info.cache_size if backward else None,
-                after=self._type.info.cache_size if not backward else None,
+                before=limit if backward else None,
+                after=limit if not backward else None,
                 cursor=cursor,
             )
-            for item in items.values():
-                yield item
-            items.pop(cursor, None)
 
     async def size(self) -> int:
         res = await self._client.endpoints.call(
@@ -255,22 +464,29 @@ class TableImpl[T: Keyable](Table[T], ConnectionListener):
         self._proxies.append(callback)
         return lambda: self._proxies.remove(callback)
 
-    async def on_connected(self) -> None:
+    async def on_manifest(self, manifest: SubscriptionManifest) -> None:
         if self._owner:
-            await self._client.send(TableRegisterEvent, self._type.info)
+            manifest.add(TableRegisterEvent, self._type.info)
         if self._listening:
-            await self._client.send(TableListenEvent, self.key)
+            manifest.add(TableListenEvent, self.key)
+            self._subscribed = True
             if self._type.info.cache_size:
-                await self.fetch(self._type.info.cache_size)
+                manifest.defer(lambda: self.fetch(self._type.info.cache_size))
         if len(self._proxies) > 0:
-            await self._client.send(TableProxyListenEvent, self.key)
+            manifest.add(TableProxyListenEvent, self.key)
+
+    async def on_disconnected(self) -> None:
+        self._subscribed = False
+        self._index.reset()
+        for id in list(self._pending.keys()):
+            await self._rollback(id)
 
     async def _on_proxy(self, event: TableProxyEventData) -> None:
         if event["type"] != self.key:
             return
         items = self._parse_items(event["items"])
         for proxy in self._proxies:
-            for key, item in items.items():
+            for key, item in list(items.items()):
                 if item := await proxy(item):
                     items[key] = item
                 else:
@@ -291,24 +507,41 @@ class TableImpl[T: Keyable](Table[T], ConnectionListener):
         if event["type"] != self.key:
             return
         items = self._parse_items(event["items"])
+        self._index.append(items.keys())
+        items = await self._reconcile(event, items)
+        if not items:
+            await self._account({})
+            return
         self._cache.update(items)
         for listener in self._listeners:
-            await listener.on_add(items)
+            await listener.on_add(self._cached(items))
             await listener.on_cache_update(self._cache)
+        await self._account(event["items"])
 
     async def _on_item_update(self, event: TableItemsEventData) -> None:
         if event["type"] != self.key:
             return
         items = self._parse_items(event["items"])
+        self._index.upsert(items.keys())
+        items = await self._reconcile(event, items)
+        if not items:
+            await self._account({})
+            return
         self._cache.update(items)
         for listener in self._listeners:
-            await listener.on_update(items)
+            await listener.on_update(self._cached(items))
             await listener.on_cache_update(self._cache)
+        await self._account(event["items"])
 
     async def _on_item_remove(self, event: TableItemsEventData) -> None:
         if event["type"] != self.key:
             return
         items = self._parse_items(event["items"])
+        self._index.remove(items.keys())
+        items = await self._reconcile(event, items, remove=True)
+        if not items:
+            await self._account({})
+            return
         for key in items.keys():
             if key not in self._cache:
                 continue
@@ -316,14 +549,145 @@ class TableImpl[T: Keyable](Table[T], ConnectionListener):
         for listener in self._listeners:
             await listener.on_remove(items)
             await listener.on_cache_update(self._cache)
+        await self._account(dict.fromkeys(items.keys()))
 
     async def _on_item_clear(self, event: TableEventData) -> None:
         if event["type"] != self.key:
             return
         self._cache.clear()
+        self._index.clear()
+        for write in self._pending.values():
+            write.previous = {key: None for key in write.previous.keys()}
         for listener in self._listeners:
             await listener.on_clear()
             await listener.on_cache_update(self._cache)
+        await self._account(dict.fromkeys(self._sizes.keys()))
+
+    async def _reconcile(
+        self, event: TableItemsEventData, items: Dict[str, T], remove: bool = False
+    ) -> Dict[str, T]:
+        write = self._pending.get(event.get("id", ""))
+        if write:
+            rejected = [key for key in write.previous if key not in event["items"]]
+            await self._rollback(write.id, rejected)
+            if remove:
+                items = {key: item for key, item in items.items() if key in self._cache}
+            else:
+                items = {
+                    key: item
+                    for key, item in items.items()
+                    if key not in self._cache
+                    or event["items"][key] != write.items.get(key)
+                }
+        for key in list(items.keys()):
+            id = self._pending_keys.get(key)
+            if id is None:
+                continue
+            item = items.pop(key)
+            self._pending[id].previous[key] = None if remove else item
+        return items
+
+    async def _rollback(self, id: str, keys: List[str] | None = None) -> None:
+        write = self._pending.pop(id, None)
+        if write is None:
+            return
+        if write.timer:
+            write.timer.cancel()
+        for key in write.previous.keys():
+            if self._pending_keys.get(key) == id:
+                del self._pending_keys[key]
+        added: Dict[str, T] = {}
+        updated: Dict[str, T] = {}
+        removed: Dict[str, T] = {}
+        for key in write.previous.keys() if keys is None else keys:
+            if key in self._pending_keys:
+                later = self._pending[self._pending_keys[key]]
+                later.previous[key] = write.previous[key]
+                continue
+            previous = write.previous[key]
+            current = self._cache.get(key)
+            if previous is None:
+                if current is not None:
+                    removed[key] = self._cache.pop(key)
+            elif current is None:
+                added[key] = self._cache[key] = previous
+            else:
+                updated[key] = self._cache[key] = previous
+        if not (added or updated or removed):
+            return
+        for listener in self._listeners:
+            if added:
+                await listener.on_add(self._cached(added))
+            if updated:
+                await listener.on_update(self._cached(updated))
+            if removed:
+                await listener.on_remove(removed)
+            await listener.on_cache_update(self._cache)
+        await self._account(
+            {
+                **{
+                    key: self._type.serializer.serialize(item)
+                    for key, item in {**added, **updated}.items()
+                },
+                **dict.fromkeys(removed.keys()),
+            }
+        )
+
+    def _touch(self, keys: Iterable[str]) -> None:
+        if not self._sizes:
+            return
+        for key in keys:
+            size = self._sizes.pop(key, None)
+            if size is not None:
+                self._sizes[key] = size
+
+    def _cached(self, items: Dict[str, T]) -> Dict[str, T]:
+        return {key: item for key, item in items.items() if key in self._cache}
+
+    def _measure(self, sizer: Sizer) -> int:
+        self._sizer = sizer
+        self._sizes = {
+            key: sizer(self._type.serializer.serialize(item))
+            for key, item in self._cache.items()
+        }
+        return sum(self._sizes.values()) - self._memory
+
+    async def _account(self, items: Dict[str, Any]) -> None:
+        if self._extension is None or self._extension.sizer is None:
+            return
+        sizer = self._extension.sizer
+        delta = self._measure(sizer) if self._sizer is not sizer else 0
+        for key, data in items.items():
+            delta -= self._sizes.pop(key, 0)
+            if key not in self._cache:
+                continue
+            size = sizer(data)
+            self._sizes[key] = size
+            delta += size
+        self._memory += delta
+        await self._extension._account(delta)
+
+    async def _evict(self, amount: int) -> Tuple[int, Dict[str, T]]:
+        evicted: Dict[str, T] = {}
+        freed = 0
+        for key in list(self._sizes.keys()):
+            if freed >= amount:
+                break
+            if key in self._pending_keys:
+                continue
+            freed += self._sizes.pop(key)
+            item = self._cache.pop(key, None)
+            if item is not None:
+                evicted[key] = item
+        if freed == 0:
+            return 0, evicted
+        self._memory -= freed
+        self._index.evict(evicted.keys())
+        for listener in self._listeners:
+            if evicted:
+                await listener.on_remove(evicted)
+            await listener.on_cache_update(self._cache)
+        return freed, evicted
 
     def _parse_items(self, items: Dict[str, Any]) -> Dict[str, T]:
         parsed: Dict[str, T] = {}
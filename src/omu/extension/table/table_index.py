@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List
+
+
+class IndexSegment:
+    def __init__(self, keys: List[str], head: bool = False, tail: bool = False):
+        self.keys = keys
+        self.head = head
+        self.tail = tail
+
+
+class IndexSlice:
+    def __init__(self, keys: List[str], cursor: str | None, remaining: int):
+        self.keys = keys
+        self.cursor = cursor
+        self.remaining = remaining
+
+    @property
+    def complete(self) -> bool:
+        return self.remaining == 0
+
+
+class TableIndex:
+    def __init__(self) -> None:
+        self._segments: Dict[str, IndexSegment] = {}
+        self._head: IndexSegment | None = None
+        self._tail: IndexSegment | None = None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._segments
+
+    def reset(self) -> None:
+        self._segments.clear()
+        self._head = None
+        self._tail = None
+
+    def clear(self) -> None:
+        self.reset()
+        segment = IndexSegment([], head=True, tail=True)
+        self._head = segment
+        self._tail = segment
+
+    def record(
+        self,
+        keys: List[str],
+        before: int | None = None,
+        after: int | None = None,
+        cursor: str | None = None,
+    ) -> None:
+        if (before is None) == (after is None):
+            return
+        if before is not None:
+            run = keys + [cursor] if cursor else keys
+            self.insert(run, head=cursor is None, tail=len(keys) < before)
+        elif after is not None:
+            run = [cursor] + keys if cursor else keys
+            self.insert(run, head=len(keys) < after, tail=cursor is None)
+
+    def insert(self, keys: Iterable[str], head: bool = False, tail: bool = False):
+        run = IndexSegment(list(dict.fromkeys(keys)), head=head, tail=tail)
+        overlapping: List[IndexSegment] = []
+        for key in run.keys:
+            segment = self._segments.get(key)
+            if segment and segment not in overlapping:
+                overlapping.append(segment)
+        for segment in overlapping:
+            run = self._merge(segment, run)
+        if self._head and run.head and self._head not in overlapping:
+            run.head = False
+        if self._tail and run.tail and self._tail not in overlapping:
+            run.tail = False
+        self._attach(run)
+
+    def append(self, keys: Iterable[str]) -> None:
+        keys = [key for key in keys if key not in self._segments]
+        if not keys:
+            return
+        if self._head is None:
+            self.insert(keys, head=True)
+            return
+        self._head.keys.extend(keys)
+        for key in keys:
+            self._segments[key] = self._head
+
+    def upsert(self, keys: Iterable[str]) -> None:
+        keys = [key for key in keys if key not in self._segments]
+        if not keys:
+            return
+        if self._head is not None and self._head is self._tail:
+            self.append(keys)
+            return
+        if self._head is not None:
+            self._head.head = False
+            self._head = None
+
+    def remove(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            segment = self._segments.pop(key, None)
+            if segment:
+                segment.keys.remove(key)
+
+    def evict(self, keys: Iterable[str]) -> None:
+        evicted: Dict[int, IndexSegment] = {}
+        for key in keys:
+            segment = self._segments.pop(key, None)
+            if segment:
+                evicted[id(segment)] = segment
+        for segment in evicted.values():
+            if self._head is segment:
+                self._head = None
+            if self._tail is segment:
+                self._tail = None
+            run = IndexSegment([], tail=segment.tail)
+            for key in segment.keys:
+                if key in self._segments:
+                    run.keys.append(key)
+                    continue
+                if run.keys:
+                    self._attach(run)
+                run = IndexSegment([])
+            if run.keys:
+                run.head = segment.head
+                self._attach(run)
+
+    def before(self, cursor: str | None, count: int) -> IndexSlice | None:
+        if cursor is None:
+            segment = self._head
+            if segment is None:
+                return None
+            end = len(segment.keys)
+        else:
+            segment = self._segments.get(cursor)
+            if segment is None:
+                return None
+            end = segment.keys.index(cursor)
+        keys = segment.keys[max(end - count, 0) : end]
+        remaining = count - len(keys)
+        if remaining == 0 or segment.tail:
+            return IndexSlice(keys, None, 0)
+        return IndexSlice(keys, keys[0] if keys else cursor, remaining)
+
+    def after(self, cursor: str | None, count: int) -> IndexSlice | None:
+        if cursor is None:
+            segment = self._tail
+            if segment is None:
+                return None
+            start = 0
+        else:
+            segment = self._segments.get(cursor)
+            if segment is None:
+                return None
+            start = segment.keys.index(cursor) + 1
+        keys = segment.keys[start : start + count]
+        remaining = count - len(keys)
+        if remaining == 0 or segment.head:
+            return IndexSlice(keys, None, 0)
+        return IndexSlice(keys, keys[-1] if keys else cursor, remaining)
+
+    def slice(
+        self,
+        before: int | None = None,
+        after: int | None = None,
+        cursor: str | None = None,
+    ) -> IndexSlice | None:
+        if before is not None and after is None:
+            return self.before(cursor, before)
+        if after is not None and before is None:
+            return self.after(cursor, after)
+        return None
+
+    def _merge(self, a: IndexSegment, b: IndexSegment) -> IndexSegment:
+        shared = next(i for i, key in enumerate(b.keys) if self._segments.get(key) is a)
+        offset = a.keys.index(b.keys[shared]) - shared
+        if offset >= 0:
+            keys = a.keys[:offset] + b.keys + a.keys[offset + len(b.keys) :]
+        else:
+            keys = b.keys[:-offset] + a.keys + b.keys[len(a.keys) - offset :]
+        return IndexSegment(
+            list(dict.fromkeys(keys)),
+            head=a.head or b.head,
+            tail=a.tail or b.tail,
+        )
+
+    def _attach(self, segment: IndexSegment) -> None:
+        for key in segment.keys:
+            self._segments[key] = segment
+        if segment.head:
+            self._head = segment
+        if segment.tail:
+            self._tail = segment
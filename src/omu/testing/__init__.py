@@ -0,0 +1,7 @@
+from .server import LocalServer
+from .session import LocalConnection
+
+__all__ = [
+    "LocalConnection",
+    "LocalServer",
+]
@@ -0,0 +1,19 @@
+import argparse
+import asyncio
+
+from omu.testing import LocalServer
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local omu server stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=26423)
+    parser.add_argument("--path", default=None)
+    parser.add_argument("--latency", type=float, default=0)
+    args = parser.parse_args()
+    async with LocalServer(args.host, args.port, args.path, args.latency):
+        await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,818 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import uuid
+from collections import Counter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Set,
+    Tuple,
+)
+
+from loguru import logger
+
+from omu.connection import Address
+from omu.connection.unix_connection import READ_SIZE, decode_frames
+from omu.event import EVENTS, EventJson
+from omu.extension.asset.asset_extension import (
+    AssetAck,
+    AssetAckEvent,
+    AssetBeginEndpoint,
+    AssetBeginReq,
+    AssetCheckEndpoint,
+    AssetChunkEvent,
+    AssetCommitEndpoint,
+    AssetHaveEndpoint,
+    AssetStatusEndpoint,
+    AssetUploadEndpoint,
+)
+from omu.extension.asset.asset_index import hash_bytes
+from omu.extension.endpoint.endpoint_extension import (
+    EndpointBatchReceive,
+    EndpointCallBatchEvent,
+    EndpointCallEvent,
+    EndpointCancelEvent,
+    EndpointDataReq,
+    EndpointError,
+    EndpointErrorEvent,
+    EndpointReceiveBatchEvent,
+    EndpointReceiveEvent,
+    EndpointRegisterEvent,
+    EndpointReq,
+    EndpointStreamCallEvent,
+    EndpointStreamChunk,
+    EndpointStreamChunkEvent,
+    EndpointStreamCreditEvent,
+    EndpointStreamCreditReq,
+    EndpointStreamEndEvent,
+    EndpointStreamReq,
+)
+from omu.extension.message.message_extension import (
+    MessageBatchEventData,
+    MessageBroadcastBatchEvent,
+    MessageBroadcastEvent,
+    MessageEventData,
+    MessageListenEvent,
+    MessageRegisterEvent,
+)
+from omu.extension.registry.registry_extension import (
+    RegistryEventData,
+    RegistryGetEndpoint,
+    RegistryGetManyEndpoint,
+    RegistryListenEvent,
+    RegistrySnapshotEndpoint,
+    RegistryUpdateEvent,
+    RegistryUpdateManyEvent,
+)
+from omu.extension.server.server_extension import (
+    AppsTableType,
+    ShutdownEndpointType,
+)
+from omu.extension.table.table_extension import (
+    TableEventData,
+    TableFetchReq,
+    TableItemAddEvent,
+    TableItemClearEvent,
+    TableItemFetchEndpoint,
+    TableItemGetEndpoint,
+    TableItemRemoveEvent,
+    TableItemsEventData,
+    TableItemSizeEndpoint,
+    TableItemUpdateEvent,
+    TableKeysEventData,
+    TableListenEvent,
+    TableProxyEndpoint,
+    TableProxyEvent,
+    TableProxyEventData,
+    TableProxyListenEvent,
+    TableRegisterEvent,
+    TablesTableType,
+)
+
+from .session import LocalConnection, Session, UnixSession, WebsocketSession
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+    from omu.extension.server.model.app import App
+
+type Handler = Callable[[Session, Any], Awaitable[None]]
+type EndpointHandler = Callable[[Session, Any], Awaitable[Any]]
+
+
+class ServerTable:
+    def __init__(self, key: str):
+        self.key = key
+        self.info: Dict[str, Any] | None = None
+        self.items: Dict[str, Any] = {}
+        self.listeners: Set[Session] = set()
+        self.proxies: List[Session] = []
+        self.lock = asyncio.Lock()
+
+
+class ServerUpload:
+    def __init__(self, id: str, asset: str, size: int | None, hash: str | None):
+        self.id = id
+        self.asset = asset
+        self.size = size
+        self.hash = hash
+        self.data = bytearray()
+
+
+class RemoteCall:
+    def __init__(self, caller: Session, id: int, type: str, owner: Session):
+        self.caller = caller
+        self.id = id
+        self.type = type
+        self.owner = owner
+
+
+class ProxyWaiter:
+    def __init__(self, proxy: Session, items: Dict[str, Any], future: asyncio.Future):
+        self.proxy = proxy
+        self.items = items
+        self.future = future
+
+
+class LocalServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        path: str | None = None,
+        latency: float = 0,
+        proxy_timeout: float = 10,
+    ):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.latency = latency
+        self.proxy_timeout = proxy_timeout
+        self.sessions: Set[Session] = set()
+        self.received: Counter[str] = Counter()
+        self.called: Counter[str] = Counter()
+        self.tables: Dict[str, ServerTable] = {}
+        self.registry: Dict[str, Any] = {}
+        self.assets: Dict[str, bytes] = {}
+        self._running = False
+        self._runner: web.AppRunner | None = None
+        self._unix: asyncio.AbstractServer | None = None
+        self._sockets: Set[web.WebSocketResponse] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._served: Dict[str, Session] = {}
+        self._calls: Dict[int, RemoteCall] = {}
+        self._call_ids: Dict[Tuple[Session, int], int] = {}
+        self._call_id = 0
+        self._proxy_waiters: Dict[int, ProxyWaiter] = {}
+        self._proxy_key = 0
+        self._registry_listeners: Dict[str, Set[Session]] = {}
+        self._message_listeners: Dict[str, Set[Session]] = {}
+        self._uploads: Dict[str, ServerUpload] = {}
+        self._hashes: Dict[str, str] = {}
+        self._asset_hashes: Dict[str, str] = {}
+        self._apps = self._table(AppsTableType.info.key())
+        self._tables = self._table(TablesTableType.info.key())
+        self._handlers: Dict[str, Handler] = {
+            EVENTS.Connect.type: self._on_connect,
+            EVENTS.Disconnect.type: self._on_disconnect,
+            EVENTS.Bundle.type: self._on_bundle,
+            TableRegisterEvent.type: self._on_table_register,
+            TableListenEvent.type: self._on_table_listen,
+            TableProxyListenEvent.type: self._on_table_proxy_listen,
+            TableItemAddEvent.type: self._on_item_add,
+            TableItemUpdateEvent.type: self._on_item_update,
+            TableItemRemoveEvent.type: self._on_item_remove,
+            TableItemClearEvent.type: self._on_item_clear,
+            EndpointRegisterEvent.type: self._on_endpoint_register,
+            EndpointCallEvent.type: self._on_endpoint_call,
+            EndpointCallBatchEvent.type: self._on_endpoint_call_batch,
+            EndpointReceiveEvent.type: self._on_endpoint_receive,
+            EndpointErrorEvent.type: self._on_endpoint_error,
+            EndpointCancelEvent.type: self._on_endpoint_cancel,
+            EndpointStreamCallEvent.type: self._on_stream_call,
+            EndpointStreamChunkEvent.type: self._on_stream_chunk,
+            EndpointStreamEndEvent.type: self._on_stream_end,
+            EndpointStreamCreditEvent.type: self._on_stream_credit,
+            RegistryListenEvent.type: self._on_registry_listen,
+            RegistryUpdateEvent.type: self._on_registry_update,
+            RegistryUpdateManyEvent.type: self._on_registry_update_many,
+            MessageRegisterEvent.type: self._on_message_register,
+            MessageListenEvent.type: self._on_message_listen,
+            MessageBroadcastEvent.type: self._on_message_broadcast,
+            MessageBroadcastBatchEvent.type: self._on_message_broadcast_batch,
+            AssetChunkEvent.type: self._on_asset_chunk,
+        }
+        self._endpoints: Dict[str, EndpointHandler] = {
+            TableItemGetEndpoint.info.key(): self._table_get,
+            TableItemFetchEndpoint.info.key(): self._table_fetch,
+            TableItemSizeEndpoint.info.key(): self._table_size,
+            TableProxyEndpoint.info.key(): self._table_proxy,
+            RegistryGetEndpoint.info.key(): self._registry_get,
+            RegistryGetManyEndpoint.info.key(): self._registry_get_many,
+            RegistrySnapshotEndpoint.info.key(): self._registry_snapshot,
+            AssetUploadEndpoint.info.key(): self._asset_upload,
+            AssetBeginEndpoint.info.key(): self._asset_begin,
+            AssetCommitEndpoint.info.key(): self._asset_commit,
+            AssetStatusEndpoint.info.key(): self._asset_status,
+            AssetHaveEndpoint.info.key(): self._asset_have,
+            AssetCheckEndpoint.info.key(): self._asset_check,
+            ShutdownEndpointType.info.key(): self._shutdown,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def address(self) -> Address:
+        return Address(self.host, self.port)
+
+    @property
+    def unix_address(self) -> Address:
+        if self.path is None:
+            raise ValueError("LocalServer was created without a unix socket path")
+        return Address(self.host, self.port, path=self.path)
+
+    def connection(self, app: App) -> LocalConnection:
+        return LocalConnection(self, app)
+
+    async def __aenter__(self) -> LocalServer:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        if self._running:
+            raise RuntimeError("Already running")
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/ws", self._handle_websocket)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.port = self._runner.addresses[0][1]
+        if self.path is not None:
+            self._unix = await asyncio.start_unix_server(self._handle_unix, self.path)
+        self._running = True
+        logger.info(f"LocalServer listening on {self.address}")
+
+    async def stop(self) -> None:
+        self._running = False
+        await self._close_sessions()
+        if self._unix is not None:
+            self._unix.close()
+            await self._unix.wait_closed()
+            self._unix = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        for task in list(self._tasks):
+            task.cancel()
+
+    async def restart(self) -> None:
+        await self._close_sessions()
+        self._uploads.clear()
+
+    async def _close_sessions(self) -> None:
+        for session in list(self.sessions):
+            await session.close()
+        for socket in list(self._sockets):
+            await socket.close()
+
+    async def receive(self, session: Session, type: str, data: Any) -> None:
+        handler = self._handlers.get(type)
+        if handler is None:
+            logger.warning(f"Unknown event {type} from {session.name}")
+            return
+        self.received[type] += 1
+        await handler(session, data)
+
+    def _spawn(self, coro: Coroutine[Any, Any, Any]) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        from aiohttp import web
+
+        socket = web.WebSocketResponse(max_msg_size=0)
+        await socket.prepare(request)
+        self._sockets.add(socket)
+        sessions: Dict[int | None, WebsocketSession] = {}
+        try:
+            async for msg in socket:
+                if msg.type == web.WSMsgType.TEXT:
+                    envelope = json.loads(msg.data)
+                    channel = envelope.get("channel")
+                    type, data = envelope["type"], envelope.get("data")
+                elif msg.type == web.WSMsgType.BINARY:
+                    header, data = EventJson.split_binary(msg.data)
+                    channel, type = header.get("channel"), header["type"]
+                else:
+                    continue
+                session = sessions.get(channel)
+                if session is None or session.closed:
+                    session = WebsocketSession(self, socket, channel)
+                    sessions[channel] = session
+                    self.sessions.add(session)
+                await self.receive(session, type, data)
+        finally:
+            for session in sessions.values():
+                await session.close()
+            self._sockets.discard(socket)
+        return socket
+
+    async def _handle_unix(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        session = UnixSession(self, writer)
+        self.sessions.add(session)
+        buffer = bytearray()
+        try:
+            while data := await reader.read(READ_SIZE):
+                buffer += data
+                for event in decode_frames(buffer):
+                    await self.receive(session, event.type, event.data)
+        except ConnectionError:
+            pass
+        finally:
+            await session.close()
+
+    async def _on_session_closed(self, session: Session) -> None:
+        self.sessions.discard(session)
+        for table in self.tables.values():
+            table.listeners.discard(session)
+            if session in table.proxies:
+                table.proxies.remove(session)
+        for waiter in self._proxy_waiters.values():
+            if waiter.proxy is session and not waiter.future.done():
+                waiter.future.set_result(waiter.items)
+        for key in [key for key, owner in self._served.items() if owner is session]:
+            del self._served[key]
+        for id, call in list(self._calls.items()):
+            if call.owner is session:
+                self._forget(id)
+                await call.caller.send(
+                    EndpointErrorEvent.type,
+                    EndpointError(
+                        type=call.type,
+                        id=call.id,
+                        error=f"Endpoint {call.type} owner disconnected",
+                    ),
+                )
+            elif call.caller is session:
+                self._forget(id)
+                await call.owner.send(
+                    EndpointCancelEvent.type, EndpointReq(type=call.type, id=id)
+                )
+        for listeners in self._registry_listeners.values():
+            listeners.discard(session)
+        for listeners in self._message_listeners.values():
+            listeners.discard(session)
+        if session.app is not None and not any(
+            other.app and other.app.key() == session.app.key()
+            for other in self.sessions
+        ):
+            await self._delete(self._apps, [session.app.key()])
+
+    async def _on_connect(self, session: Session, data: Any) -> None:
+        event = EVENTS.Connect.serializer.deserialize(data)
+        session.app = event.app
+        session.token = event.token or uuid.uuid4().hex
+        await session.send(EVENTS.Token.type, session.token)
+        await self._put(self._apps, {event.app.key(): event.app.to_json()})
+        await session.send(EVENTS.Ready.type, None)
+
+    async def _on_disconnect(self, session: Session, data: Any) -> None:
+        await session.close()
+
+    async def _on_bundle(self, session: Session, data: List[Any]) -> None:
+        for entry in data:
+            await self.receive(session, entry["type"], entry["data"])
+
+    def _table(self, key: str) -> ServerTable:
+        table = self.tables.get(key)
+        if table is None:
+            table = self.tables[key] = ServerTable(key)
+        return table
+
+    async def _put(self, table: ServerTable, items: Dict[str, Any]) -> None:
+        added = {key: item for key, item in items.items() if key not in table.items}
+        updated = {key: item for key, item in items.items() if key in table.items}
+        table.items.update(items)
+        if added:
+            await self._broadcast(
+                table.listeners,
+                TableItemAddEvent.type,
+                TableItemsEventData(type=table.key, items=added),
+            )
+        if updated:
+            await self._broadcast(
+                table.listeners,
+                TableItemUpdateEvent.type,
+                TableItemsEventData(type=table.key, items=updated),
+            )
+
+    async def _delete(self, table: ServerTable, keys: List[str]) -> None:
+        removed = {key: table.items.pop(key) for key in keys if key in table.items}
+        if removed:
+            await self._broadcast(
+                table.listeners,
+                TableItemRemoveEvent.type,
+                TableItemsEventData(type=table.key, items=removed),
+            )
+
+    async def _broadcast(self, sessions: Set[Session], type: str, data: Any) -> None:
+        for session in list(sessions):
+            await session.send(type, data)
+
+    async def _on_table_register(self, session: Session, info: Any) -> None:
+        key = f"{info['owner']}:{info['name']}"
+        self._table(key).info = info
+        await self._put(self._tables, {key: info})
+
+    async def _on_table_listen(self, session: Session, key: str) -> None:
+        self._table(key).listeners.add(session)
+
+    async def _on_table_proxy_listen(self, session: Session, key: str) -> None:
+        table = self._table(key)
+        if session not in table.proxies:
+            table.proxies.append(session)
+
+    async def _on_item_add(self, session: Session, data: TableItemsEventData) -> None:
+        self._spawn(self._write(session, TableItemAddEvent.type, data))
+
+    async def _on_item_update(
+        self, session: Session, data: TableItemsEventData
+    ) -> None:
+        self._spawn(self._write(session, TableItemUpdateEvent.type, data))
+
+    async def _on_item_remove(
+        self, session: Session, data: TableItemsEventData
+    ) -> None:
+        self._spawn(self._write(session, TableItemRemoveEvent.type, data))
+
+    async def _on_item_clear(self, session: Session, data: TableEventData) -> None:
+        table = self._table(data["type"])
+        async with table.lock:
+            table.items.clear()
+            await self._broadcast(
+                table.listeners,
+                TableItemClearEvent.type,
+                TableEventData(type=table.key),
+            )
+
+    async def _write(
+        self, session: Session, type: str, data: TableItemsEventData
+    ) -> None:
+        table = self._table(data["type"])
+        async with table.lock:
+            items = data["items"]
+            if type == TableItemRemoveEvent.type:
+                items = {
+                    key: table.items.pop(key) for key in items if key in table.items
+                }
+            else:
+                for proxy in list(table.proxies):
+                    if not items:
+                        break
+                    items = await self._proxy(proxy, table, items)
+                table.items.update(items)
+            event = TableItemsEventData(type=table.key, items=items)
+            if "id" in data:
+                event["id"] = data["id"]
+            elif not items:
+                return
+            await self._broadcast(table.listeners, type, event)
+
+    async def _proxy(
+        self, proxy: Session, table: ServerTable, items: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        self._proxy_key += 1
+        key = self._proxy_key
+        future = asyncio.get_running_loop().create_future()
+        self._proxy_waiters[key] = ProxyWaiter(proxy, items, future)
+        try:
+            await proxy.send(
+                TableProxyEvent.type,
+                TableProxyEventData(type=table.key, key=key, items=items),
+            )
+            return await asyncio.wait_for(future, self.proxy_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Proxy {proxy.name} timed out on {table.key}")
+            return items
+        finally:
+            del self._proxy_waiters[key]
+
+    async def _table_proxy(self, session: Session, data: TableProxyEventData) -> int:
+        waiter = self._proxy_waiters.get(data["key"])
+        if waiter and waiter.proxy is session and not waiter.future.done():
+            waiter.future.set_result(data["items"])
+        return data["key"]
+
+    async def _table_get(
+        self, session: Session, req: TableKeysEventData
+    ) -> TableItemsEventData:
+        table = self._table(req["type"])
+        return TableItemsEventData(
+            type=table.key,
+            items={key: table.items[key] for key in req["items"] if key in table.items},
+        )
+
+    async def _table_fetch(self, session: Session, req: TableFetchReq) -> Any:
+        table = self._table(req["type"])
+        keys = list(table.items.keys())
+        head, tail = keys, keys
+        cursor = req.get("cursor")
+        if cursor is not None:
+            if cursor not in table.items:
+                return {}
+            index = keys.index(cursor)
+            head, tail = keys[:index], keys[index + 1 :]
+        before, after = req.get("before"), req.get("after")
+        if before is not None:
+            selected = head[max(len(head) - before, 0) :]
+        elif after is not None:
+            selected = tail[:after]
+        else:
+            selected = keys
+        return {key: table.items[key] for key in selected}
+
+    async def _table_size(self, session: Session, req: TableEventData) -> int:
+        return len(self._table(req["type"]).items)
+
+    async def _on_endpoint_register(self, session: Session, info: Any) -> None:
+        self._served[f"{info['owner']}:{info['name']}"] = session
+
+    async def _on_endpoint_call(self, session: Session, req: EndpointDataReq) -> None:
+        self.called[req["type"]] += 1
+        handler = self._endpoints.get(req["type"])
+        if handler is None:
+            await self._forward(session, req, EndpointCallEvent.type, req)
+            return
+        try:
+            result = await handler(session, req["data"])
+        except Exception as e:
+            await session.send(EndpointErrorEvent.type, self._error(req, e))
+            return
+        await session.send(
+            EndpointReceiveEvent.type,
+            EndpointDataReq(type=req["type"], id=req["id"], data=result),
+        )
+
+    async def _on_endpoint_call_batch(
+        self, session: Session, reqs: List[EndpointDataReq]
+    ) -> None:
+        receive = EndpointBatchReceive(items=[], errors=[])
+        for req in reqs:
+            self.called[req["type"]] += 1
+            handler = self._endpoints.get(req["type"])
+            if handler is None:
+                await self._forward(session, req, EndpointCallEvent.type, req)
+                continue
+            try:
+                result = await handler(session, req["data"])
+            except Exception as e:
+                receive["errors"].append(self._error(req, e))
+                continue
+            receive["items"].append(
+                EndpointDataReq(type=req["type"], id=req["id"], data=result)
+            )
+        if receive["items"] or receive["errors"]:
+            await session.send(EndpointReceiveBatchEvent.type, receive)
+
+    def _error(self, req: EndpointReq, error: Exception) -> EndpointError:
+        return EndpointError(type=req["type"], id=req["id"], error=str(error))
+
+    async def _forward(
+        self, caller: Session, req: EndpointReq, type: str, data: Any
+    ) -> None:
+        owner = self._served.get(req["type"])
+        if owner is None:
+            await caller.send(
+                EndpointErrorEvent.type,
+                EndpointError(
+                    type=req["type"],
+                    id=req["id"],
+                    error=f"Endpoint {req['type']} not found",
+                ),
+            )
+            return
+        self._call_id += 1
+        id = self._call_id
+        self._calls[id] = RemoteCall(caller, req["id"], req["type"], owner)
+        self._call_ids[(caller, req["id"])] = id
+        await owner.send(type, {**data, "id": id})
+
+    def _forget(self, id: int) -> RemoteCall | None:
+        call = self._calls.pop(id, None)
+        if call is not None:
+            self._call_ids.pop((call.caller, call.id), None)
+        return call
+
+    def _owned(self, session: Session, id: int) -> RemoteCall | None:
+        call = self._calls.get(id)
+        if call is None or call.owner is not session:
+            return None
+        return call
+
+    async def _on_endpoint_receive(
+        self, session: Session, data: EndpointDataReq
+    ) -> None:
+        if self._owned(session, data["id"]) is None:
+            return
+        call = self._forget(data["id"])
+        assert call is not None
+        await call.caller.send(EndpointReceiveEvent.type, {**data, "id": call.id})
+
+    async def _on_endpoint_error(self, session: Session, data: EndpointError) -> None:
+        if self._owned(session, data["id"]) is None:
+            return
+        call = self._forget(data["id"])
+        assert call is not None
+        await call.caller.send(EndpointErrorEvent.type, {**data, "id": call.id})
+
+    async def _on_endpoint_cancel(self, session: Session, data: EndpointReq) -> None:
+        id = self._call_ids.get((session, data["id"]))
+        if id is None:
+            return
+        call = self._forget(id)
+        assert call is not None
+        await call.owner.send(
+            EndpointCancelEvent.type, EndpointReq(type=call.type, id=id)
+        )
+
+    async def _on_stream_call(self, session: Session, req: EndpointStreamReq) -> None:
+        await self._forward(session, req, EndpointStreamCallEvent.type, req)
+
+    async def _on_stream_chunk(
+        self, session: Session, data: EndpointStreamChunk
+    ) -> None:
+        call = self._owned(session, data["id"])
+        if call is None:
+            return
+        await call.caller.send(EndpointStreamChunkEvent.type, {**data, "id": call.id})
+
+    async def _on_stream_end(self, session: Session, data: EndpointReq) -> None:
+        if self._owned(session, data["id"]) is None:
+            return
+        call = self._forget(data["id"])
+        assert call is not None
+        await call.caller.send(EndpointStreamEndEvent.type, {**data, "id": call.id})
+
+    async def _on_stream_credit(
+        self, session: Session, data: EndpointStreamCreditReq
+    ) -> None:
+        id = self._call_ids.get((session, data["id"]))
+        if id is None:
+            return
+        await self._calls[id].owner.send(
+            EndpointStreamCreditEvent.type, {**data, "id": id}
+        )
+
+    async def _on_registry_listen(self, session: Session, key: str) -> None:
+        self._registry_listeners.setdefault(key, set()).add(session)
+
+    async def _on_registry_update(
+        self, session: Session, data: RegistryEventData
+    ) -> None:
+        self.registry[data["key"]] = data["value"]
+        await self._broadcast(
+            self._registry_listeners.get(data["key"], set()),
+            RegistryUpdateEvent.type,
+            data,
+        )
+
+    async def _on_registry_update_many(
+        self, session: Session, data: List[RegistryEventData]
+    ) -> None:
+        updates: Dict[Session, List[RegistryEventData]] = {}
+        for entry in data:
+            self.registry[entry["key"]] = entry["value"]
+            for listener in self._registry_listeners.get(entry["key"], set()):
+                updates.setdefault(listener, []).append(entry)
+        for listener, entries in updates.items():
+            await listener.send(RegistryUpdateManyEvent.type, entries)
+
+    async def _registry_get(self, session: Session, key: str) -> Any:
+        return self.registry.get(key)
+
+    async def _registry_get_many(
+        self, session: Session, keys: List[str]
+    ) -> Dict[str, Any]:
+        return {key: self.registry.get(key) for key in keys}
+
+    async def _registry_snapshot(self, session: Session, prefix: str) -> Dict[str, Any]:
+        return {
+            key: value for key, value in self.registry.items() if key.startswith(prefix)
+        }
+
+    async def _on_message_register(self, session: Session, key: str) -> None:
+        self._message_listeners.setdefault(key, set())
+
+    async def _on_message_listen(self, session: Session, key: str) -> None:
+        self._message_listeners.setdefault(key, set()).add(session)
+
+    async def _on_message_broadcast(
+        self, session: Session, data: MessageEventData
+    ) -> None:
+        await self._broadcast(
+            self._message_listeners.get(data["key"], set()),
+            MessageBroadcastEvent.type,
+            data,
+        )
+
+    async def _on_message_broadcast_batch(
+        self, session: Session, data: MessageBatchEventData
+    ) -> None:
+        await self._broadcast(
+            self._message_listeners.get(data["key"], set()),
+            MessageBroadcastBatchEvent.type,
+            data,
+        )
+
+    def _asset_id(self, session: Session, name: str) -> str:
+        return f"{session.name}/{name}"
+
+    async def _asset_upload(self, session: Session, files: Dict[str, str]) -> List[str]:
+        ids: List[str] = []
+        for name, encoded in files.items():
+            data = base64.b64decode(encoded)
+            id = self._asset_id(session, name)
+            self._store_asset(id, data)
+            ids.append(id)
+        return ids
+
+    async def _asset_begin(self, session: Session, req: AssetBeginReq) -> str:
+        id = uuid.uuid4().hex
+        self._uploads[id] = ServerUpload(
+            id, self._asset_id(session, req["name"]), req["size"], req.get("hash")
+        )
+        return id
+
+    def _upload(self, id: str) -> ServerUpload:
+        upload = self._uploads.get(id)
+        if upload is None:
+            raise ValueError(f"Unknown upload {id}")
+        return upload
+
+    async def _on_asset_chunk(self, session: Session, data: bytes) -> None:
+        chunk = AssetChunkEvent.serializer.deserialize(data)
+        upload = self._uploads.get(chunk.upload)
+        if upload is None:
+            return
+        received = len(upload.data)
+        end = chunk.offset + len(chunk.data)
+        if chunk.offset <= received < end:
+            upload.data += chunk.data[received - chunk.offset :]
+        await session.send(
+            AssetAckEvent.type, AssetAck(id=upload.id, offset=len(upload.data))
+        )
+
+    async def _asset_status(self, session: Session, id: str) -> int | None:
+        upload = self._uploads.get(id)
+        if upload is None:
+            return None
+        return len(upload.data)
+
+    async def _asset_commit(self, session: Session, id: str) -> str:
+        upload = self._upload(id)
+        if upload.size is not None and len(upload.data) != upload.size:
+            raise ValueError(
+                f"Upload {id} has {len(upload.data)} of {upload.size} bytes"
+            )
+        if upload.hash is not None and upload.hash != hash_bytes(upload.data):
+            raise ValueError(f"Upload {id} does not match hash {upload.hash}")
+        del self._uploads[id]
+        self._store_asset(upload.asset, bytes(upload.data))
+        return upload.asset
+
+    def _store_asset(self, id: str, data: bytes) -> None:
+        self.assets[id] = data
+        hash = hash_bytes(data)
+        stale = self._asset_hashes.get(id)
+        if stale is not None and self._hashes.get(stale) == id:
+            del self._hashes[stale]
+        self._hashes[hash] = id
+        self._asset_hashes[id] = hash
+
+    async def _asset_have(self, session: Session, hashes: List[str]) -> Dict[str, str]:
+        return {hash: self._hashes[hash] for hash in hashes if hash in self._hashes}
+
+    async def _asset_check(self, session: Session, assets: Dict[str, str]) -> List[str]:
+        return [id for id, hash in assets.items() if self._asset_hashes.get(id) == hash]
+
+    async def _shutdown(self, session: Session, restart: bool) -> bool:
+        self._spawn(self.stop())
+        return True
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import abc
+import asyncio
+import json
+from typing import TYPE_CHECKING, Any, Tuple
+
+from loguru import logger
+
+from omu.connection import Address
+from omu.connection.transport_connection import TransportConnection
+from omu.connection.unix_connection import encode_frame
+from omu.event import EventJson
+
+if TYPE_CHECKING:
+    import aiohttp.web
+
+    from omu.extension.server.model.app import App
+
+    from .server import LocalServer
+
+
+class Session(abc.ABC):
+    def __init__(self, server: LocalServer):
+        self.server = server
+        self.app: App | None = None
+        self.token: str | None = None
+        self.closed = False
+        self._queue: asyncio.Queue[Tuple[float, str, Any]] = asyncio.Queue()
+        self._pump = asyncio.get_running_loop().create_task(self._run())
+
+    @property
+    def name(self) -> str:
+        return self.app.key() if self.app else "<unknown>"
+
+    async def send(self, type: str, data: Any) -> None:
+        if self.closed:
+            return
+        loop = asyncio.get_running_loop()
+        self._queue.put_nowait((loop.time() + self.server.latency, type, data))
+
+    async def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._pump.cancel()
+        await self.server._on_session_closed(self)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            deliver_at, type, data = await self._queue.get()
+            delay = deliver_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self._write(type, data)
+            except Exception as e:
+                logger.warning(f"Failed to deliver {type} to {self.name}: {e}")
+
+    @abc.abstractmethod
+    async def _write(self, type: str, data: Any) -> None:
+        ...
+
+
+class WebsocketSession(Session):
+    def __init__(
+        self,
+        server: LocalServer,
+        socket: aiohttp.web.WebSocketResponse,
+        channel: int | None = None,
+    ):
+        super().__init__(server)
+        self.socket = socket
+        self.channel = channel
+
+    async def _write(self, type: str, data: Any) -> None:
+        if self.socket.closed:
+            return
+        envelope = {"type": type, "data": data}
+        if self.channel is not None:
+            envelope["channel"] = self.channel
+        await self.socket.send_json(envelope)
+
+
+class UnixSession(Session):
+    def __init__(self, server: LocalServer, writer: asyncio.StreamWriter):
+        super().__init__(server)
+        self.writer = writer
+
+    async def _write(self, type: str, data: Any) -> None:
+        if self.writer.is_closing():
+            return
+        self.writer.write(encode_frame(type, data))
+        await self.writer.drain()
+
+    async def close(self) -> None:
+        await super().close()
+        self.writer.close()
+
+
+class LocalSession(Session):
+    def __init__(self, server: LocalServer, connection: LocalConnection):
+        super().__init__(server)
+        self.connection = connection
+
+    async def _write(self, type: str, data: Any) -> None:
+        event = EventJson(type, json.loads(json.dumps(data)))
+        asyncio.get_running_loop().create_task(self.connection._dispatch(event))
+
+    async def close(self) -> None:
+        await super().close()
+        await self.connection._closed()
+
+
+class LocalConnection(TransportConnection):
+    def __init__(self, server: LocalServer, app: App):
+        super().__init__(app)
+        self.server = server
+        self._session: LocalSession | None = None
+
+    @property
+    def address(self) -> Address:
+        return self.server.address
+
+    def _reconnectable(self) -> bool:
+        return self.server.running
+
+    async def _open(self) -> None:
+        if not self.server.running:
+            raise ConnectionError("LocalServer is not running")
+        self._session = LocalSession(self.server, self)
+        self.server.sessions.add(self._session)
+
+    async def _close(self) -> None:
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def _write(self, type: str, serialized: Any) -> None:
+        if self._session is None or self._session.closed:
+            raise RuntimeError("Not connected")
+        if isinstance(serialized, (bytes, bytearray, memoryview)):
+            serialized = bytes(serialized)
+        else:
+            serialized = json.loads(json.dumps(serialized))
+        await self.server.receive(self._session, type, serialized)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List
+
+from omu import App, OmuClient
+from omu.extension.table.table import TableListener
+from omu.testing import LocalServer
+
+
+class Item:
+    def __init__(self, key: str, value: Any = 0):
+        self._key = key
+        self.value = value
+
+    def key(self) -> str:
+        return self._key
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"key": self._key, "value": self.value}
+
+    @classmethod
+    def from_json(cls, json: Dict[str, Any]) -> Item:
+        return cls(json["key"], json["value"])
+
+
+class StaticTable:
+    def __init__(self, cache: Dict[str, Item]):
+        self.cache = cache
+        self.listeners: List[TableListener[Item]] = []
+
+    def add_listener(self, listener: TableListener[Item]) -> None:
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: TableListener[Item]) -> None:
+        self.listeners.remove(listener)
+
+
+def app(name: str) -> App:
+    return App(name=name, group="test", version="0.0.1")
+
+
+async def settle(delay: float = 0.02) -> None:
+    await asyncio.sleep(delay)
+
+
+def create(server: LocalServer, client_app: App) -> OmuClient:
+    return OmuClient(
+        client_app,
+        server.address,
+        connection=server.connection(client_app),
+        loop=asyncio.get_running_loop(),
+    )
+
+
+async def start(client: OmuClient, reconnect: bool = False) -> OmuClient:
+    await client.start(reconnect=reconnect)
+    for _ in range(100):
+        if client.connection.connected:
+            break
+        await asyncio.sleep(0.01)
+    await settle()
+    return client
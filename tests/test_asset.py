@@ -0,0 +1,261 @@
+import os
+import tempfile
+import unittest
+from typing import AsyncIterator, Dict, List
+
+from omu.extension.asset import AssetExtensionType
+from omu.extension.asset.asset_extension import (
+    AssetBeginEndpoint,
+    AssetCheckEndpoint,
+    AssetChunkEvent,
+    AssetHaveEndpoint,
+    AssetUploadEndpoint,
+)
+from omu.extension.asset.asset_index import AssetIndex, hash_bytes
+from omu.extension.asset.asset_manager import AssetUploadManager
+from omu.extension.asset.asset_upload import (
+    CHUNK_HEADER,
+    AssetChunk,
+    AssetChunkSerializer,
+)
+from omu.testing import LocalServer
+
+from .support import app, create, start
+
+APP = app("assets")
+OLD = b"old content" * 100
+NEW = b"new content" * 100
+
+
+class AssetIndexTest(unittest.TestCase):
+    def test_put_drops_stale_hash_for_reused_id(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.json")
+            index = AssetIndex(path)
+            index.put("old", "asset")
+            index.put("new", "asset")
+            self.assertIsNone(index.get("old"))
+            self.assertEqual(index.get("new"), "asset")
+            index.save()
+            self.assertEqual(len(AssetIndex(path)), 1)
+
+
+class AssetChunkSerializerTest(unittest.TestCase):
+    def test_chunk_round_trips_raw_bytes(self) -> None:
+        serializer = AssetChunkSerializer()
+        payload = os.urandom(64)
+        data = serializer.serialize(AssetChunk("upload", 1 << 40, payload))
+        self.assertEqual(len(data), CHUNK_HEADER.size + len("upload") + len(payload))
+        chunk = serializer.deserialize(data)
+        self.assertEqual((chunk.upload, chunk.offset), ("upload", 1 << 40))
+        self.assertEqual(chunk.data, payload)
+
+
+class AssetStreamTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = await LocalServer().__aenter__()
+        self.client = create(self.server, APP)
+        self.client.extensions.register(AssetExtensionType)
+        self.assets = self.client.extensions.get(AssetExtensionType)
+        self.assets.chunk_size = 1024
+        self.assets.window = 4 * 1024
+        await start(self.client)
+
+    async def asyncTearDown(self) -> None:
+        await self.client.stop()
+        await self.server.stop()
+
+    async def test_bytes_are_sent_as_binary_chunks(self) -> None:
+        data = os.urandom(10 * 1024 + 1)
+        in_flight: List[int] = []
+
+        def progress(name: str, offset: int, size: int | None) -> None:
+            upload = self.assets._uploads[next(iter(self.assets._uploads))]
+            in_flight.append(upload.sent - upload.acked)
+            self.assertEqual(size, len(data))
+
+        id = await self.assets.upload_stream("a.bin", data, progress=progress)
+        self.assertEqual(self.server.assets[id], data)
+        self.assertEqual(self.server.received[AssetChunkEvent.type], 11)
+        self.assertEqual(self.server.called[AssetUploadEndpoint.info.key()], 0)
+        self.assertLessEqual(max(in_flight), self.assets.window)
+        self.assertEqual(self.assets._uploads, {})
+
+    async def test_stream_of_unknown_size(self) -> None:
+        parts = [os.urandom(700) for _ in range(5)]
+
+        async def source() -> AsyncIterator[bytes]:
+            for part in parts:
+                yield part
+
+        id = await self.assets.upload_stream("stream.bin", source())
+        self.assertEqual(self.server.assets[id], b"".join(parts))
+        self.assertEqual(self.server.received[AssetChunkEvent.type], 4)
+
+    async def test_file_source(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "file.bin")
+            with open(path, "wb") as file:
+                file.write(OLD)
+            id = await self.assets.upload_stream("file.bin", path)
+        self.assertEqual(self.server.assets[id], OLD)
+
+    async def test_hash_mismatch_is_rejected(self) -> None:
+        with self.assertRaises(Exception):
+            await self.assets.upload_stream("a.bin", OLD, hash=hash_bytes(NEW))
+        self.assertEqual(self.server.assets, {})
+
+
+class AssetSyncTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.server = await LocalServer().__aenter__()
+        self.client = create(self.server, APP)
+        self.client.extensions.register(AssetExtensionType)
+        self.assets = self.client.extensions.get(AssetExtensionType)
+        self.assets.set_index(os.path.join(self.directory.name, "index.json"))
+        await start(self.client)
+
+    async def asyncTearDown(self) -> None:
+        await self.client.stop()
+        await self.server.stop()
+        self.directory.cleanup()
+
+    async def test_sync_after_same_name_new_content(self) -> None:
+        first = await self.assets.sync({"a.bin": OLD})
+        second = await self.assets.sync({"a.bin": NEW})
+        self.assertEqual(first, second)
+        self.assertEqual(self.server.assets[second["a.bin"]], NEW)
+
+        ids = await self.assets.sync({"b.bin": OLD})
+        self.assertEqual(self.server.assets[ids["b.bin"]], OLD)
+        self.assertNotEqual(ids["b.bin"], first["a.bin"])
+        self.assertEqual(self.assets.index.get(hash_bytes(OLD)), ids["b.bin"])
+
+    async def test_sync_revalidates_index_against_server(self) -> None:
+        first = await self.assets.sync({"a.bin": OLD})
+        await self.assets.upload({"a.bin": NEW})
+        self.assertEqual(self.assets.index.get(hash_bytes(OLD)), first["a.bin"])
+
+        ids = await self.assets.sync({"b.bin": OLD})
+        self.assertEqual(self.server.assets[ids["b.bin"]], OLD)
+        self.assertEqual(self.assets.index.get(hash_bytes(OLD)), ids["b.bin"])
+
+    def called(self) -> Dict[str, int]:
+        return {
+            "check": self.server.called[AssetCheckEndpoint.info.key()],
+            "have": self.server.called[AssetHaveEndpoint.info.key()],
+            "begin": self.server.called[AssetBeginEndpoint.info.key()],
+        }
+
+    async def test_indexed_sync_checks_hits_and_probes_misses(self) -> None:
+        first = await self.assets.sync({"a.bin": OLD})
+        self.assertEqual(self.called(), {"check": 0, "have": 1, "begin": 1})
+        self.assets.set_index(os.path.join(self.directory.name, "index.json"))
+
+        ids = await self.assets.sync({"a.bin": OLD, "b.bin": NEW})
+        self.assertEqual(ids["a.bin"], first["a.bin"])
+        self.assertEqual(self.called(), {"check": 1, "have": 2, "begin": 2})
+
+        await self.assets.sync({"a.bin": OLD, "b.bin": NEW})
+        self.assertEqual(self.called(), {"check": 2, "have": 2, "begin": 2})
+
+    async def test_sync_uploads_identical_content_once(self) -> None:
+        ids = await self.assets.sync({"a.bin": OLD, "b.bin": OLD, "c.bin": NEW})
+        self.assertEqual(ids["a.bin"], ids["b.bin"])
+        self.assertEqual(self.server.assets[ids["c.bin"]], NEW)
+        self.assertEqual(self.called()["begin"], 2)
+
+    async def test_uploads_run_concurrently_within_bound(self) -> None:
+        self.assets.chunk_size = 256
+        self.assets.window = 256
+        self.assets.concurrency = 2
+        active: List[int] = []
+
+        def progress(name: str, offset: int, size: int | None) -> None:
+            active.append(len(self.assets._uploads))
+
+        for upload in (self.assets.upload_files, self.assets.sync):
+            files = {f"{i}.bin": os.urandom(2048) for i in range(6)}
+            active.clear()
+            ids = await upload(files, progress=progress)
+            self.assertEqual(max(active), 2)
+            for name, data in files.items():
+                self.assertEqual(self.server.assets[ids[name]], data)
+
+
+class AssetUploadManagerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = await LocalServer().__aenter__()
+        self.client = create(self.server, APP)
+        self.client.extensions.register(AssetExtensionType)
+        self.assets = self.client.extensions.get(AssetExtensionType)
+        self.assets.chunk_size = 1024
+        self.assets.window = 4 * 1024
+        await start(self.client, reconnect=True)
+
+    async def asyncTearDown(self) -> None:
+        await self.client.stop()
+        await self.server.stop()
+
+    async def test_upload_restarts_after_server_drops_it(self) -> None:
+        data = os.urandom(64 * 1024)
+        manager = AssetUploadManager(self.assets, backoff=0.01)
+        restarted = []
+
+        def progress(name: str, offset: int, size: int | None) -> None:
+            if not restarted and offset >= 16 * 1024:
+                restarted.append(offset)
+                self.client.loop.create_task(self.server.restart())
+
+        ids = await manager.upload({"big.bin": data}, progress=progress)
+        self.assertTrue(restarted)
+        self.assertEqual(self.server.assets[ids["big.bin"]], data)
+        self.assertEqual(manager.stats.completed, 1)
+        self.assertEqual(manager.stats.failed, 0)
+        self.assertGreaterEqual(manager.stats.retries, 1)
+        self.assertEqual(manager.stats.restarts, 1)
+        self.assertEqual(manager.stats.bytes, len(data))
+        manager.close()
+
+    async def test_upload_restarts_when_server_rejects_commit(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "grown.bin")
+            with open(path, "wb") as file:
+                file.write(os.urandom(8 * 1024))
+            manager = AssetUploadManager(self.assets, backoff=0.01)
+            grown: List[int] = []
+
+            def progress(name: str, offset: int, size: int | None) -> None:
+                if not grown:
+                    with open(path, "ab") as file:
+                        file.write(os.urandom(8 * 1024))
+                    grown.append(offset)
+
+            ids = await manager.upload({"grown.bin": path}, progress=progress)
+            with open(path, "rb") as file:
+                self.assertEqual(self.server.assets[ids["grown.bin"]], file.read())
+        self.assertEqual(manager.stats.completed, 1)
+        self.assertEqual(manager.stats.retries, 1)
+        self.assertEqual(manager.stats.restarts, 1)
+        self.assertEqual(manager.stats.bytes, 16 * 1024)
+        self.assertIsNotNone(manager.stats.error)
+        manager.close()
+
+    async def test_stream_is_not_retried_after_it_was_read(self) -> None:
+        manager = AssetUploadManager(self.assets, backoff=0.01)
+
+        async def stream() -> AsyncIterator[bytes]:
+            yield os.urandom(4 * 1024)
+            await self.server.restart()
+            yield os.urandom(4 * 1024)
+
+        with self.assertRaises(Exception):
+            await manager.upload({"stream.bin": stream()})
+        self.assertEqual(manager.stats.failed, 1)
+        self.assertEqual(manager.stats.retries, 0)
+        manager.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
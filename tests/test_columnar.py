@@ -0,0 +1,39 @@
+import unittest
+
+from omu.extension.table.columnar import Column, ColumnarCache
+
+from .support import Item, StaticTable
+
+
+class ColumnarCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.table = StaticTable({"a": Item("a", 1), "b": Item("b", 2)})
+        self.columns = ColumnarCache(
+            self.table, [Column("value", lambda item: item.value)]
+        )
+
+    async def test_cache_update_with_same_size_refreshes_values(self) -> None:
+        await self.columns.on_cache_update({"a": Item("a", 10), "b": Item("b", 20)})
+        self.assertEqual(self.columns.column("value").tolist(), [10, 20])
+
+    async def test_cache_update_with_same_size_replaces_keys(self) -> None:
+        await self.columns.on_cache_update({"a": Item("a", 1), "c": Item("c", 3)})
+        self.assertEqual(sorted(self.columns.keys), ["a", "c"])
+        self.assertEqual(self.columns.column("value")[self.columns.row("c")], 3)
+
+    async def test_cache_update_without_events_drops_missing_rows(self) -> None:
+        await self.columns.on_add({"c": Item("c", 3)})
+        await self.columns.on_cache_update({"a": self.table.cache["a"]})
+        self.assertEqual(self.columns.keys, ["a"])
+        self.assertEqual(self.columns.column("value").tolist(), [1])
+
+    async def test_update_refreshes_item_changed_in_place(self) -> None:
+        item = self.table.cache["a"]
+        item.value = 7
+        await self.columns.on_update({"a": item})
+        await self.columns.on_cache_update(self.table.cache)
+        self.assertEqual(self.columns.column("value").tolist(), [7, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
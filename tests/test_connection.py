@@ -0,0 +1,105 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from omu import OmuClient
+from omu.connection import Address
+from omu.connection.unix_connection import WRITE_HIGH_WATER, UnixSocketConnection
+from omu.event.event import SerializeEventType
+from omu.interface import Serializer
+from omu.testing import LocalServer
+
+from .support import app, create, settle, start
+
+APP = app("connection")
+BLOB = SerializeEventType[bytes, bytes]("test", "blob", Serializer.noop())
+
+
+class UnixBackpressureTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "omu.sock")
+        self.reading = asyncio.Event()
+        self.received = 0
+        self.server = await asyncio.start_unix_server(self.handle, self.path)
+
+    async def asyncTearDown(self) -> None:
+        self.server.close()
+        self.directory.cleanup()
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        await self.reading.wait()
+        while data := await reader.read(1 << 16):
+            self.received += len(data)
+        writer.close()
+
+    async def test_send_waits_for_slow_peer(self) -> None:
+        client = OmuClient(
+            APP,
+            Address("127.0.0.1", 0, path=self.path),
+            loop=asyncio.get_running_loop(),
+        )
+        connection = client.connection
+        self.assertIsInstance(connection, UnixSocketConnection)
+        connect = asyncio.create_task(connection.connect(reconnect=False))
+        while not connection.connected:
+            await asyncio.sleep(0.01)
+
+        chunk = b"x" * (64 * 1024)
+        total = 32 * 1024 * 1024
+
+        async def produce() -> None:
+            for _ in range(total // len(chunk)):
+                await connection.send(BLOB, chunk)
+                await asyncio.sleep(0)
+
+        producer = asyncio.create_task(produce())
+        await asyncio.sleep(0.3)
+        self.assertFalse(producer.done())
+        buffered = connection._writer.transport.get_write_buffer_size()
+        self.assertLessEqual(buffered, 2 * WRITE_HIGH_WATER + len(chunk))
+
+        self.reading.set()
+        await asyncio.wait_for(producer, 10)
+        await connection.disconnect()
+        await connect
+
+
+class ReconnectTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = await LocalServer().__aenter__()
+
+    async def asyncTearDown(self) -> None:
+        await self.server.stop()
+
+    async def check_reconnect(self, client: OmuClient) -> None:
+        await start(client, reconnect=True)
+        self.assertEqual(len(self.server.sessions), 1)
+
+        await self.server.restart()
+        for _ in range(100):
+            if self.server.sessions and client.connection.connected:
+                break
+            await asyncio.sleep(0.01)
+        self.assertTrue(client.connection.connected)
+        self.assertEqual(len(self.server.sessions), 1)
+
+        await client.stop()
+        await settle(0.1)
+        self.assertFalse(client.connection.connected)
+        self.assertEqual(len(self.server.sessions), 0)
+
+    async def test_local_reconnects_until_stopped(self) -> None:
+        await self.check_reconnect(create(self.server, APP))
+
+    async def test_websocket_reconnects_until_stopped(self) -> None:
+        client = OmuClient(APP, self.server.address, loop=asyncio.get_running_loop())
+        await self.check_reconnect(client)
+        await client.connection._session.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,382 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, List
+
+from omu import OmuClient
+from omu.extension.endpoint import EndpointPolicy, EndpointType, JsonEndpointType
+from omu.extension.endpoint.endpoint_extension import (
+    EndpointBusyError,
+    EndpointCallBatchEvent,
+    EndpointCallEvent,
+    EndpointCancelEvent,
+)
+from omu.extension.registry.registry_extension import RegistryGetEndpoint
+from omu.testing import LocalServer
+
+from .support import app, create, settle, start
+
+APP = app("endpoints")
+CALLER = app("caller")
+SHARED = JsonEndpointType[str, str].of(
+    APP, "shared", policy=EndpointPolicy(idempotent=True)
+)
+CACHED = JsonEndpointType[str, str].of(
+    APP, "cached", policy=EndpointPolicy(idempotent=True, ttl=0.1)
+)
+PLAIN = JsonEndpointType[str, str].of(APP, "plain")
+FAILING = JsonEndpointType[str, str].of(APP, "failing")
+LIMITED = JsonEndpointType[str, str].of(APP, "limited")
+URGENT = JsonEndpointType[str, str].of(APP, "urgent")
+COMPUTE = JsonEndpointType[int, int].of(APP, "compute")
+COUNT = JsonEndpointType[int, int].of(APP, "count")
+
+
+class Service:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.cancelled = 0
+        self.seen: List[str] = []
+        self.release = asyncio.Event()
+
+    async def handle(self, req: str) -> str:
+        self.calls += 1
+        self.seen.append(req)
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return req.upper()
+
+    async def fail(self, req: str) -> str:
+        raise ValueError(f"Cannot handle {req}")
+
+
+class EndpointTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = await LocalServer().__aenter__()
+        self.service = Service()
+        self.owner = create(self.server, APP)
+        self.register(self.owner)
+        await start(self.owner)
+        self.client = await start(create(self.server, CALLER))
+
+    def register(self, owner: OmuClient) -> None:
+        owner.endpoints.register(SHARED, self.service.handle)
+        owner.endpoints.register(CACHED, self.service.handle)
+        owner.endpoints.register(PLAIN, self.service.handle)
+        owner.endpoints.register(FAILING, self.service.fail)
+
+    async def asyncTearDown(self) -> None:
+        self.service.release.set()
+        await self.client.stop()
+        await self.owner.stop()
+        await self.server.stop()
+
+    def call(
+        self,
+        type: EndpointType[str, str, Any, Any],
+        data: str = "a",
+        timeout: float | None = None,
+    ) -> asyncio.Task[str]:
+        return asyncio.create_task(self.client.endpoints.call(type, data, timeout))
+
+
+class SharedCallTest(EndpointTestCase):
+    async def test_identical_calls_share_one_request(self) -> None:
+        calls = [self.call(SHARED) for _ in range(5)]
+        other = self.call(SHARED, "b")
+        await settle()
+        self.service.release.set()
+        self.assertEqual(await asyncio.gather(*calls), ["A"] * 5)
+        self.assertEqual(await other, "B")
+        self.assertEqual(self.service.calls, 2)
+
+    async def test_ttl_cache_expires(self) -> None:
+        self.service.release.set()
+        self.assertEqual(await self.call(CACHED), "A")
+        self.assertEqual(await self.call(CACHED), "A")
+        self.assertEqual(self.service.calls, 1)
+        await asyncio.sleep(0.15)
+        self.assertEqual(await self.call(CACHED), "A")
+        self.assertEqual(self.service.calls, 2)
+
+    async def test_invalidate_drops_cached_result(self) -> None:
+        self.service.release.set()
+        await self.call(CACHED)
+        self.client.endpoints.invalidate(CACHED, "a")
+        await self.call(CACHED)
+        self.assertEqual(self.service.calls, 2)
+
+    async def test_each_caller_keeps_its_own_timeout(self) -> None:
+        first = self.call(SHARED)
+        await settle()
+        started = asyncio.get_running_loop().time()
+        with self.assertRaises(Exception) as context:
+            await asyncio.wait_for(self.call(SHARED, timeout=0.05), 1)
+        self.assertIsInstance(context.exception.__cause__, TimeoutError)
+        self.assertLess(asyncio.get_running_loop().time() - started, 0.5)
+        self.assertFalse(first.done())
+        self.service.release.set()
+        self.assertEqual(await first, "A")
+        self.assertEqual(self.service.calls, 1)
+
+    async def test_last_caller_leaving_cancels_request(self) -> None:
+        calls = [self.call(SHARED) for _ in range(2)]
+        await settle()
+        calls[0].cancel()
+        await settle()
+        self.assertEqual(self.service.cancelled, 0)
+        calls[1].cancel()
+        await settle()
+        self.assertEqual(self.service.cancelled, 1)
+        self.assertEqual(self.server.received[EndpointCancelEvent.type], 1)
+
+        self.service.release.set()
+        self.assertEqual(await self.call(SHARED), "A")
+        self.assertEqual(self.service.calls, 2)
+
+    async def test_timed_out_callers_cancel_request(self) -> None:
+        calls = [self.call(SHARED, timeout=0.05) for _ in range(2)]
+        results = await asyncio.wait_for(
+            asyncio.gather(*calls, return_exceptions=True), 1
+        )
+        self.assertTrue(all(isinstance(result, Exception) for result in results))
+        await settle()
+        self.assertEqual(self.service.cancelled, 1)
+
+
+class DeadlineTest(EndpointTestCase):
+    async def assertCancelled(self) -> None:
+        await settle()
+        self.assertEqual(self.service.cancelled, 1)
+        self.assertEqual(self.server.received[EndpointCancelEvent.type], 1)
+        self.assertEqual(self.client.endpoints.promises, {})
+
+    async def test_deadline_fails_call_and_cancels_handler(self) -> None:
+        with self.assertRaises(Exception) as context:
+            await self.call(PLAIN, timeout=0.05)
+        self.assertIsInstance(context.exception.__cause__, TimeoutError)
+        await self.assertCancelled()
+
+    async def test_default_timeout_applies_without_deadline(self) -> None:
+        self.client.endpoints.timeout = 0.05
+        with self.assertRaises(Exception) as context:
+            await self.call(PLAIN)
+        self.assertIsInstance(context.exception.__cause__, TimeoutError)
+        await self.assertCancelled()
+
+    async def test_cancelling_caller_cancels_handler(self) -> None:
+        call = self.call(PLAIN)
+        await settle()
+        call.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await call
+        await self.assertCancelled()
+
+    async def test_answered_call_clears_promise(self) -> None:
+        self.service.release.set()
+        self.assertEqual(await self.call(PLAIN, timeout=1), "A")
+        self.assertEqual(self.client.endpoints.promises, {})
+        self.assertEqual(self.server.received[EndpointCancelEvent.type], 0)
+
+    async def test_disconnect_fails_pending_calls(self) -> None:
+        call = self.call(PLAIN)
+        await settle()
+        await self.server.stop()
+        with self.assertRaises(Exception) as context:
+            await asyncio.wait_for(call, 1)
+        self.assertIsInstance(context.exception.__cause__, ConnectionError)
+        self.assertEqual(self.client.endpoints.promises, {})
+
+
+class BatchCallTest(EndpointTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.service.release.set()
+
+    async def test_batch_is_sent_in_one_frame(self) -> None:
+        self.server.registry["key"] = 1
+        results = await self.client.endpoints.call_batch(
+            [(PLAIN, "a"), (RegistryGetEndpoint, "key"), (PLAIN, "b")]
+        )
+        self.assertEqual(results, ["A", 1, "B"])
+        self.assertEqual(self.server.received[EndpointCallBatchEvent.type], 1)
+        self.assertEqual(self.server.received[EndpointCallEvent.type], 0)
+        self.assertEqual(self.client.endpoints.promises, {})
+
+    async def test_empty_batch_sends_nothing(self) -> None:
+        self.assertEqual(await self.client.endpoints.call_batch([]), [])
+        self.assertEqual(self.server.received[EndpointCallBatchEvent.type], 0)
+
+    async def test_failed_call_raises_by_default(self) -> None:
+        with self.assertRaises(Exception) as context:
+            await self.client.endpoints.call_batch([(PLAIN, "a"), (FAILING, "b")])
+        self.assertIn("Cannot handle b", str(context.exception.__cause__))
+        self.assertEqual(self.client.endpoints.promises, {})
+
+    async def test_failed_call_can_be_returned(self) -> None:
+        results = await self.client.endpoints.call_batch(
+            [(FAILING, "a"), (PLAIN, "b")], return_exceptions=True
+        )
+        self.assertIsInstance(results[0], Exception)
+        self.assertEqual(results[1], "B")
+
+    async def test_batch_deadline_cancels_pending_calls(self) -> None:
+        self.service.release.clear()
+        results = await self.client.endpoints.call_batch(
+            [(PLAIN, "a"), (PLAIN, "b")], timeout=0.05, return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(result, TimeoutError) for result in results))
+        await settle()
+        self.assertEqual(self.service.cancelled, 2)
+
+
+class AdmissionTest(EndpointTestCase):
+    def register(self, owner: OmuClient) -> None:
+        super().register(owner)
+        owner.endpoints.register(
+            LIMITED, self.service.handle, concurrency=1, queue_size=1
+        )
+        owner.endpoints.register(URGENT, self.service.handle, priority=1)
+
+    async def test_full_queue_rejects_with_busy_error(self) -> None:
+        calls = [self.call(LIMITED, data) for data in "abc"]
+        await settle()
+        with self.assertRaises(Exception) as context:
+            await calls[2]
+        self.assertIsInstance(context.exception.__cause__, EndpointBusyError)
+        self.assertEqual(self.service.seen, ["a"])
+
+        self.service.release.set()
+        self.assertEqual(await asyncio.gather(*calls[:2]), ["A", "B"])
+        stats = self.owner.endpoints.stats(LIMITED)
+        self.assertEqual((stats.calls, stats.rejected), (2, 1))
+        self.assertGreater(stats.max_wait_time, 0)
+
+    async def test_queued_calls_run_by_priority(self) -> None:
+        self.owner.endpoints.scheduler.concurrency = 1
+        calls = [self.call(PLAIN, "a"), self.call(PLAIN, "b")]
+        await settle()
+        calls.append(self.call(URGENT, "c"))
+        await settle()
+        self.assertEqual(self.service.seen, ["a"])
+        self.service.release.set()
+        self.assertEqual(await asyncio.gather(*calls), ["A", "B", "C"])
+        self.assertEqual(self.service.seen, ["a", "c", "b"])
+
+    async def test_cancelled_queued_call_frees_its_slot(self) -> None:
+        first = self.call(LIMITED, "a")
+        queued = self.call(LIMITED, "b")
+        await settle()
+        queued.cancel()
+        await settle()
+        later = self.call(LIMITED, "c")
+        await settle()
+        self.service.release.set()
+        self.assertEqual(await asyncio.gather(first, later), ["A", "C"])
+        self.assertEqual(self.service.seen, ["a", "c"])
+        self.assertEqual(self.owner.endpoints.stats(LIMITED).rejected, 0)
+
+
+class ExecutorTest(EndpointTestCase):
+    def register(self, owner: OmuClient) -> None:
+        super().register(owner)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.threads: List[int] = []
+        self.blocked = threading.Event()
+        owner.endpoints.register(COMPUTE, self.compute, executor=self.executor)
+
+    async def asyncTearDown(self) -> None:
+        self.blocked.set()
+        await super().asyncTearDown()
+        self.executor.shutdown()
+
+    def compute(self, req: int) -> int:
+        self.threads.append(threading.get_ident())
+        if req < 0:
+            raise ValueError("Negative input")
+        if req == 0:
+            self.blocked.wait(1)
+        return req * 2
+
+    async def test_handler_runs_on_executor(self) -> None:
+        self.assertEqual(await self.client.endpoints.call(COMPUTE, 21), 42)
+        self.assertEqual(len(self.threads), 1)
+        self.assertNotIn(threading.get_ident(), self.threads)
+
+    async def test_blocking_handler_does_not_block_loop(self) -> None:
+        blocking = asyncio.create_task(self.client.endpoints.call(COMPUTE, 0))
+        await settle()
+        self.service.release.set()
+        self.assertEqual(await self.call(PLAIN), "A")
+        self.assertFalse(blocking.done())
+        self.blocked.set()
+        self.assertEqual(await blocking, 0)
+
+    async def test_handler_error_is_returned_to_caller(self) -> None:
+        with self.assertRaises(Exception) as context:
+            await self.client.endpoints.call(COMPUTE, -1)
+        self.assertIn("Negative input", str(context.exception.__cause__))
+        self.assertEqual(self.owner.endpoints.stats(COMPUTE).calls, 1)
+
+
+class StreamTest(EndpointTestCase):
+    def register(self, owner: OmuClient) -> None:
+        super().register(owner)
+        self.produced = 0
+        self.closed = 0
+        owner.endpoints.register(COUNT, self.count)
+
+    async def count(self, req: int) -> AsyncIterator[int]:
+        try:
+            for i in range(abs(req)):
+                self.produced += 1
+                yield i
+            if req < 0:
+                raise ValueError("Counted too far")
+        finally:
+            self.closed += 1
+
+    async def test_stream_yields_every_chunk(self) -> None:
+        chunks = [chunk async for chunk in self.client.endpoints.stream(COUNT, 10, 2)]
+        self.assertEqual(chunks, list(range(10)))
+        self.assertEqual(self.closed, 1)
+
+    async def test_producer_waits_for_credit(self) -> None:
+        stream = self.client.endpoints.stream(COUNT, 100, window=4)
+        self.assertEqual(await anext(stream), 0)
+        await settle()
+        self.assertEqual(self.produced, 5)
+        self.assertEqual(await anext(stream), 1)
+        self.assertEqual(await anext(stream), 2)
+        await settle()
+        self.assertEqual(self.produced, 7)
+        await stream.aclose()
+
+    async def test_closing_stream_cancels_producer(self) -> None:
+        stream = self.client.endpoints.stream(COUNT, 100, window=4)
+        await anext(stream)
+        await stream.aclose()
+        await settle()
+        self.assertEqual(self.closed, 1)
+        self.assertEqual(self.server.received[EndpointCancelEvent.type], 1)
+        self.assertEqual(self.client.endpoints._streams, {})
+
+    async def test_producer_error_ends_stream(self) -> None:
+        chunks: List[int] = []
+        with self.assertRaises(Exception) as context:
+            async for chunk in self.client.endpoints.stream(COUNT, -3):
+                chunks.append(chunk)
+        self.assertEqual(chunks, [0, 1, 2])
+        self.assertIn("Counted too far", str(context.exception.__cause__))
+
+    async def test_window_must_be_positive(self) -> None:
+        with self.assertRaises(ValueError):
+            await anext(self.client.endpoints.stream(COUNT, 1, window=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
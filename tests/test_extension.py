@@ -0,0 +1,133 @@
+import unittest
+
+from loguru import logger
+
+from omu.client import Client
+from omu.connection import ConnectionListener, SubscriptionManifest
+from omu.extension.extension import Extension, ExtensionType, define_extension_type
+from omu.extension.message.message_extension import (
+    MessageExtensionType,
+    MessageListenEvent,
+)
+from omu.testing import LocalServer
+
+from .support import app, create, settle, start
+
+APP = app("extensions")
+
+
+class FailingExtension(Extension, ConnectionListener):
+    async def on_manifest(self, manifest: SubscriptionManifest) -> None:
+        manifest.defer(self.fetch)
+
+    async def fetch(self) -> None:
+        raise RuntimeError("subscription failed")
+
+
+FailingExtensionType = define_extension_type(
+    "failing", lambda client: FailingExtension(), lambda: []
+)
+
+
+class RecordingExtension(Extension, ConnectionListener):
+    created = 0
+
+    def __init__(self, client: Client) -> None:
+        RecordingExtension.created += 1
+        self.client = client
+        self.connected = 0
+        self.message = client.extensions.get(MessageExtensionType)
+        client.connection.add_listener(self)
+
+    async def on_manifest(self, manifest: SubscriptionManifest) -> None:
+        manifest.add(MessageListenEvent, "test/extensions:recorded")
+
+    async def on_connected(self) -> None:
+        self.connected += 1
+
+
+RecordingExtensionType = define_extension_type(
+    "recording", RecordingExtension, lambda: [MessageExtensionType]
+)
+
+
+class LazyExtensionTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        RecordingExtension.created = 0
+        self.server = await LocalServer().__aenter__()
+        self.client = create(self.server, APP)
+        self.client.extensions.register_lazy(RecordingExtensionType)
+
+    async def asyncTearDown(self) -> None:
+        if self.client.running:
+            await self.client.stop()
+        await self.server.stop()
+
+    async def test_builtin_extensions_are_created_on_first_use(self) -> None:
+        extensions = self.client.extensions
+        self.assertTrue(extensions.has(MessageExtensionType))
+        self.assertNotIn(MessageExtensionType.key, extensions._extensions)
+        message = self.client.message
+        self.assertIs(self.client.message, message)
+        self.assertIn(MessageExtensionType.key, extensions._extensions)
+
+    async def test_lazy_extension_is_created_once_with_dependencies(self) -> None:
+        await start(self.client)
+        self.assertEqual(RecordingExtension.created, 0)
+        extension = self.client.extensions.get(RecordingExtensionType)
+        self.assertIs(self.client.extensions.get(RecordingExtensionType), extension)
+        self.assertEqual(RecordingExtension.created, 1)
+        self.assertIs(extension.message, self.client.message)
+
+    async def test_extension_created_after_connect_subscribes(self) -> None:
+        await start(self.client)
+        listens = self.server.received[MessageListenEvent.type]
+        extension = self.client.extensions.get(RecordingExtensionType)
+        await settle()
+        self.assertEqual(extension.connected, 1)
+        self.assertEqual(self.server.received[MessageListenEvent.type], listens + 1)
+
+    async def test_extension_created_before_connect_uses_manifest(self) -> None:
+        extension = self.client.extensions.get(RecordingExtensionType)
+        await start(self.client)
+        self.assertEqual(extension.connected, 1)
+
+    async def test_registering_twice_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            self.client.extensions.register_lazy(RecordingExtensionType)
+        with self.assertRaises(ValueError):
+            self.client.extensions.register(RecordingExtensionType)
+
+    async def test_dependency_cycle_is_reported(self) -> None:
+        first = ExtensionType("first", lambda client: FailingExtension(), [])
+        second = ExtensionType("second", lambda client: FailingExtension(), [first])
+        first._dependencies.append(second)
+        self.client.extensions.register_lazy(first, second)
+        with self.assertRaises(ValueError) as context:
+            self.client.extensions.get(first)
+        self.assertIn("first -> second -> first", str(context.exception))
+
+
+class LateExtensionTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = await LocalServer().__aenter__()
+        self.client = await start(create(self.server, APP))
+        self.messages = []
+        self.sink = logger.add(self.messages.append, level="ERROR")
+
+    async def asyncTearDown(self) -> None:
+        logger.remove(self.sink)
+        await self.client.stop()
+        await self.server.stop()
+
+    async def test_late_subscription_errors_are_logged(self) -> None:
+        self.client.extensions.register(FailingExtensionType)
+        self.client.extensions.get(FailingExtensionType)
+        await settle()
+        self.assertTrue(
+            any("subscription failed" in message for message in self.messages)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
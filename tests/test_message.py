@@ -0,0 +1,222 @@
+import asyncio
+import unittest
+from typing import Any, Dict, List
+
+from loguru import logger
+
+from omu.extension.message.message_extension import (
+    MessageBroadcastBatchEvent,
+    MessageBroadcastEvent,
+    MessagePolicy,
+)
+from omu.interface import Serializable
+from omu.testing import LocalServer
+
+from .support import Item, app, create, settle, start
+
+SENDER = app("sender")
+RECEIVER = app("receiver")
+
+
+class MessagePolicyTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = await LocalServer().__aenter__()
+        self.sender = create(self.server, SENDER)
+        self.receiver = create(self.server, RECEIVER)
+        self.received: List[int] = []
+        self.times: List[float] = []
+        self.configured: List[int] = []
+
+        async def on_message(body: int) -> None:
+            self.received.append(body)
+            self.times.append(asyncio.get_running_loop().time())
+
+        self.receiver.message.listen("values", app=SENDER.key())(on_message)
+        await start(self.sender)
+        await start(self.receiver)
+
+    async def on_configured(self, body: int) -> None:
+        self.configured.append(body)
+
+    async def asyncTearDown(self) -> None:
+        await self.sender.stop()
+        await self.receiver.stop()
+        await self.server.stop()
+
+    async def test_default_policy_is_immediate(self) -> None:
+        self.assertTrue(MessagePolicy().immediate)
+
+    async def test_default_policy_matches_unconfigured_key(self) -> None:
+        plain = self.sender.message.register("values", int)
+        configured = self.sender.message.register("configured", int, MessagePolicy())
+        self.receiver.message.listen("configured", app=SENDER.key())(self.on_configured)
+        await settle()
+        for value in range(3):
+            await self.sender.message.broadcast(plain, value)
+            await self.sender.message.broadcast(configured, value)
+        self.assertEqual(self.server.received[MessageBroadcastEvent.type], 6)
+        self.assertEqual(self.server.received[MessageBroadcastBatchEvent.type], 0)
+        await settle()
+        self.assertEqual(self.received, [0, 1, 2])
+        self.assertEqual(self.configured, [0, 1, 2])
+
+    async def test_batching_policy_coalesces(self) -> None:
+        key = self.sender.message.register("values", int, MessagePolicy(batch=None))
+        for value in range(3):
+            await self.sender.message.broadcast(key, value)
+        self.assertEqual(self.server.received[MessageBroadcastEvent.type], 0)
+        await settle()
+        self.assertEqual(self.server.received[MessageBroadcastBatchEvent.type], 1)
+        self.assertEqual(self.received, [0, 1, 2])
+
+    async def receive(self, count: int) -> None:
+        for _ in range(200):
+            if len(self.received) >= count:
+                return
+            await asyncio.sleep(0.01)
+
+    async def test_rate_limit_spaces_sends(self) -> None:
+        key = self.sender.message.register("values", int, MessagePolicy(max_rate=20))
+        for value in range(4):
+            await self.sender.message.broadcast(key, value)
+        await self.receive(4)
+        self.assertEqual(self.received, [0, 1, 2, 3])
+        self.assertGreaterEqual(self.times[-1] - self.times[0], 0.14)
+
+    async def test_full_queue_waits_for_space(self) -> None:
+        key = self.sender.message.register(
+            "values", int, MessagePolicy(max_rate=20, max_queue=2)
+        )
+        outbox_sizes: List[int] = []
+
+        async def produce() -> None:
+            for value in range(6):
+                await self.sender.message.broadcast(key, value)
+                outbox_sizes.append(len(self.sender.message._outboxes[key.key].pending))
+
+        producer = asyncio.create_task(produce())
+        await asyncio.sleep(0.03)
+        self.assertFalse(producer.done())
+        await asyncio.wait_for(producer, 2)
+        await self.receive(6)
+        self.assertEqual(self.received, list(range(6)))
+        self.assertLessEqual(max(outbox_sizes), 2)
+
+    async def test_full_queue_can_drop_oldest(self) -> None:
+        messages: List[str] = []
+        sink = logger.add(messages.append, level="WARNING")
+        policy = MessagePolicy(max_rate=20, max_queue=2, overflow="drop_oldest")
+        key = self.sender.message.register("values", int, policy)
+        try:
+            for value in range(6):
+                await self.sender.message.broadcast(key, value)
+        finally:
+            logger.remove(sink)
+        await self.receive(2)
+        await settle()
+        self.assertEqual(self.received, [4, 5])
+        self.assertEqual(self.sender.message._outboxes[key.key].dropped, 4)
+        self.assertEqual(len(messages), 4)
+
+    def test_max_queue_must_be_positive(self) -> None:
+        with self.assertRaises(ValueError):
+            MessagePolicy(max_queue=0)
+
+
+class ItemSerializer(Serializable[Item, Dict[str, Any]]):
+    def __init__(self) -> None:
+        self.decoded = 0
+
+    def serialize(self, item: Item) -> Dict[str, Any]:
+        return item.to_json()
+
+    def deserialize(self, item: Dict[str, Any]) -> Item:
+        self.decoded += 1
+        return Item.from_json(item)
+
+
+class MessageChannelTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = await LocalServer().__aenter__()
+        self.sender = await start(create(self.server, SENDER))
+        self.receiver = await start(create(self.server, RECEIVER))
+        self.serializer = ItemSerializer()
+        self.items = self.sender.message.register(
+            "items", Item, serializer=ItemSerializer()
+        )
+        self.key = self.receiver.message.key(
+            "items", Item, app=SENDER.key(), serializer=self.serializer
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self.sender.stop()
+        await self.receiver.stop()
+        await self.server.stop()
+
+    async def send(self, *values: int) -> None:
+        for value in values:
+            await self.sender.message.broadcast(self.items, Item("item", value))
+        await settle()
+
+    async def test_channel_yields_decoded_messages_in_order(self) -> None:
+        channel = self.receiver.message.channel(self.key)
+        await settle()
+        await self.send(1, 2, 3)
+        received = []
+        async for item in channel:
+            received.append(item.value)
+            if len(received) == 3:
+                channel.close()
+        self.assertEqual(received, [1, 2, 3])
+
+    async def test_listeners_and_channels_share_one_decode(self) -> None:
+        heard: List[Item] = []
+
+        async def on_item(item: Item | None) -> None:
+            assert item is not None
+            heard.append(item)
+
+        channels = [self.receiver.message.channel(self.key) for _ in range(2)]
+        self.receiver.message.listen(self.key)(on_item)
+        await settle()
+        await self.send(1)
+        self.assertEqual(self.serializer.decoded, 1)
+        self.assertIs(await anext(channels[0]), heard[0])
+        self.assertIs(await anext(channels[1]), heard[0])
+
+    async def test_full_channel_drops_by_overflow_policy(self) -> None:
+        oldest = self.receiver.message.channel(self.key, maxsize=2)
+        newest = self.receiver.message.channel(
+            self.key, maxsize=2, overflow="drop_newest"
+        )
+        await settle()
+        await self.send(1, 2, 3, 4)
+        self.assertEqual([(await anext(oldest)).value for _ in range(2)], [3, 4])
+        self.assertEqual([(await anext(newest)).value for _ in range(2)], [1, 2])
+        self.assertEqual((oldest.dropped, newest.dropped), (2, 2))
+
+    async def test_closed_channel_stops_receiving(self) -> None:
+        channel = self.receiver.message.channel(self.key)
+        await settle()
+        await self.send(1)
+        channel.close()
+        await self.send(2)
+        self.assertEqual(len(channel), 1)
+        self.assertEqual([item.value async for item in channel], [1])
+        self.assertEqual(self.receiver.message._channels[self.key.key], [])
+
+    async def test_key_cannot_have_two_decoders(self) -> None:
+        self.receiver.message.channel(self.key)
+        other = self.receiver.message.key(
+            "items", Item, app=SENDER.key(), serializer=ItemSerializer()
+        )
+        with self.assertRaises(Exception):
+            self.receiver.message.channel(other)
+
+    def test_channel_size_must_be_positive(self) -> None:
+        with self.assertRaises(ValueError):
+            self.receiver.message.channel(self.key, maxsize=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
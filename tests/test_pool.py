@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+from typing import List
+
+from omu import OmuClient
+from omu.client.pool import ClientPool
+from omu.connection.websockets_connection import WebsocketsConnection
+from omu.testing import LocalServer
+
+from .support import app, settle
+
+SENDER = app("pooled-sender")
+RECEIVER = app("pooled-receiver")
+
+
+class ClientPoolTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = await LocalServer().__aenter__()
+        self.pool = ClientPool(self.server.address, loop=asyncio.get_running_loop())
+
+    async def asyncTearDown(self) -> None:
+        await self.pool.close()
+        await self.server.stop()
+
+    async def start(self) -> None:
+        await self.pool.start(reconnect=False)
+        for _ in range(100):
+            if all(client.connection.connected for client in self.pool.clients):
+                break
+            await asyncio.sleep(0.01)
+        await settle()
+
+    def websocket(self, client: OmuClient) -> WebsocketsConnection:
+        connection = client.connection
+        assert isinstance(connection, WebsocketsConnection)
+        return connection
+
+    async def test_clients_share_loop_session_and_event_types(self) -> None:
+        clients = [self.pool.create(app(f"pooled{i}")) for i in range(3)]
+        await self.start()
+        self.assertEqual(len(self.pool), 3)
+        self.assertEqual(len(self.server.sessions), 3)
+        for client in clients:
+            self.assertIs(client.loop, self.pool.loop)
+            self.assertIs(self.websocket(client)._session, self.pool.session)
+        self.assertGreater(len(self.pool.types), 0)
+
+    async def test_pooled_clients_exchange_messages(self) -> None:
+        sender = self.pool.create(SENDER)
+        receiver = self.pool.create(RECEIVER)
+        received: List[int] = []
+
+        async def on_value(value: int) -> None:
+            received.append(value)
+
+        key = sender.message.register("value", int)
+        receiver.message.listen("value", app=SENDER.key())(on_value)
+        await self.start()
+        await sender.message.broadcast(key, 1)
+        await settle()
+        self.assertEqual(received, [1])
+
+    async def test_close_stops_clients_and_session(self) -> None:
+        clients = [self.pool.create(app(f"pooled{i}")) for i in range(2)]
+        await self.start()
+        session = self.pool.session
+        await self.pool.close()
+        await settle(0.1)
+        self.assertTrue(all(not client.running for client in clients))
+        self.assertTrue(session.closed)
+        self.assertEqual(len(self.pool), 0)
+        self.assertEqual(len(self.server.sessions), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,219 @@
+import asyncio
+import unittest
+from typing import Any, List
+
+from loguru import logger
+
+from omu.extension.registry.registry_extension import (
+    RegistryGetEndpoint,
+    RegistryGetManyEndpoint,
+    RegistryUpdateEvent,
+    RegistryUpdateManyEvent,
+)
+from omu.testing import LocalServer
+
+from .support import app, create, settle, start
+
+APP = app("registry")
+WRITER = app("writer")
+
+
+class RegistryCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = await LocalServer().__aenter__()
+        self.writer = await start(create(self.server, WRITER))
+        self.client = create(self.server, APP)
+        self.registry = self.client.registry
+        self.updates: List[Any] = []
+
+        async def on_update(value: Any) -> None:
+            self.updates.append(value)
+
+        self.registry.listen("listened")(on_update)
+        await start(self.client, reconnect=True)
+
+    async def asyncTearDown(self) -> None:
+        await self.client.stop()
+        await self.writer.stop()
+        await self.server.stop()
+
+    def gets(self) -> int:
+        return self.server.called[RegistryGetEndpoint.info.key()]
+
+    async def write(self, name: str, value: Any) -> None:
+        await self.writer.registry.set(name, value, app=APP.key())
+        await settle()
+
+    async def test_listened_key_is_served_from_updates(self) -> None:
+        await self.write("listened", 1)
+        self.assertEqual(self.updates, [1])
+        self.assertEqual(await self.registry.get("listened"), 1)
+        self.assertEqual(self.registry.peek("listened"), 1)
+        await self.write("listened", 2)
+        self.assertEqual(await self.registry.get("listened"), 2)
+        self.assertEqual(self.gets(), 0)
+
+    async def test_unlistened_key_is_fetched_every_time(self) -> None:
+        await self.write("other", 1)
+        self.assertEqual(await self.registry.get("other"), 1)
+        await self.write("other", 2)
+        self.assertEqual(await self.registry.get("other"), 2)
+        self.assertEqual(self.gets(), 2)
+        self.assertIsNone(self.registry.peek("other"))
+
+    async def test_ttl_caches_unlistened_key(self) -> None:
+        self.registry.ttl = 0.05
+        await self.write("other", 1)
+        self.assertEqual(await self.registry.get("other"), 1)
+        await self.write("other", 2)
+        self.assertEqual(await self.registry.get("other"), 1)
+        self.assertEqual(self.gets(), 1)
+        await asyncio.sleep(0.06)
+        self.assertIsNone(self.registry.peek("other"))
+        self.assertEqual(await self.registry.get("other"), 2)
+        self.assertEqual(self.gets(), 2)
+
+    async def test_get_many_fetches_only_uncached_keys(self) -> None:
+        await self.write("listened", 1)
+        self.server.registry[f"{APP.key()}:a"] = 2
+        values = await self.registry.get_many(["listened", "a", "missing"])
+        self.assertEqual(values, {"listened": 1, "a": 2, "missing": None})
+        self.assertEqual(self.server.called[RegistryGetManyEndpoint.info.key()], 1)
+        self.assertEqual(self.gets(), 0)
+        await self.registry.get_many(["listened"])
+        self.assertEqual(self.server.called[RegistryGetManyEndpoint.info.key()], 1)
+
+    async def test_set_many_sends_one_frame(self) -> None:
+        await self.registry.set_many({"listened": 1, "a": 2})
+        await settle()
+        self.assertEqual(self.server.received[RegistryUpdateManyEvent.type], 1)
+        self.assertEqual(self.server.received[RegistryUpdateEvent.type], 0)
+        self.assertEqual(self.server.registry[f"{APP.key()}:a"], 2)
+        self.assertEqual(self.updates, [1])
+
+    async def test_snapshot_returns_names_under_prefix(self) -> None:
+        await self.writer.registry.set_many({"theme.color": "red", "theme.size": 2})
+        await self.write("theme.font", "mono")
+        await self.write("other", 1)
+        self.assertEqual(
+            await self.registry.snapshot(prefix="theme."),
+            {"theme.font": "mono"},
+        )
+        self.assertEqual(
+            await self.registry.snapshot(app=WRITER.key(), prefix="theme."),
+            {"theme.color": "red", "theme.size": 2},
+        )
+
+    async def test_reconnect_drops_listened_values(self) -> None:
+        await self.write("listened", 1)
+        await self.server.restart()
+        self.server.registry[f"{APP.key()}:listened"] = 2
+        await asyncio.sleep(0.1)
+        self.assertTrue(self.client.connection.connected)
+        self.assertEqual(await self.registry.get("listened"), 2)
+        self.assertEqual(self.gets(), 1)
+
+
+class WriteBehindTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = await LocalServer().__aenter__()
+        self.client = await start(create(self.server, APP), reconnect=True)
+        self.registry = self.client.registry
+        self.messages: List[str] = []
+        self.sink = logger.add(self.messages.append, level="WARNING")
+
+    async def asyncTearDown(self) -> None:
+        logger.remove(self.sink)
+        if self.client.running:
+            await self.client.stop()
+        await self.server.stop()
+
+    def stored(self, name: str) -> Any:
+        return self.server.registry.get(f"{APP.key()}:{name}")
+
+    def writes(self) -> int:
+        return self.server.received[RegistryUpdateEvent.type]
+
+    async def test_sets_within_window_coalesce(self) -> None:
+        self.registry.set_write_behind(window=0.05)
+        for value in range(5):
+            await self.registry.set("value", value)
+        self.assertEqual(await self.registry.get("value"), 4)
+        await settle()
+        self.assertEqual(self.writes(), 0)
+        await asyncio.sleep(0.06)
+        self.assertEqual(self.writes(), 1)
+        self.assertEqual(self.stored("value"), 4)
+
+    async def test_max_rate_spaces_writes_per_key(self) -> None:
+        self.registry.set_write_behind(window=None, max_rate=10)
+        await self.registry.set("value", 1)
+        await self.registry.set("other", 1)
+        await settle()
+        self.assertEqual(self.writes(), 2)
+        await self.registry.set("value", 2)
+        await self.registry.set("value", 3)
+        await settle()
+        self.assertEqual(self.writes(), 2)
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.writes(), 3)
+        self.assertEqual(self.stored("value"), 3)
+
+    async def test_set_many_is_coalesced_with_write_behind(self) -> None:
+        self.registry.set_write_behind(window=0.02)
+        await self.registry.set_many({"a": 1, "b": 1})
+        await self.registry.set_many({"a": 2})
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.writes(), 2)
+        self.assertEqual((self.stored("a"), self.stored("b")), (2, 1))
+
+    async def test_stop_flushes_pending_writes(self) -> None:
+        self.registry.set_write_behind(window=10)
+        await self.registry.set("value", 1)
+        self.assertIsNone(self.stored("value"))
+        await self.client.stop()
+        self.assertEqual(self.stored("value"), 1)
+
+    async def test_failed_write_is_logged_and_retried(self) -> None:
+        self.registry.set_write_behind(window=0.01)
+
+        async def fail(*args: Any) -> None:
+            raise ConnectionError("lost")
+
+        self.client.send = fail  # type: ignore[method-assign]
+        await self.registry.set("value", 1)
+        await asyncio.sleep(0.05)
+        self.assertTrue(
+            any("Failed to write registry key" in message for message in self.messages)
+        )
+        del self.client.send
+        await self.registry.flush()
+        self.assertEqual(self.stored("value"), 1)
+
+    async def test_newer_value_wins_over_failed_write(self) -> None:
+        self.registry.set_write_behind(window=0.01)
+        send = self.client.send
+
+        async def fail_once(*args: Any) -> None:
+            self.client.send = send  # type: ignore[method-assign]
+            await self.registry.set("value", 2)
+            raise ConnectionError("lost")
+
+        self.client.send = fail_once  # type: ignore[method-assign]
+        await self.registry.set("value", 1)
+        await asyncio.sleep(0.05)
+        await self.registry.flush()
+        self.assertEqual(self.stored("value"), 2)
+
+    async def test_pending_write_survives_reconnect(self) -> None:
+        self.registry.set_write_behind(window=0.05)
+        await self.registry.set("value", 1)
+        await self.server.restart()
+        await asyncio.sleep(0.1)
+        await settle()
+        self.assertTrue(self.client.connection.connected)
+        self.assertEqual(self.stored("value"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
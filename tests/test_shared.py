@@ -0,0 +1,93 @@
+import unittest
+import uuid
+from typing import Dict
+
+from omu.extension.table.model.table_info import TableInfo
+from omu.extension.table.shared import SharedTable, SharedTablePublisher
+from omu.extension.table.table import ModelTableType, TableListener
+from omu.interface import Serializer
+
+from .support import Item, StaticTable
+
+ITEMS = ModelTableType(TableInfo("test", "shared"), Serializer.model(Item))
+
+
+class Recorder(TableListener[Item]):
+    def __init__(self) -> None:
+        self.updated: Dict[str, Item] = {}
+        self.cache_updates = 0
+
+    async def on_update(self, items: Dict[str, Item]) -> None:
+        self.updated.update(items)
+
+    async def on_cache_update(self, cache: Dict[str, Item]) -> None:
+        self.cache_updates += 1
+
+
+class SharedTableTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.table = StaticTable(
+            {f"item{i}": Item(f"item{i}", i) for i in range(1000)}
+        )
+        self.name = f"omu-test-{uuid.uuid4().hex[:12]}"
+        self.publisher = SharedTablePublisher(self.table, ITEMS, name=self.name)
+        self.reader = SharedTable(ITEMS, name=self.name)
+
+    def tearDown(self) -> None:
+        self.reader.close()
+        self.publisher.unlink()
+
+    async def test_poll_decodes_only_changed_items(self) -> None:
+        recorder = Recorder()
+        self.reader.add_listener(recorder)
+        self.table.cache["item5"] = Item("item5", -5)
+        await self.publisher.on_cache_update(self.table.cache)
+        self.assertTrue(await self.reader.poll())
+        self.assertEqual(recorder.updated["item5"].value, -5)
+        self.assertEqual(recorder.cache_updates, 1)
+        self.assertEqual(len(self.reader._decoded), 1)
+        self.assertEqual(len(self.reader.cache), 1000)
+        self.assertEqual(self.reader.cache["item7"].value, 7)
+
+    async def test_decoded_items_are_bounded(self) -> None:
+        self.reader.decoded_size = 10
+        values = [item.value async for item in self.reader.iter()]
+        self.assertEqual(values, list(range(1000)))
+        self.assertEqual(len(self.reader._decoded), 10)
+
+    async def test_publisher_refreshes_same_size_cache_update(self) -> None:
+        cache = dict(self.table.cache)
+        cache["item3"] = Item("item3", 33)
+        await self.publisher.on_cache_update(cache)
+        await self.reader.poll()
+        self.assertEqual((await self.reader.get("item3")).value, 33)
+
+    async def test_publisher_follows_removals_and_clear(self) -> None:
+        del self.table.cache["item1"]
+        await self.publisher.on_cache_update(self.table.cache)
+        await self.reader.poll()
+        self.assertNotIn("item1", self.reader)
+        self.assertEqual(len(self.reader), 999)
+
+        self.table.cache.clear()
+        await self.publisher.on_cache_update(self.table.cache)
+        await self.reader.poll()
+        self.assertEqual(len(self.reader), 0)
+
+    async def test_publisher_refreshes_item_changed_in_place(self) -> None:
+        item = self.table.cache["item2"]
+        item.value = 22
+        await self.publisher.on_update({"item2": item})
+        await self.publisher.on_cache_update(self.table.cache)
+        await self.reader.poll()
+        self.assertEqual((await self.reader.get("item2")).value, 22)
+
+    async def test_close_with_live_view_explains_itself(self) -> None:
+        view = self.reader.view("item1")
+        with self.assertRaisesRegex(BufferError, "release them first"):
+            self.reader.close()
+        view.release()
+
+
+if __name__ == "__main__":
+    unittest.main()
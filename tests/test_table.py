@@ -0,0 +1,107 @@
+import unittest
+from typing import Dict
+
+from omu.extension.table.table import ModelTableType, TableListener
+from omu.testing import LocalServer
+
+from .support import Item, app, create, settle, start
+
+APP = app("table")
+ITEMS = ModelTableType.of(APP, "items", Item)
+
+
+class Replica(TableListener[Item]):
+    def __init__(self) -> None:
+        self.items: Dict[str, Item] = {}
+        self.removed: Dict[str, Item] = {}
+
+    async def on_add(self, items: Dict[str, Item]) -> None:
+        self.items.update(items)
+
+    async def on_update(self, items: Dict[str, Item]) -> None:
+        self.items.update(items)
+
+    async def on_remove(self, items: Dict[str, Item]) -> None:
+        self.removed.update(items)
+        for key in items.keys():
+            self.items.pop(key, None)
+
+    async def on_clear(self) -> None:
+        self.items.clear()
+
+
+class TableModeTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = await LocalServer().__aenter__()
+        self.client = create(self.server, APP)
+
+    async def asyncTearDown(self) -> None:
+        if self.client.running:
+            await self.client.stop()
+        await self.server.stop()
+
+    async def test_get_keeps_registered_mode(self) -> None:
+        table = self.client.tables.get(ITEMS, optimistic=True)
+        await start(self.client)
+        self.assertIs(self.client.tables.get(ITEMS), table)
+        self.assertTrue(table.optimistic)
+
+    async def test_get_with_conflicting_mode_raises(self) -> None:
+        table = self.client.tables.get(ITEMS)
+        with self.assertRaises(Exception):
+            self.client.tables.get(ITEMS, optimistic=True)
+        self.assertFalse(table.optimistic)
+
+
+class TableBudgetTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = await LocalServer().__aenter__()
+        self.client = create(self.server, APP)
+
+    async def asyncTearDown(self) -> None:
+        if self.client.running:
+            await self.client.stop()
+        await self.server.stop()
+
+    async def test_optimistic_writes_respect_budget(self) -> None:
+        table = self.client.tables.get(ITEMS, optimistic=True)
+        table.listen()
+        await start(self.client)
+        self.client.tables.set_budget(200)
+        await table.add(*(Item(f"item{i}", "x" * 60) for i in range(4)))
+        self.assertGreater(self.client.tables.memory, 200)
+        await settle()
+        self.assertLessEqual(self.client.tables.memory, 200)
+        self.assertLess(len(table.cache), 4)
+        self.assertEqual(table.memory, self.client.tables.memory)
+
+    async def test_evicted_rows_are_removed_from_listeners(self) -> None:
+        table = self.client.tables.get(ITEMS)
+        replica = Replica()
+        table.add_listener(replica)
+        await start(self.client)
+        self.client.tables.set_budget(200)
+        for i in range(6):
+            await table.add(Item(f"item{i}", "x" * 60))
+            await settle()
+        self.assertLessEqual(self.client.tables.memory, 200)
+        self.assertTrue(replica.removed)
+        self.assertEqual(sorted(replica.items), sorted(table.cache))
+        self.assertEqual(table.memory, self.client.tables.memory)
+
+    async def test_budget_counts_rows_cached_before_it_was_set(self) -> None:
+        table = self.client.tables.get(ITEMS)
+        table.listen()
+        await start(self.client)
+        await table.add(*(Item(f"item{i}", "x" * 60) for i in range(4)))
+        await settle()
+        self.client.tables.set_budget(200)
+        await table.add(Item("last", "x" * 60))
+        await settle()
+        self.assertLessEqual(self.client.tables.memory, 200)
+        self.assertIn("last", table.cache)
+        self.assertEqual(table.memory, self.client.tables.memory)
+
+
+if __name__ == "__main__":
+    unittest.main()
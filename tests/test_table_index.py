@@ -0,0 +1,151 @@
+import unittest
+from typing import Dict, List
+
+from omu.extension.endpoint.endpoint_extension import EndpointCallEvent
+from omu.extension.table.model.table_info import TableInfo
+from omu.extension.table.table import ModelTableType, Table
+from omu.extension.table.table_index import TableIndex
+from omu.interface import Serializer
+from omu.testing import LocalServer
+
+from .support import Item, app, create, settle, start
+
+APP = app("index")
+PAGED = ModelTableType(TableInfo.of(APP, "paged", cache_size=5), Serializer.model(Item))
+KEYS = [f"item{i:02}" for i in range(30)]
+
+
+class TableIndexTest(unittest.TestCase):
+    def test_overlapping_pages_merge_into_one_run(self) -> None:
+        index = TableIndex()
+        index.record(KEYS[25:], before=5)
+        index.record(KEYS[20:25], before=5, cursor=KEYS[25])
+        page = index.before(None, 10)
+        self.assertEqual(page.keys, KEYS[20:])
+        self.assertTrue(page.complete)
+        page = index.before(KEYS[22], 5)
+        self.assertEqual(page.keys, KEYS[20:22])
+        self.assertEqual(page.cursor, KEYS[20])
+        self.assertEqual(page.remaining, 3)
+
+    def test_tail_run_is_complete_towards_the_start(self) -> None:
+        index = TableIndex()
+        index.record(KEYS[:5], after=5)
+        index.record(KEYS[5:7], after=5, cursor=KEYS[4])
+        page = index.after(None, 10)
+        self.assertEqual(page.keys, KEYS[:7])
+        self.assertTrue(page.complete)
+        page = index.before(KEYS[3], 10)
+        self.assertEqual(page.keys, KEYS[:3])
+        self.assertTrue(page.complete)
+
+    def test_evict_splits_run(self) -> None:
+        index = TableIndex()
+        index.record(KEYS[20:], before=10)
+        index.evict([KEYS[25]])
+        self.assertNotIn(KEYS[25], index)
+        page = index.before(None, 10)
+        self.assertEqual(page.keys, KEYS[26:])
+        self.assertEqual(page.cursor, KEYS[26])
+        page = index.after(KEYS[20], 10)
+        self.assertEqual(page.keys, KEYS[21:25])
+        self.assertEqual(page.cursor, KEYS[24])
+
+    def test_upsert_appends_only_when_fully_indexed(self) -> None:
+        index = TableIndex()
+        index.record(KEYS[25:], before=5)
+        index.upsert(["new"])
+        self.assertNotIn("new", index)
+        self.assertIsNone(index.before(None, 5))
+
+        index.clear()
+        index.append(KEYS[:3])
+        index.upsert(["new"])
+        self.assertEqual(index.before(None, 10).keys, KEYS[:3] + ["new"])
+
+
+class IndexedFetchTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = await LocalServer().__aenter__()
+        self.writer = await start(create(self.server, APP))
+        self.truth = self.writer.tables.get(PAGED)
+        await self.truth.add(*(Item(key, i) for i, key in enumerate(KEYS)))
+        await settle()
+        self.client = create(self.server, APP)
+        self.table = self.client.tables.get(PAGED, optimistic=True)
+        self.table.listen()
+        await start(self.client)
+
+    async def asyncTearDown(self) -> None:
+        await self.client.stop()
+        await self.writer.stop()
+        await self.server.stop()
+
+    async def assertPagesMatch(self) -> None:
+        for cursor in (None, KEYS[0], KEYS[12], KEYS[27], KEYS[-1]):
+            for before, after in ((3, None), (None, 3), (40, None), (None, 40)):
+                with self.subTest(cursor=cursor, before=before, after=after):
+                    expected = await self.truth.fetch(before, after, cursor)
+                    actual = await self.table.fetch(before, after, cursor)
+                    self.assertEqual(list(actual), list(expected))
+
+    async def collect(self, table: Table[Item], backward: bool) -> List[str]:
+        return [item.key() async for item in table.iter(backward=backward)]
+
+    def calls(self) -> int:
+        return self.server.received[EndpointCallEvent.type]
+
+    async def test_pages_match_server(self) -> None:
+        await self.assertPagesMatch()
+        await self.assertPagesMatch()
+
+    async def test_covered_pages_are_served_locally(self) -> None:
+        await self.table.fetch(before=10)
+        calls = self.calls()
+        page = await self.table.fetch(before=4, cursor=KEYS[26])
+        self.assertEqual(list(page), KEYS[22:26])
+        self.assertEqual(self.calls(), calls)
+
+    async def test_page_with_uncached_keys_is_not_short(self) -> None:
+        await self.table.fetch(before=10)
+        await self.table.remove(self.table.cache[KEYS[27]])
+        page = await self.table.fetch(before=5)
+        self.assertEqual(len(page), 5)
+        self.assertNotIn(KEYS[27], page)
+
+    async def test_iter_matches_server(self) -> None:
+        for backward in (True, False):
+            expected = await self.collect(self.truth, backward)
+            self.assertEqual(await self.collect(self.table, backward), expected)
+            self.assertEqual(await self.collect(self.table, backward), expected)
+
+    async def test_pages_match_server_after_eviction(self) -> None:
+        await self.collect(self.table, True)
+        self.client.tables.set_budget(600)
+        await self.truth.update(Item(KEYS[0], -1))
+        await settle()
+        self.assertLess(len(self.table.cache), len(KEYS))
+        await self.assertPagesMatch()
+        self.assertEqual(
+            await self.collect(self.table, True), await self.collect(self.truth, True)
+        )
+
+    async def test_item_first_seen_as_update_is_paged(self) -> None:
+        await self.table.fetch(before=10)
+        await self.truth.update(Item("late", 99))
+        await settle()
+        expected: Dict[str, Item] = await self.truth.fetch(before=5)
+        self.assertEqual(list(expected)[-1], "late")
+        self.assertEqual(list(await self.table.fetch(before=5)), list(expected))
+
+        await self.collect(self.table, False)
+        await self.truth.update(Item("later", 100))
+        await settle()
+        calls = self.calls()
+        page = await self.table.fetch(before=2)
+        self.assertEqual(list(page), ["late", "later"])
+        self.assertEqual(self.calls(), calls)
+
+
+if __name__ == "__main__":
+    unittest.main()